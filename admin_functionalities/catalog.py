@@ -0,0 +1,186 @@
+"""
+Program/subject catalog
+Location: admin_functionalities/catalog.py
+
+Programs and subjects change a few times a year, but almost every section,
+subject and class record view reads them. This module keeps a process-local
+snapshot of both tables (loaded with two queries) and serves lookups from
+memory.
+
+Invalidation is versioned: Program/Subject save and delete signals bump the
+CatalogVersion row inside the writing transaction, so the new version becomes
+visible to every worker process together with the rows it describes. A
+snapshot is reloaded when its version differs from the stored one. The version
+is read from the database once per request (once per lookup outside requests,
+e.g. in management commands), so it does not depend on a shared cache backend.
+CATALOG_CACHE_TIMEOUT still bounds the age of a snapshot, for writes that skip
+signals (QuerySet.update()).
+
+Lookups return fresh model instances built from the cached rows, so callers may
+use them as foreign key targets or modify them without affecting the snapshot.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import request_finished, request_started
+from django.dispatch import receiver
+
+from .models import CatalogVersion, Program, Subject
+
+PROGRAM_FIELDS = ('id', 'name', 'description', 'school_year_id', 'is_active', 'created_at', 'updated_at')
+SUBJECT_FIELDS = (
+    'id', 'subject_code', 'subject_name', 'program_id', 'description', 'display_order',
+    'is_active', 'created_at', 'updated_at',
+)
+
+
+def _timeout():
+    return getattr(settings, 'CATALOG_CACHE_TIMEOUT', 300)
+
+
+# Version read by the current thread's request, dropped when a request starts or ends
+_request_state = threading.local()
+
+
+@receiver(request_started)
+def _start_request(**kwargs):
+    _request_state.active = True
+    _request_state.version = None
+
+
+@receiver(request_finished)
+def _end_request(**kwargs):
+    _request_state.active = False
+    _request_state.version = None
+
+
+def _version():
+    version = getattr(_request_state, 'version', None)
+    if version is None:
+        version = CatalogVersion.current()
+        if getattr(_request_state, 'active', False):
+            _request_state.version = version
+    return version
+
+
+class _Snapshot:
+    def __init__(self, version):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.programs = {}          # id -> row
+        self.program_ids = {}       # NAME -> id
+        self.subjects = {}          # id -> row
+        self.subjects_by_program = {}  # program id -> [subject id] (display order)
+        self.subjects_by_code = {}     # code -> [subject id] (Subject.Meta.ordering)
+
+        for row in Program.objects.order_by('name').values_list(*PROGRAM_FIELDS):
+            self.programs[row[0]] = row
+            self.program_ids[row[1].upper()] = row[0]
+
+        program_names = {pk: row[1] for pk, row in self.programs.items()}
+        subject_rows = list(Subject.objects.order_by().values_list(*SUBJECT_FIELDS))
+        # Subject.Meta.ordering is ['program', 'display_order', 'subject_name']; program
+        # orders by its own Meta.ordering (name)
+        subject_rows.sort(key=lambda r: (program_names.get(r[3], ''), r[3], r[5], r[2]))
+        for row in subject_rows:
+            self.subjects[row[0]] = row
+            self.subjects_by_program.setdefault(row[3], []).append(row[0])
+            self.subjects_by_code.setdefault(row[1], []).append(row[0])
+        for ids in self.subjects_by_program.values():
+            ids.sort(key=lambda pk: (self.subjects[pk][5], self.subjects[pk][2]))
+
+    def is_fresh(self, version):
+        return self.version == version and time.monotonic() - self.loaded_at < _timeout()
+
+
+class ProgramCatalog:
+    """Process-local, version-checked view of Program and Subject."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+
+    def _current(self):
+        version = _version()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.is_fresh(version):
+            return snapshot
+        with self._lock:
+            if self._snapshot is None or not self._snapshot.is_fresh(version):
+                self._snapshot = _Snapshot(version)
+            return self._snapshot
+
+    @staticmethod
+    def _program(row):
+        return Program.from_db('default', PROGRAM_FIELDS, row)
+
+    @staticmethod
+    def _subject(row):
+        return Subject.from_db('default', SUBJECT_FIELDS, row)
+
+    def program_by_name(self, name, active_only=True):
+        """Program by name (case-insensitive), or None."""
+        snapshot = self._current()
+        pk = snapshot.program_ids.get(str(name or '').strip().upper())
+        if pk is None:
+            return None
+        row = snapshot.programs[pk]
+        if active_only and not row[4]:
+            return None
+        return self._program(row)
+
+    def program_by_id(self, pk, active_only=False):
+        row = self._current().programs.get(pk)
+        if row is None or (active_only and not row[4]):
+            return None
+        return self._program(row)
+
+    def subjects_for_program(self, program, active_only=True):
+        """Subjects of a program (instance or id) in display order."""
+        snapshot = self._current()
+        program_id = getattr(program, 'pk', program)
+        rows = (snapshot.subjects[pk] for pk in snapshot.subjects_by_program.get(program_id, []))
+        return [self._subject(row) for row in rows if row[6] or not active_only]
+
+    def subject_by_code(self, code, program=None, active_only=False):
+        """
+        Subject by code, or None. Codes are unique per program; without `program`
+        the first match in Subject's default ordering is returned.
+        """
+        snapshot = self._current()
+        program_id = getattr(program, 'pk', program)
+        for pk in snapshot.subjects_by_code.get(code, []):
+            row = snapshot.subjects[pk]
+            if program_id is not None and row[3] != program_id:
+                continue
+            if active_only and not row[6]:
+                continue
+            return self._subject(row)
+        return None
+
+    def active_subjects(self):
+        """All active subjects ordered by display_order, subject_name."""
+        snapshot = self._current()
+        rows = sorted(
+            (row for row in snapshot.subjects.values() if row[6]),
+            key=lambda row: (row[5], row[2]),
+        )
+        return [self._subject(row) for row in rows]
+
+    def clear(self):
+        with self._lock:
+            self._snapshot = None
+
+
+catalog = ProgramCatalog()
+
+
+def invalidate_catalog():
+    """
+    Bump the stored version in the current transaction. Other processes see it
+    when the write commits; this request re-reads it on its next lookup.
+    """
+    CatalogVersion.bump()
+    _request_state.version = None
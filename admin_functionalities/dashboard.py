@@ -0,0 +1,133 @@
+"""
+Admin dashboard statistics
+Location: admin_functionalities/dashboard.py
+
+The dashboard numbers are computed with a fixed number of queries (per-program
+status counts in one conditional aggregate, section counts in one grouped query,
+unread notifications in one query) and cached for DASHBOARD_CACHE_TIMEOUT
+seconds. Placement, notification, section, student and teacher writes drop the
+snapshot (see signals.py), so the TTL only bounds staleness from bulk writes.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.db.models.functions import Upper
+
+from admin_functionalities.models import Notification, Section, Teacher
+from enrollmentprocess.models import Student, SectionPlacement
+
+DASHBOARD_CACHE_KEY = 'admin_dashboard:snapshot'
+
+
+def _timeout():
+    return getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 30)
+
+
+def _program_overview():
+    programs = [choice[0] for choice in SectionPlacement.PROGRAM_CHOICES]
+
+    placement_counts = {
+        row['program']: row
+        for row in SectionPlacement.objects.annotate(program=Upper('selected_program'))
+        .values('program')
+        .annotate(
+            total_applicants=Count('id'),
+            approved=Count('id', filter=Q(status__iexact='approved')),
+            pending=Count('id', filter=Q(status__iexact='pending')),
+            rejected=Count('id', filter=Q(status__iexact='rejected')),
+        )
+        .order_by()
+    }
+    section_counts = dict(
+        Section.objects.annotate(program_name=Upper('program__name'))
+        .values('program_name')
+        .annotate(count=Count('id'))
+        .order_by()
+        .values_list('program_name', 'count')
+    )
+
+    program_data = []
+    for prog in programs:
+        counts = placement_counts.get(prog.upper(), {})
+        program_data.append({
+            "program": prog,
+            "total_applicants": counts.get('total_applicants', 0),
+            "approved": counts.get('approved', 0),
+            "pending": counts.get('pending', 0),
+            "rejected": counts.get('rejected', 0),
+            "num_sections": section_counts.get(prog.upper(), 0),
+        })
+    return programs, program_data
+
+
+def _enrollment_notifications():
+    """
+    Unread enrollment notifications grouped by program, newest message and all
+    unread ids per program, from a single query.
+    """
+    unread = Notification.objects.filter(is_read=False).order_by('-created_at').values_list(
+        'id', 'program', 'notification_type', 'message'
+    )
+
+    groups = {}
+    for notif_id, program, notification_type, message in unread:
+        group = groups.setdefault(program.lower(), {
+            'count': 0, 'sample_message': message, 'notification_ids': [],
+        })
+        group['notification_ids'].append(notif_id)
+        if notification_type == 'student_enrollment':
+            group['count'] += 1
+
+    notifications = []
+    for program_code, group in sorted(groups.items(), key=lambda item: -item[1]['count']):
+        count = group['count']
+        if not count:
+            continue
+        notifications.append({
+            'title': 'New Enrollment Requests',
+            'message': f'{count} new enrollment request{"s" if count > 1 else ""} for {program_code.upper()}',
+            'type': 'student_enrollment',
+            'program': program_code,
+            'count': count,
+            'icon': 'fas fa-user-plus',
+            'sample_message': group['sample_message'],
+            'notification_ids': group['notification_ids'],
+            'program_slug': program_code,
+        })
+    return notifications
+
+
+def build_dashboard_snapshot():
+    """Compute the dashboard context (uncached)."""
+    total_students = Student.objects.count()
+    programs, program_data = _program_overview()
+    notifications = _enrollment_notifications()
+
+    return {
+        # Quick Stats
+        "total_teachers": Teacher.objects.count(),
+        "total_students": total_students,
+        "total_programs": len(programs),
+        "total_sections": Section.objects.count(),
+        "grade7_students": total_students,  # Temporary until grade levels exist
+
+        # Program Overview
+        "program_data": program_data,
+
+        # Notifications
+        "notifications": notifications,
+        "total_unread": sum(item['count'] for item in notifications),
+    }
+
+
+def get_dashboard_snapshot():
+    snapshot = cache.get(DASHBOARD_CACHE_KEY)
+    if snapshot is None:
+        snapshot = build_dashboard_snapshot()
+        cache.set(DASHBOARD_CACHE_KEY, snapshot, _timeout())
+    return snapshot
+
+
+def invalidate_dashboard_snapshot():
+    cache.delete(DASHBOARD_CACHE_KEY)
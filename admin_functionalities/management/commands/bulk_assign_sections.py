@@ -0,0 +1,50 @@
+# admin_functionalities/management/commands/bulk_assign_sections.py
+# Management command to approve and seat every pending placement of a program at once
+
+from django.core.management.base import BaseCommand, CommandError
+
+from admin_functionalities.models import Program
+from admin_functionalities.services import SectionAssignmentService
+
+
+class Command(BaseCommand):
+    help = 'Assign all pending section placements of a program in one balanced bulk pass'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'programs',
+            nargs='*',
+            type=str,
+            help='Program names (e.g. STE SPFL); defaults to every active program',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show the per-section report without saving',
+        )
+
+    def handle(self, *args, **options):
+        programs = options['programs'] or list(
+            Program.objects.filter(is_active=True).values_list('name', flat=True)
+        )
+
+        for program_name in programs:
+            try:
+                report = SectionAssignmentService.bulk_assign_program(
+                    program_name, dry_run=options['dry_run']
+                )
+            except Program.DoesNotExist:
+                raise CommandError(f"Program '{program_name}' not found or is inactive")
+
+            self.stdout.write(
+                f"{report['program']}: {report['assigned']}/{report['pending']} pending students assigned"
+                + (f", {report['unassigned']} left pending (no space)" if report['unassigned'] else '')
+            )
+            for section in report['sections']:
+                self.stdout.write(
+                    f"  {section['name']:<20} {section['before']:>4} + {section['added']:<4}"
+                    f" -> {section['enrolled']}/{section['max_students']}"
+                )
+
+        verb = 'Previewed' if options['dry_run'] else 'Completed'
+        self.stdout.write(self.style.SUCCESS(f'{verb} bulk assignment for {len(programs)} program(s)'))
@@ -0,0 +1,65 @@
+# admin_functionalities/management/commands/reconcile_section_occupancy.py
+# Management command to detect and repair drift in Section.current_students
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from admin_functionalities.models import Section
+from enrollmentprocess.models import SectionPlacement
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare each section\'s current_students counter with its approved placements '
+        'and repair any drift'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report drift, do not fix it',
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            # Lock first, then count: PostgreSQL rejects FOR UPDATE together with GROUP BY
+            sections = list(
+                Section.objects.select_for_update(of=('self',)).select_related('program').order_by('pk')
+            )
+            approved_counts = dict(
+                SectionPlacement.objects.filter(status='approved').order_by()
+                .values('section_id').annotate(n=Count('id')).values_list('section_id', 'n')
+            )
+
+            drifted, over_capacity = [], []
+            for section in sections:
+                section.approved_count = approved_counts.get(section.pk, 0)
+                if section.approved_count == section.current_students:
+                    continue
+                self.stdout.write(
+                    f"  {section.program.name} / {section.name}: counter {section.current_students}, "
+                    f"approved placements {section.approved_count}"
+                )
+                if section.approved_count > section.max_students:
+                    # Can't be stored (capacity constraint); needs a capacity change or moves
+                    over_capacity.append(section)
+                    continue
+                section.current_students = section.approved_count
+                drifted.append(section)
+
+            if drifted and not options['dry_run']:
+                Section.objects.bulk_update(drifted, ['current_students'])
+
+        for section in over_capacity:
+            self.stdout.write(self.style.WARNING(
+                f"  {section.name} has {section.approved_count} approved students but only "
+                f"{section.max_students} seats; raise max_students or move students, then re-run"
+            ))
+
+        verb = 'Found' if options['dry_run'] else 'Repaired'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} drift in {len(drifted)} of {len(sections)} sections"
+            + (f" ({len(over_capacity)} over capacity)" if over_capacity else '')
+        ))
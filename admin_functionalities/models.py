@@ -685,4 +685,29 @@ class Program(models.Model):
     def activate(self):
         """Activate the program, making it active for the current school year."""
         self.is_active = True
-        self.save()
\ No newline at end of file
+        self.save()
+
+class CatalogVersion(models.Model):
+    """
+    Single-row counter bumped by every Program/Subject save or delete, inside the
+    writing transaction. Each process's program/subject catalog
+    (admin_functionalities/catalog.py) compares it with the version its snapshot
+    was loaded at, so the check works across worker processes whatever the cache
+    backend.
+    """
+    version = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Catalog Version"
+
+    def __str__(self):
+        return f"Catalog v{self.version}"
+
+    @classmethod
+    def current(cls):
+        return cls.objects.filter(pk=1).values_list('version', flat=True).first() or 0
+
+    @classmethod
+    def bump(cls):
+        if not cls.objects.filter(pk=1).update(version=models.F('version') + 1):
+            cls.objects.get_or_create(pk=1, defaults={'version': 1})
@@ -0,0 +1,68 @@
+"""
+Keyset (seek) pagination
+Location: admin_functionalities/pagination.py
+
+Pages are fetched with "WHERE (date, id) < (last date, last id) ORDER BY date DESC,
+id DESC LIMIT n" instead of OFFSET, so every page costs the same index range
+scan no matter how deep the admin scrolls. The cursor is an opaque urlsafe
+token of the last row's (timestamp, id).
+"""
+
+import base64
+import datetime
+
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(timestamp, pk):
+    raw = f"{timestamp.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Returns (datetime, id); raises InvalidCursor for anything malformed."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        timestamp, pk = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+        return datetime.datetime.fromisoformat(timestamp), int(pk)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}") from e
+
+
+def page_size_from(value, default=DEFAULT_PAGE_SIZE):
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def keyset_page(queryset, date_field, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Newest-first page of `queryset` (a values() queryset that includes `date_field`
+    and 'id'), starting after `cursor`.
+
+    Returns:
+        tuple: (rows, next_cursor); next_cursor is None on the last page
+    """
+    queryset = queryset.order_by(f'-{date_field}', '-id')
+    if cursor:
+        timestamp, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(**{f'{date_field}__lt': timestamp}) | Q(**{date_field: timestamp, 'id__lt': pk})
+        )
+
+    # One extra row tells us whether another page exists without a COUNT
+    rows = list(queryset[:page_size + 1])
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    last = rows[-1]
+    return rows, encode_cursor(last[date_field], last['id'])
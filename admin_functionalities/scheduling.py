@@ -0,0 +1,76 @@
+"""
+Subject schedule conflict detection
+Location: admin_functionalities/scheduling.py
+
+A teacher's week is a set of slots (day pattern + start/end time). Two slots
+clash when their day patterns share a weekday and their time ranges overlap.
+DAILY therefore clashes with MWF and TTH, while MWF and TTH never clash with
+each other.
+
+find_conflicts() checks a whole schedule map in memory: it sorts each
+teacher's slots by start time and sweeps through them. SubjectAssignmentService
+builds that map from a single query, so validating a program's entire
+assignment matrix costs no extra round trips.
+"""
+
+from collections import defaultdict
+
+DAY_WEEKDAYS = {
+    'DAILY': frozenset('MTWHF'),
+    'MWF': frozenset('MWF'),
+    'TTH': frozenset('TH'),
+}
+
+
+class ScheduleSlot:
+    """One subject taught in one section: the unit the schedule map is keyed by."""
+
+    __slots__ = ('section_id', 'subject_id', 'teacher_id', 'day', 'start_time', 'end_time', 'row')
+
+    def __init__(self, section_id, subject_id, teacher_id, day, start_time, end_time, row=None):
+        self.section_id = section_id
+        self.subject_id = subject_id
+        self.teacher_id = teacher_id
+        self.day = day
+        self.start_time = start_time
+        self.end_time = end_time
+        self.row = row  # index in the submitted matrix; None for slots already saved
+
+    @property
+    def key(self):
+        return (self.section_id, self.subject_id)
+
+    def clashes_with(self, other):
+        return (
+            bool(DAY_WEEKDAYS[self.day] & DAY_WEEKDAYS[other.day])
+            and self.start_time < other.end_time
+            and other.start_time < self.end_time
+        )
+
+
+def find_conflicts(slots):
+    """
+    Pairs of clashing slots that share a teacher, where at least one slot is new
+    (has a row). Clashes that were already saved are left alone.
+
+    Args:
+        slots: iterable of ScheduleSlot, one per (section, subject)
+
+    Returns:
+        list of (new slot, other slot)
+    """
+    by_teacher = defaultdict(list)
+    for slot in slots:
+        if slot.teacher_id is not None:
+            by_teacher[slot.teacher_id].append(slot)
+
+    conflicts = []
+    for teacher_slots in by_teacher.values():
+        teacher_slots.sort(key=lambda s: s.start_time)
+        for i, slot in enumerate(teacher_slots):
+            for other in teacher_slots[i + 1:]:
+                if other.start_time >= slot.end_time:
+                    break
+                if (slot.row is not None or other.row is not None) and slot.clashes_with(other):
+                    conflicts.append((slot, other) if slot.row is not None else (other, slot))
+    return conflicts
@@ -6,10 +6,25 @@ Location: admin_functionalities/services.py
 
 from django.db import transaction, models
 from enrollmentprocess.models import Student, SectionPlacement, StudentAcademic
-from admin_functionalities.models import Section
+from enrollmentprocess.search import refresh_search_entries
+from admin_functionalities.models import Section, SectionSubjectAssignment, Subject, Teacher
 from django.utils import timezone
-from django.db.models import Count, Q
+from django.db.models import Count, F, Sum
+from django.conf import settings
 from .models import Program
+from .catalog import catalog
+from .dashboard import invalidate_dashboard_snapshot
+from .scheduling import DAY_WEEKDAYS, ScheduleSlot, find_conflicts
+from .balancing import (
+    BalancingSection,
+    BalancingStudent,
+    balance_sections,
+    balance_summary,
+    normalize_gender,
+    pick_section,
+)
+import datetime
+import heapq
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,6 +38,8 @@ class SectionAssignmentService:
     - Section availability (STRICT capacity enforcement)
     """
     
+    BALANCING_STRATEGIES = ('merit', 'headcount')
+    
     @classmethod
     def assign_student_to_section(cls, student, program_name):
         """
@@ -69,18 +86,40 @@ class SectionAssignmentService:
                     )
                 
                 # Find the Program instance
-                try:
-                    program = Program.objects.get(name__iexact=program_name, is_active=True)
-                    logger.info(f"✅ Found program: {program.name} (ID: {program.id})")
-                except Program.DoesNotExist:
+                program = catalog.program_by_name(program_name)
+                if program is None:
                     msg = f"Program '{program_name}' not found or is inactive"
                     logger.error(f"❌ {msg}")
                     return False, None, msg
+                logger.info(f"✅ Found program: {program.name} (ID: {program.id})")
+                
+                # Lock this program's sections until the transaction ends. Concurrent
+                # approvals for the same program queue up here; other programs lock
+                # other rows and proceed in parallel.
+                sections = cls._lock_program_sections(program)
+                
+                # Lock the student's placement too, so two approvals of the same
+                # student cannot both move them
+                placement = SectionPlacement.objects.select_for_update().filter(
+                    student=student
+                ).order_by('-placement_date').first()
+                old_section_id = placement.section_id if placement else None
+                
+                # Already seated in this program: keep the seat instead of reshuffling
+                current_section = next((s for s in sections if s.id == old_section_id), None)
+                if current_section:
+                    placement.selected_program = program_name
+                    placement.status = 'approved'
+                    placement.save(update_fields=['selected_program', 'status'])
+                    logger.info(
+                        f"✅ Student {student.id} already assigned to {current_section.name} "
+                        f"({current_section.current_students}/{current_section.max_students})"
+                    )
+                    return True, current_section, f"Already assigned to {current_section.name}"
                 
-                # Find available sections for this program
-                available_sections = cls._get_available_sections(program)
+                available_sections = [s for s in sections if s.current_students < s.max_students]
                 
-                if not available_sections.exists():
+                if not available_sections:
                     msg = (
                         f"❌ NO AVAILABLE SECTIONS for program '{program_name}'.\n\n"
                         f"All sections are at full capacity. Please:\n"
@@ -90,19 +129,9 @@ class SectionAssignmentService:
                     )
                     
                     # Show current section capacities
-                    all_sections = Section.objects.filter(
-                        program=program,
-                        is_active=True
-                    ).annotate(
-                        enrolled_count=Count(
-                            'sectionplacement',
-                            filter=Q(sectionplacement__status='approved')
-                        )
-                    )
-                    
-                    for section in all_sections:
-                        msg += f"  • {section.name}: {section.enrolled_count}/{section.max_students} students"
-                        if section.enrolled_count >= section.max_students:
+                    for section in sections:
+                        msg += f"  • {section.name}: {section.current_students}/{section.max_students} students"
+                        if section.current_students >= section.max_students:
                             msg += " (FULL)"
                         msg += "\n"
                     
@@ -112,7 +141,9 @@ class SectionAssignmentService:
                 # Select best section based on merit and capacity
                 best_section = cls._select_best_section(
                     sections=available_sections,
-                    student_average=overall_average
+                    student_average=overall_average,
+                    gender=student.gender,
+                    all_sections=sections
                 )
                 
                 if not best_section:
@@ -123,73 +154,29 @@ class SectionAssignmentService:
                     logger.error(f"❌ {msg}")
                     return False, None, msg
                 
-                # CRITICAL: Double-check capacity before assignment
-                current_count = SectionPlacement.objects.filter(
-                    section=best_section,
-                    status='approved'
-                ).count()
-                
-                if current_count >= best_section.max_students:
-                    msg = (
-                        f"Selected section '{best_section.name}' is now full "
-                        f"({current_count}/{best_section.max_students}). "
-                        f"Please create a new section."
+                # Saving the placement claims the seat: the occupancy signals apply a
+                # conditional F() increment to current_students (and release the old
+                # seat on a move), raising ValidationError if the section is full.
+                if placement is None:
+                    placement = SectionPlacement.objects.create(
+                        student=student,
+                        selected_program=program_name,
+                        section=best_section,
+                        status='approved'
                     )
-                    logger.error(f"❌ {msg}")
-                    return False, None, msg
-                
-                # Update or create SectionPlacement record
-                placement, created = SectionPlacement.objects.get_or_create(
-                    student=student,
-                    defaults={
-                        'selected_program': program_name,
-                        'section': best_section,
-                        'status': 'approved'
-                    }
-                )
-                
-                if not created:
-                    # Student already has a placement - check if we're moving them
-                    old_section = placement.section
-                    
-                    if old_section and old_section != best_section:
-                        # Student is moving sections - update old section count
-                        old_section.current_students = SectionPlacement.objects.filter(
-                            section=old_section,
-                            status='approved'
-                        ).count()
-                        old_section.save()
-                        logger.info(
-                            f"🔄 Updated old section {old_section.name} count: "
-                            f"{old_section.current_students}/{old_section.max_students}"
-                        )
-                    
+                    logger.info(f"✨ Created new placement for student")
+                else:
                     # Update placement
                     placement.selected_program = program_name
                     placement.section = best_section
                     placement.status = 'approved'
-                    placement.save()
+                    placement.save(update_fields=['selected_program', 'section', 'status'])
                     
                     logger.info(
-                        f"🔄 Updated placement from section {old_section} to {best_section.name}"
+                        f"🔄 Updated placement from section {old_section_id} to {best_section.name}"
                     )
-                else:
-                    logger.info(f"✨ Created new placement for student")
                 
-                # Update current_students count in the assigned section
-                best_section.current_students = SectionPlacement.objects.filter(
-                    section=best_section,
-                    status='approved'
-                ).count()
-                best_section.save()
-                
-                # Verify capacity wasn't exceeded
-                if best_section.current_students > best_section.max_students:
-                    logger.error(
-                        f"🚨 CAPACITY EXCEEDED! Section {best_section.name} now has "
-                        f"{best_section.current_students}/{best_section.max_students} students!"
-                    )
-                    # This shouldn't happen with proper locking, but log it if it does
+                best_section.refresh_from_db(fields=['current_students'])
                 
                 logger.info(
                     f"✅ Successfully assigned student {student.id} to section "
@@ -204,6 +191,26 @@ class SectionAssignmentService:
             logger.error(f"❌ {error_msg}", exc_info=True)
             return False, None, error_msg
     
+    @classmethod
+    def _lock_program_sections(cls, program):
+        """
+        Lock and return the active sections of a program (SELECT ... FOR UPDATE).
+        Rows are locked in primary-key order so concurrent callers cannot deadlock.
+        Must be called inside transaction.atomic().
+        
+        Args:
+            program: Program instance
+        
+        Returns:
+            list of Section objects with current_students as of the lock
+        """
+        return list(
+            Section.objects.select_for_update().filter(
+                program=program,
+                is_active=True
+            ).order_by('pk')
+        )
+    
     @classmethod
     def _get_available_sections(cls, program):
         """
@@ -217,45 +224,35 @@ class SectionAssignmentService:
             QuerySet of available Section objects
         """
         try:
-            # Get sections with enrollment count
+            # current_students is the maintained occupancy counter (see signals.py)
             sections = Section.objects.filter(
                 program=program,
                 is_active=True
-            ).annotate(
-                enrolled_count=Count(
-                    'sectionplacement',
-                    filter=Q(sectionplacement__status='approved')
-                )
             )
             
             # CRITICAL: Filter to only sections with available space
-            # Use F() expression to compare enrolled_count with max_students
-            from django.db.models import F
             available_sections = sections.filter(
-                enrolled_count__lt=F('max_students')  # STRICT: enrolled < max
-            ).order_by('enrolled_count', 'name')  # Prefer less full sections
+                current_students__lt=F('max_students')  # STRICT: enrolled < max
+            ).order_by('current_students', 'name')  # Prefer less full sections
             
-            count = available_sections.count()
-            logger.info(f"📋 Found {count} available sections for program '{program.name}'")
+            available_list = list(available_sections)
+            logger.info(f"📋 Found {len(available_list)} available sections for program '{program.name}'")
             
-            if count > 0:
+            if available_list:
                 logger.info("Available sections:")
-                for section in available_sections[:5]:  # Log first 5
+                for section in available_list[:5]:  # Log first 5
                     logger.info(
-                        f"  ✅ {section.name}: {section.enrolled_count}/{section.max_students} students "
-                        f"({section.max_students - section.enrolled_count} slots available)"
+                        f"  ✅ {section.name}: {section.current_students}/{section.max_students} students "
+                        f"({section.available_slots()} slots available)"
                     )
             else:
                 logger.warning(f"⚠️ NO available sections found!")
                 # Show all sections and their status
-                all_sections = sections
-                if all_sections.exists():
-                    logger.warning(f"All sections are FULL:")
-                    for section in all_sections:
-                        status = "FULL" if section.enrolled_count >= section.max_students else "Available"
-                        logger.warning(
-                            f"  🚫 {section.name}: {section.enrolled_count}/{section.max_students} ({status})"
-                        )
+                for section in sections:
+                    status = "FULL" if section.is_full() else "Available"
+                    logger.warning(
+                        f"  🚫 {section.name}: {section.current_students}/{section.max_students} ({status})"
+                    )
             
             return available_sections
             
@@ -264,39 +261,235 @@ class SectionAssignmentService:
             return Section.objects.none()
     
     @classmethod
-    def _select_best_section(cls, sections, student_average):
+    def _select_best_section(cls, sections, student_average, gender=None, all_sections=None):
         """
         Select the most appropriate section based on merit and balance.
         
         Strategy:
         1. ONLY considers sections with available space
         2. Prioritizes sections with lower enrollment (balance load)
-        3. Returns the section with the most available space
+        3. Among equally full sections, prefers the one whose mean average moves
+           closest to the program mean and with the lowest share of the
+           student's gender (balancing.pick_section)
         
         Args:
-            sections: QuerySet of available sections (pre-filtered for capacity)
+            sections: Sections with available space (locked list from _lock_program_sections)
             student_average: Student's overall academic average
+            gender: Student's gender (optional)
+            all_sections: Every section of the program, for the program mean
         
         Returns:
             Section instance or None
         """
-        if not sections.exists():
+        if not sections:
             logger.warning("⚠️ No sections available for selection")
             return None
         
-        # Select the section with the most available space
-        # (sections are already ordered by enrolled_count ascending)
-        best_section = sections.first()
+        # pick_section only chooses among sections with room; the full ones still
+        # count towards the program mean
+        profiles = cls._section_profiles(all_sections or sections)
+        key = pick_section(BalancingStudent(None, student_average, gender), profiles)
+        best_section = next((section for section in sections if section.pk == key), None)
+        if not best_section:
+            return None
         
-        if best_section:
-            logger.info(
-                f"🎯 Selected section {best_section.id} ({best_section.name}) "
-                f"with {best_section.enrolled_count}/{best_section.max_students} students "
-                f"({best_section.max_students - best_section.enrolled_count} slots available)"
-            )
+        logger.info(
+            f"🎯 Selected section {best_section.id} ({best_section.name}) "
+            f"with {best_section.current_students}/{best_section.max_students} students "
+            f"({best_section.max_students - best_section.current_students} slots available)"
+        )
         
         return best_section
     
+    @classmethod
+    def _section_profiles(cls, sections):
+        """
+        Balancing view of sections: headcount from the current_students counter plus
+        the sum of averages and gender mix of their approved students (one query).
+        
+        Returns:
+            list of balancing.BalancingSection keyed by section pk
+        """
+        rows = SectionPlacement.objects.filter(
+            section__in=[section.pk for section in sections],
+            status='approved'
+        ).values('section_id', 'student__gender').annotate(
+            seated=Count('id'),
+            total=Sum('student__studentacademic__overall_average'),
+        ).order_by()
+        
+        totals, genders = {}, {}
+        for row in rows:
+            totals[row['section_id']] = totals.get(row['section_id'], 0.0) + (row['total'] or 0.0)
+            genders.setdefault(row['section_id'], {})
+            gender = normalize_gender(row['student__gender'])
+            genders[row['section_id']][gender] = genders[row['section_id']].get(gender, 0) + row['seated']
+        
+        return [
+            BalancingSection(
+                section.pk,
+                section.name,
+                section.max_students,
+                count=section.current_students,
+                total=totals.get(section.pk, 0.0),
+                genders=genders.get(section.pk),
+            )
+            for section in sections
+        ]
+    
+    @classmethod
+    def bulk_assign_program(cls, program_name, dry_run=False, strategy=None):
+        """
+        Assign every pending placement of a program in one pass.
+        
+        Sections and pending placements are loaded once (rows locked), the
+        distribution is computed in memory by _distribute, and the result is
+        written with two bulk_updates inside a single transaction. Students who
+        do not fit stay pending and are counted as unassigned.
+        
+        Args:
+            program_name: Program name (e.g., 'STE', 'SPFL', 'HETERO')
+            dry_run: Compute and return the report without saving
+            strategy: 'merit' (headcount + mean average + gender, see balancing.py)
+                or 'headcount'; defaults to settings.SECTION_BALANCING_STRATEGY
+        
+        Returns:
+            dict: {'program', 'pending', 'assigned', 'unassigned', 'sections': [...],
+                   'balance': spread of headcount/mean/gender ('merit' only)}
+        """
+        strategy = strategy or getattr(settings, 'SECTION_BALANCING_STRATEGY', 'merit')
+        if strategy not in cls.BALANCING_STRATEGIES:
+            raise ValueError(f"Unknown balancing strategy '{strategy}'")
+        
+        program_name = str(program_name).strip().upper()
+        program = catalog.program_by_name(program_name)
+        if program is None:
+            raise Program.DoesNotExist(f"Program '{program_name}' not found or is inactive")
+        
+        with transaction.atomic():
+            sections = cls._lock_program_sections(program)
+            placements = list(
+                SectionPlacement.objects.select_for_update(of=('self',)).filter(
+                    selected_program__iexact=program_name,
+                    status='pending'
+                ).annotate(
+                    overall_average=F('student__studentacademic__overall_average'),
+                    gender=F('student__gender'),
+                ).order_by('placement_date', 'pk')
+            )
+            before = {section.pk: section.current_students for section in sections}
+            
+            balance = None
+            if strategy == 'merit':
+                profiles = cls._section_profiles(sections)
+                assignment = cls._distribute_by_merit(placements, sections, profiles)
+                balance = balance_summary(profiles)
+            else:
+                assignment = cls._distribute(placements, sections)
+            
+            assigned = []
+            for placement in placements:
+                section = assignment.get(placement.pk)
+                if section is not None:
+                    placement.section = section
+                    placement.status = 'approved'
+                    assigned.append(placement)
+            
+            added = {}
+            for placement in assigned:
+                added[placement.section.pk] = added.get(placement.section.pk, 0) + 1
+            for section in sections:
+                section.current_students = before[section.pk] + added.get(section.pk, 0)
+            
+            if not dry_run:
+                # bulk_update skips the occupancy and search signals, so the counters
+                # are written here and the search entries refreshed after commit
+                SectionPlacement.objects.bulk_update(assigned, ['section', 'status'], batch_size=500)
+                Section.objects.bulk_update(sections, ['current_students'])
+                transaction.on_commit(invalidate_dashboard_snapshot)
+                student_ids = [placement.student_id for placement in assigned]
+                transaction.on_commit(lambda: refresh_search_entries(student_ids))
+            else:
+                transaction.set_rollback(True)
+        
+        report = {
+            'program': program.name,
+            'pending': len(placements),
+            'assigned': len(assigned),
+            'unassigned': len(placements) - len(assigned),
+            'dry_run': dry_run,
+            'strategy': strategy,
+            'balance': balance,
+            'sections': [
+                {
+                    'id': section.id,
+                    'name': section.name,
+                    'before': before[section.pk],
+                    'added': added.get(section.pk, 0),
+                    'enrolled': section.current_students,
+                    'max_students': section.max_students,
+                    'available_slots': section.max_students - section.current_students,
+                }
+                for section in sections
+            ],
+        }
+        logger.info(
+            f"✅ Bulk assignment for {program.name}: {report['assigned']}/{report['pending']} "
+            f"pending students assigned, {report['unassigned']} left pending"
+        )
+        return report
+    
+    @classmethod
+    def _distribute(cls, placements, sections):
+        """
+        Balance placements across sections by headcount: each student (highest
+        average first, then earliest placement) goes to the least-full section
+        that still has space.
+        
+        Args:
+            placements: SectionPlacement list annotated with overall_average
+            sections: locked Section list with current_students
+        
+        Returns:
+            dict: {placement_id: Section}
+        """
+        heap = [
+            (section.current_students, section.name, section.pk, section)
+            for section in sections
+            if section.current_students < section.max_students
+        ]
+        heapq.heapify(heap)
+        
+        ranked = sorted(placements, key=lambda p: -(p.overall_average or 0.0))  # stable: keeps date order on ties
+        assignment = {}
+        for placement in ranked:
+            if not heap:
+                break
+            count, name, pk, section = heapq.heappop(heap)
+            assignment[placement.pk] = section
+            if count + 1 < section.max_students:
+                heapq.heappush(heap, (count + 1, name, pk, section))
+        return assignment
+    
+    @classmethod
+    def _distribute_by_merit(cls, placements, sections, profiles):
+        """
+        Balance placements on headcount, mean overall_average and gender mix
+        (balancing.balance_sections). `profiles` is updated in place.
+        
+        Returns:
+            dict: {placement_id: Section}
+        """
+        students = [
+            BalancingStudent(placement.pk, placement.overall_average, placement.gender)
+            for placement in placements
+        ]
+        by_pk = {section.pk: section for section in sections}
+        return {
+            placement_id: by_pk[section_pk]
+            for placement_id, section_pk in balance_sections(students, profiles).items()
+        }
+    
     @classmethod
     def unassign_student_from_section(cls, student):
         """
@@ -310,28 +503,24 @@ class SectionAssignmentService:
             tuple: (success: bool, message: str)
         """
         try:
-            placement = SectionPlacement.objects.filter(student=student).first()
-            
-            if not placement:
-                return True, "Student has no section assignment"
-            
-            section = placement.section
-            section_name = section.name if section else "Unknown"
-            
-            # Delete the placement
-            placement.delete()
-            
-            # Update section count
-            if section:
-                section.current_students = SectionPlacement.objects.filter(
-                    section=section,
-                    status='approved'
-                ).count()
-                section.save()
-                logger.info(
-                    f"✅ Removed student {student.id} from {section_name}. "
-                    f"Section now has {section.current_students}/{section.max_students} students."
-                )
+            with transaction.atomic():
+                placement = SectionPlacement.objects.select_for_update().filter(student=student).first()
+                
+                if not placement:
+                    return True, "Student has no section assignment"
+                
+                section = placement.section
+                section_name = section.name if section else "Unknown"
+                
+                # Delete the placement (the occupancy signal releases the seat)
+                placement.delete()
+                
+                if section:
+                    section.refresh_from_db(fields=['current_students'])
+                    logger.info(
+                        f"✅ Removed student {student.id} from {section_name}. "
+                        f"Section now has {section.current_students}/{section.max_students} students."
+                    )
             
             return True, f"Successfully removed from {section_name}"
             
@@ -356,10 +545,10 @@ class SectionAssignmentService:
             query = Section.objects.filter(is_active=True)
             
             if program_name:
-                try:
-                    program = Program.objects.get(name__iexact=program_name, is_active=True)
+                program = catalog.program_by_name(program_name)
+                if program is not None:
                     query = query.filter(program=program)
-                except Program.DoesNotExist:
+                else:
                     logger.warning(f"Program '{program_name}' not found for statistics")
                     return {
                         'total_sections': 0,
@@ -369,18 +558,14 @@ class SectionAssignmentService:
                         'sections': []
                     }
             
-            sections = query.annotate(
-                enrolled_count=Count(
-                    'sectionplacement',
-                    filter=Q(sectionplacement__status='approved')
-                )
-            )
+            # Occupancy comes from the maintained current_students counter
+            sections = list(query.select_related('program'))
             
             total_capacity = sum(s.max_students for s in sections)
-            total_enrolled = sum(s.enrolled_count for s in sections)
+            total_enrolled = sum(s.current_students for s in sections)
             
             stats = {
-                'total_sections': sections.count(),
+                'total_sections': len(sections),
                 'total_capacity': total_capacity,
                 'total_enrolled': total_enrolled,
                 'total_available': total_capacity - total_enrolled,
@@ -388,18 +573,18 @@ class SectionAssignmentService:
             }
             
             for section in sections:
-                available_slots = section.max_students - section.enrolled_count
-                is_full = section.enrolled_count >= section.max_students
+                available_slots = section.max_students - section.current_students
+                is_full = section.current_students >= section.max_students
                 
                 stats['sections'].append({
                     'id': section.id,
                     'name': section.name,
                     'program': section.program.name,
-                    'enrolled': section.enrolled_count,
+                    'enrolled': section.current_students,
                     'max_students': section.max_students,
                     'available_slots': available_slots,
                     'is_full': is_full,
-                    'capacity_percentage': round((section.enrolled_count / section.max_students * 100), 1) if section.max_students > 0 else 0
+                    'capacity_percentage': section.capacity_percentage()
                 })
             
             return stats
@@ -413,4 +598,147 @@ class SectionAssignmentService:
                 'total_available': 0,
                 'sections': [],
                 'error': str(e)
-            }
\ No newline at end of file
+            }
+
+class SubjectAssignmentService:
+    """
+    Bulk subject-teacher assignment for one section or a whole program.
+    Conflicts are validated against one preloaded schedule map (scheduling.py) and
+    the matrix is written all-or-nothing with bulk_create/bulk_update.
+    """
+
+    REQUIRED_FIELDS = ('section_id', 'subject_id', 'teacher_id', 'day', 'start_time', 'end_time')
+
+    @classmethod
+    def _parse_row(cls, index, row):
+        """Returns (ScheduleSlot, None) or (None, error message)."""
+        missing = [field for field in cls.REQUIRED_FIELDS if not row.get(field)]
+        if missing:
+            return None, f"Missing {', '.join(missing)}"
+        if row['day'] not in DAY_WEEKDAYS:
+            return None, f"Unknown day '{row['day']}'"
+        try:
+            start_time = datetime.time.fromisoformat(str(row['start_time']))
+            end_time = datetime.time.fromisoformat(str(row['end_time']))
+            section_id, subject_id, teacher_id = (
+                int(row['section_id']), int(row['subject_id']), int(row['teacher_id'])
+            )
+        except (TypeError, ValueError):
+            return None, "Invalid id or time"
+        if start_time >= end_time:
+            return None, "Start time must be before end time"
+        return ScheduleSlot(section_id, subject_id, teacher_id, row['day'], start_time, end_time, row=index), None
+
+    @classmethod
+    def bulk_assign(cls, rows, dry_run=False):
+        """
+        Assign a matrix of subject teachers.
+
+        Args:
+            rows: list of dicts with section_id, subject_id, teacher_id, day,
+                  start_time and end_time ('HH:MM'); one per (section, subject)
+            dry_run: validate only
+
+        Returns:
+            dict: success, created, updated, unchanged, errors [{row, message}] and
+                  conflicts [{row, teacher, message}]; nothing is written unless
+                  errors and conflicts are both empty
+        """
+        report = {'success': False, 'created': 0, 'updated': 0, 'unchanged': 0,
+                  'dry_run': dry_run, 'errors': [], 'conflicts': []}
+
+        incoming = {}
+        for index, row in enumerate(rows):
+            slot, error = cls._parse_row(index, row)
+            if error:
+                report['errors'].append({'row': index, 'message': error})
+            elif slot.key in incoming:
+                report['errors'].append({'row': index, 'message': f"Duplicate of row {incoming[slot.key].row}"})
+            else:
+                incoming[slot.key] = slot
+
+        section_ids = {slot.section_id for slot in incoming.values()}
+        teacher_ids = {slot.teacher_id for slot in incoming.values()}
+
+        with transaction.atomic():
+            sections = Section.objects.in_bulk(section_ids)
+            subjects = {
+                pk: program_id for pk, program_id in Subject.objects.filter(
+                    pk__in={slot.subject_id for slot in incoming.values()}, is_active=True
+                ).values_list('pk', 'program_id')
+            }
+            teachers = dict(
+                Teacher.objects.filter(pk__in=teacher_ids, is_active=True).values_list('pk', 'full_name')
+            )
+            for slot in list(incoming.values()):
+                error = None
+                if slot.section_id not in sections:
+                    error = "Section not found"
+                elif slot.subject_id not in subjects:
+                    error = "Subject not found or inactive"
+                elif subjects[slot.subject_id] != sections[slot.section_id].program_id:
+                    error = "Subject belongs to another program"
+                elif slot.teacher_id not in teachers:
+                    error = "Teacher not found or inactive"
+                if error:
+                    report['errors'].append({'row': slot.row, 'message': error})
+                    del incoming[slot.key]
+
+            # Schedule map: every saved slot of the involved teachers and sections, one query
+            existing = {
+                (a.section_id, a.subject_id): a
+                for a in SectionSubjectAssignment.objects.select_for_update()
+                .filter(models.Q(teacher_id__in=teacher_ids) | models.Q(section_id__in=section_ids))
+                .select_related('section')
+            }
+            schedule = {
+                key: ScheduleSlot(a.section_id, a.subject_id, a.teacher_id, a.day, a.start_time, a.end_time)
+                for key, a in existing.items()
+            }
+            schedule.update(incoming)  # a submitted row replaces the slot it targets
+
+            section_names = {key[0]: a.section.name for key, a in existing.items()}
+            section_names.update({pk: section.name for pk, section in sections.items()})
+            for new, other in find_conflicts(schedule.values()):
+                report['conflicts'].append({
+                    'row': new.row,
+                    'teacher': teachers.get(new.teacher_id),
+                    'message': (
+                        f"{teachers.get(new.teacher_id)} already has a class in section "
+                        f"{section_names.get(other.section_id, other.section_id)} at that time."
+                    ),
+                })
+
+            if report['errors'] or report['conflicts']:
+                report['errors'].sort(key=lambda e: e['row'])
+                report['conflicts'].sort(key=lambda c: c['row'])
+                return report
+
+            to_create, to_update = [], []
+            for key, slot in incoming.items():
+                assignment = existing.get(key)
+                values = {'teacher_id': slot.teacher_id, 'day': slot.day,
+                          'start_time': slot.start_time, 'end_time': slot.end_time}
+                if assignment is None:
+                    to_create.append(SectionSubjectAssignment(
+                        section_id=slot.section_id, subject_id=slot.subject_id, **values
+                    ))
+                elif any(getattr(assignment, field) != value for field, value in values.items()):
+                    for field, value in values.items():
+                        setattr(assignment, field, value)
+                    to_update.append(assignment)
+                else:
+                    report['unchanged'] += 1
+
+            if not dry_run:
+                SectionSubjectAssignment.objects.bulk_create(to_create, batch_size=500)
+                SectionSubjectAssignment.objects.bulk_update(
+                    to_update, ['teacher', 'day', 'start_time', 'end_time'], batch_size=500
+                )
+
+        report.update(success=True, created=len(to_create), updated=len(to_update))
+        logger.info(
+            f"✅ Subject assignment: {report['created']} created, {report['updated']} updated, "
+            f"{report['unchanged']} unchanged{' (dry run)' if dry_run else ''}"
+        )
+        return report
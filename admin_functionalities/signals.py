@@ -1,6 +1,11 @@
-from django.db.models.signals import post_save
+from django.core.exceptions import ValidationError
+from django.db.models import F
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete, pre_save
 from django.dispatch import receiver
-from .models import Student, StudentRequirements,  CustomUser, Teacher
+from enrollmentprocess.models import SectionPlacement
+from .models import Student, StudentRequirements,  CustomUser, Teacher, Section, Notification, Program, Subject
+from .catalog import invalidate_catalog
+from .dashboard import invalidate_dashboard_snapshot
 from datetime import date
 
 
@@ -56,4 +61,103 @@ def sync_teacher_from_user(sender, instance, created, **kwargs):
         teacher.save()
     else:
         # Optional: deactivate teacher if user no longer has teaching roles
-        Teacher.objects.filter(user=instance).update(is_active=False)
\ No newline at end of file
+        Teacher.objects.filter(user=instance).update(is_active=False)
+
+# ---------------------------------------------------------------------------
+# Section occupancy: Section.current_students is a maintained counter of the
+# approved placements pointing at the section. Every SectionPlacement save/delete
+# adjusts it with an atomic F() update; bulk writes (bulk_update, QuerySet.update)
+# bypass signals and must adjust the counter themselves. Drift is detected and
+# repaired by `python manage.py reconcile_section_occupancy`.
+# ---------------------------------------------------------------------------
+
+_UNKNOWN = object()
+
+
+def _occupied_section_id(values):
+    """Section the placement takes a seat in: approved placements only."""
+    return values.get('section_id') if values.get('status') == 'approved' else None
+
+
+def adjust_section_occupancy(section_id, delta):
+    """
+    Atomically add `delta` to a section's current_students. Increments are
+    conditional on capacity, so a full section raises ValidationError (as
+    Section.save does) instead of tripping the database constraint.
+    """
+    if not section_id or not delta:
+        return
+    sections = Section.objects.filter(pk=section_id)
+    if delta > 0:
+        updated = sections.filter(
+            current_students__lte=F('max_students') - delta
+        ).update(current_students=F('current_students') + delta)
+        if not updated and sections.exists():
+            section = sections.get()
+            raise ValidationError(
+                f"Cannot assign: Section {section.name} is at full capacity "
+                f"({section.current_students}/{section.max_students})"
+            )
+    else:
+        sections.filter(current_students__gte=-delta).update(
+            current_students=F('current_students') + delta
+        )
+
+
+@receiver(post_init, sender=SectionPlacement)
+def remember_occupied_section(sender, instance, **kwargs):
+    values = instance.__dict__
+    if 'status' in values and 'section_id' in values:
+        instance._occupied_section_id = _occupied_section_id(values)
+    else:
+        # Deferred fields: resolved from the database in pre_save if needed
+        instance._occupied_section_id = _UNKNOWN
+
+
+@receiver(pre_save, sender=SectionPlacement)
+@receiver(pre_delete, sender=SectionPlacement)
+def resolve_occupied_section(sender, instance, **kwargs):
+    if instance._state.adding:
+        instance._occupied_section_id = None
+    elif instance._occupied_section_id is _UNKNOWN:
+        row = SectionPlacement.objects.filter(pk=instance.pk).values('status', 'section_id').first()
+        instance._occupied_section_id = _occupied_section_id(row) if row else None
+
+
+@receiver(post_save, sender=SectionPlacement)
+def update_section_occupancy(sender, instance, **kwargs):
+    old_section_id = instance._occupied_section_id
+    new_section_id = _occupied_section_id(instance.__dict__)
+    if old_section_id != new_section_id:
+        adjust_section_occupancy(old_section_id, -1)
+        adjust_section_occupancy(new_section_id, +1)
+        instance._occupied_section_id = new_section_id
+
+
+@receiver(post_delete, sender=SectionPlacement)
+def release_section_occupancy(sender, instance, **kwargs):
+    adjust_section_occupancy(instance._occupied_section_id, -1)
+
+
+@receiver(post_save, sender=SectionPlacement)
+@receiver(post_delete, sender=SectionPlacement)
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+@receiver(post_save, sender=Section)
+@receiver(post_delete, sender=Section)
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+@receiver(post_save, sender=Teacher)
+@receiver(post_delete, sender=Teacher)
+def drop_dashboard_snapshot(sender, **kwargs):
+    """Dashboard counts/notifications changed: rebuild the snapshot on the next hit."""
+    invalidate_dashboard_snapshot()
+
+
+@receiver(post_save, sender=Program)
+@receiver(post_delete, sender=Program)
+@receiver(post_save, sender=Subject)
+@receiver(post_delete, sender=Subject)
+def drop_catalog_snapshot(sender, **kwargs):
+    """Programs/subjects changed: every process reloads its catalog on the next lookup."""
+    invalidate_catalog()
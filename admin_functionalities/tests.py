@@ -1,3 +1,566 @@
-from django.test import TestCase
+import datetime
+import os
+import threading
 
-# Create your tests here.
+from django.db import connection, connections, transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from enrollmentprocess.models import Student, SectionPlacement, StudentSearchEntry
+from .balancing import BalancingSection, BalancingStudent, balance_sections, balance_summary
+from .catalog import _end_request, _start_request, catalog
+from .dashboard import get_dashboard_snapshot, invalidate_dashboard_snapshot
+from .models import (
+    CatalogVersion, CustomUser, Notification, Program, SchoolYear, Section, SectionSubjectAssignment, Subject,
+    Teacher,
+)
+from .scheduling import ScheduleSlot, find_conflicts
+from .services import SectionAssignmentService, SubjectAssignmentService
+
+
+def make_school_year():
+    day = datetime.date(2025, 6, 1)
+    return SchoolYear.objects.create(
+        name='2025-2026', start_date=day, end_date=day,
+        q1_start=day, q1_end=day, q2_start=day, q2_end=day,
+        q3_start=day, q3_end=day, q4_start=day, q4_end=day,
+    )
+
+
+def make_program(name, school_year):
+    return Program.objects.create(name=name, school_year=school_year)
+
+
+def make_section(program, name, max_students):
+    return Section.objects.create(
+        program=program, name=name, max_students=max_students, building='A', room=name
+    )
+
+
+def make_teachers(count, prefix='T', **roles):
+    return [
+        Teacher.objects.create(
+            employee_id=f'{prefix}-{i}', last_name=f'{prefix}{i}', first_name='Teacher',
+            gender='F', position='Teacher I', department='Science',
+            email=f'{prefix.lower()}{i}@example.com', phone='0900', **roles,
+        )
+        for i in range(count)
+    ]
+
+
+def make_students(count, prefix='S', gender='Male'):
+    return [
+        Student.objects.create(
+            lrn=f'{prefix}{i:010d}'[:12],
+            last_name=f'{prefix}{i}',
+            first_name='Test',
+            address='Address',
+            age=12,
+            gender=gender,
+            date_of_birth=datetime.date(2013, 1, 1),
+            place_of_birth='City',
+            religion='None',
+            dialect_spoken='Tagalog',
+            ethnic_tribe='None',
+            last_school_attended='Elementary',
+            previous_grade_section='6-A',
+            last_school_year='2024-2025',
+        )
+        for i in range(count)
+    ]
+
+
+class SectionAssignmentServiceTests(TestCase):
+    """Seats are claimed with counter updates and never exceed max_students."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.program = make_program('STE', make_school_year())
+        cls.section_a = make_section(cls.program, 'Alpha', 2)
+        cls.section_b = make_section(cls.program, 'Beta', 2)
+
+    def test_capacity_holds_when_oversubscribed(self):
+        results = [
+            SectionAssignmentService.assign_student_to_section(student, 'STE')
+            for student in make_students(6)
+        ]
+
+        self.assertEqual(sum(1 for ok, _, _ in results if ok), 4)
+        for section in Section.objects.filter(program=self.program):
+            approved = SectionPlacement.objects.filter(section=section, status='approved').count()
+            self.assertEqual(section.current_students, approved)
+            self.assertLessEqual(section.current_students, section.max_students)
+
+    def test_reapproval_keeps_seat(self):
+        student = make_students(1)[0]
+        ok, first, _ = SectionAssignmentService.assign_student_to_section(student, 'STE')
+        ok_again, second, _ = SectionAssignmentService.assign_student_to_section(student, 'STE')
+
+        self.assertTrue(ok and ok_again)
+        self.assertEqual(first, second)
+        self.assertEqual(Section.objects.get(pk=first.pk).current_students, 1)
+
+    def test_unassign_releases_seat(self):
+        student = make_students(1)[0]
+        ok, section, _ = SectionAssignmentService.assign_student_to_section(student, 'STE')
+        SectionAssignmentService.unassign_student_from_section(student)
+
+        self.assertEqual(Section.objects.get(pk=section.pk).current_students, 0)
+        self.assertFalse(SectionPlacement.objects.filter(student=student).exists())
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class SectionAssignmentConcurrencyTests(TransactionTestCase):
+    """
+    Parallel approvals against one program must not oversubscribe it, and a program
+    whose sections are locked must not block assignments to another program.
+    Needs real row locks (PostgreSQL); skipped on SQLite.
+    """
+
+    WORKERS = 24
+
+    def setUp(self):
+        school_year = make_school_year()
+        self.program = make_program('STE', school_year)
+        self.other_program = make_program('SPFL', school_year)
+        for i in range(3):
+            make_section(self.program, f'STE-{i}', 5)
+        self.other_section = make_section(self.other_program, 'SPFL-1', 5)
+
+    def _run_in_thread(self, fn, results, index):
+        try:
+            results[index] = fn()
+        finally:
+            connections.close_all()
+
+    def test_parallel_assignments_respect_capacity(self):
+        students = make_students(self.WORKERS)
+        results = [None] * len(students)
+        barrier = threading.Barrier(len(students))
+
+        def assign(student):
+            barrier.wait()
+            return SectionAssignmentService.assign_student_to_section(student, 'STE')
+
+        threads = [
+            threading.Thread(target=self._run_in_thread, args=(lambda s=s: assign(s), results, i))
+            for i, s in enumerate(students)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(sum(1 for ok, _, _ in results if ok), 15)
+        for section in Section.objects.filter(program=self.program):
+            approved = SectionPlacement.objects.filter(section=section, status='approved').count()
+            self.assertEqual(section.current_students, approved)
+            self.assertEqual(section.current_students, section.max_students)
+
+    def test_unrelated_program_is_not_blocked(self):
+        student, other_student = make_students(2)
+        locked = threading.Event()
+        release = threading.Event()
+        results = [None, None]
+
+        def hold_program_lock():
+            with transaction.atomic():
+                SectionAssignmentService._lock_program_sections(self.program)
+                locked.set()
+                release.wait(timeout=10)
+            return True
+
+        holder = threading.Thread(target=self._run_in_thread, args=(hold_program_lock, results, 0))
+        holder.start()
+        self.assertTrue(locked.wait(timeout=10))
+
+        # STE rows are locked by the holder; an SPFL assignment must still go through
+        worker = threading.Thread(
+            target=self._run_in_thread,
+            args=(lambda: SectionAssignmentService.assign_student_to_section(other_student, 'SPFL'), results, 1),
+        )
+        worker.start()
+        worker.join(timeout=5)
+        still_blocked = worker.is_alive()
+
+        release.set()
+        holder.join()
+        worker.join()
+
+        self.assertFalse(still_blocked)
+        ok, section, _ = results[1]
+        self.assertTrue(ok)
+        self.assertEqual(section.pk, self.other_section.pk)
+
+
+class BulkSectionAssignmentTests(TestCase):
+    """bulk_assign_program seats a whole cohort with a fixed number of queries."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.program = make_program('STE', make_school_year())
+        cls.sections = [make_section(cls.program, name, 40) for name in ('Alpha', 'Beta', 'Gamma')]
+        cls.students = make_students(130)
+        SectionPlacement.objects.bulk_create(
+            SectionPlacement(student=student, selected_program='STE') for student in cls.students
+        )
+
+    def test_cohort_is_balanced_and_capacity_holds(self):
+        catalog.program_by_name('STE')  # the program lookup is served by the warm catalog
+        # catalog version, savepoint, sections, placements, section profiles, 2 bulk updates, release
+        with self.assertNumQueries(8):
+            report = SectionAssignmentService.bulk_assign_program('ste')
+
+        self.assertEqual(report['pending'], 130)
+        self.assertEqual(report['assigned'], 120)
+        self.assertEqual(report['unassigned'], 10)
+        self.assertEqual([s['added'] for s in report['sections']], [40, 40, 40])
+        for section in Section.objects.filter(program=self.program):
+            approved = SectionPlacement.objects.filter(section=section, status='approved').count()
+            self.assertEqual(section.current_students, approved)
+        self.assertEqual(SectionPlacement.objects.filter(status='pending').count(), 10)
+
+    def test_dry_run_saves_nothing(self):
+        report = SectionAssignmentService.bulk_assign_program('STE', dry_run=True)
+
+        self.assertEqual(report['assigned'], 120)
+        self.assertFalse(SectionPlacement.objects.filter(status='approved').exists())
+        self.assertEqual(Section.objects.filter(current_students__gt=0).count(), 0)
+
+    def test_search_entries_are_refreshed_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            SectionAssignmentService.bulk_assign_program('STE')
+
+        approved = SectionPlacement.objects.filter(status='approved').values_list('student_id', flat=True)
+        entries = StudentSearchEntry.objects.filter(student_id__in=approved)
+        self.assertEqual(entries.count(), 120)
+        self.assertEqual(set(entries.values_list('statuses', 'programs')), {('approved', 'STE')})
+
+
+class SectionBalancingTests(SimpleTestCase):
+    """The merit engine evens out headcount, mean average and gender mix."""
+
+    def test_cohort_is_balanced_on_all_three_axes(self):
+        students = [
+            BalancingStudent(i, 75 + (i * 37) % 25, 'Female' if i % 3 else 'Male')
+            for i in range(600)
+        ]
+        sections = [BalancingSection(j, f'S{j}', 60) for j in range(10)]
+
+        assignment = balance_sections(students, sections)
+        summary = balance_summary(sections)
+
+        self.assertEqual(len(assignment), 600)
+        self.assertEqual(summary['headcount_spread'], 0)
+        self.assertLess(summary['mean_spread'], 0.5)
+        self.assertLessEqual(max(summary['gender_share_spread'].values()), 0.02)
+
+    def test_capacity_and_existing_students_are_respected(self):
+        sections = [
+            BalancingSection(0, 'Full-ish', 10, count=8, total=8 * 95.0, genders={'male': 8}),
+            BalancingSection(1, 'Empty', 10),
+        ]
+        students = [BalancingStudent(i, 80 + i, 'Male') for i in range(15)]
+
+        assignment = balance_sections(students, sections)
+
+        self.assertEqual(len(assignment), 12)
+        self.assertEqual([s.count for s in sections], [10, 10])
+        # The weakest students are the ones left out
+        self.assertEqual(set(range(15)) - set(assignment), {0, 1, 2})
+
+
+class SectionOccupancyCounterTests(TestCase):
+    """current_students follows placement create/delete/status changes without recounts."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.program = make_program('STE', make_school_year())
+        cls.section = make_section(cls.program, 'Alpha', 2)
+        cls.other = make_section(cls.program, 'Beta', 2)
+
+    def _count(self, section):
+        return Section.objects.values_list('current_students', flat=True).get(pk=section.pk)
+
+    def test_counter_follows_placement_lifecycle(self):
+        student = make_students(1)[0]
+        placement = SectionPlacement.objects.create(student=student, selected_program='STE', section=self.section)
+        self.assertEqual(self._count(self.section), 0)  # pending placements hold no seat
+
+        placement.status = 'approved'
+        placement.save()
+        self.assertEqual(self._count(self.section), 1)
+
+        placement.section = self.other
+        placement.save()
+        self.assertEqual((self._count(self.section), self._count(self.other)), (0, 1))
+
+        placement.status = 'rejected'
+        placement.save()
+        self.assertEqual(self._count(self.other), 0)
+
+        placement.status = 'approved'
+        placement.save()
+        SectionPlacement.objects.only('pk').get(pk=placement.pk).delete()
+        self.assertEqual(self._count(self.other), 0)
+
+    def test_full_section_rejects_placement(self):
+        from django.core.exceptions import ValidationError
+
+        students = make_students(3)
+        for student in students[:2]:
+            SectionPlacement.objects.create(
+                student=student, selected_program='STE', section=self.section, status='approved'
+            )
+        with self.assertRaises(ValidationError):
+            SectionPlacement.objects.create(
+                student=students[2], selected_program='STE', section=self.section, status='approved'
+            )
+
+    def test_reconcile_repairs_drift(self):
+        from django.core.management import call_command
+
+        student = make_students(1)[0]
+        SectionPlacement.objects.create(
+            student=student, selected_program='STE', section=self.section, status='approved'
+        )
+        Section.objects.filter(pk=self.section.pk).update(current_students=0)
+        Section.objects.filter(pk=self.other.pk).update(current_students=2)
+
+        call_command('reconcile_section_occupancy', stdout=open(os.devnull, 'w'))
+
+        self.assertEqual((self._count(self.section), self._count(self.other)), (1, 0))
+
+
+class DashboardSnapshotTests(TestCase):
+    """The dashboard is built with a fixed query count and dropped on writes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.program = make_program('STE', make_school_year())
+        make_section(cls.program, 'Alpha', 40)
+        students = make_students(4)
+        SectionPlacement.objects.bulk_create([
+            SectionPlacement(student=students[0], selected_program='STE', status='approved'),
+            SectionPlacement(student=students[1], selected_program='ste'),
+            SectionPlacement(student=students[2], selected_program='SPFL', status='rejected'),
+        ])
+        Notification.objects.bulk_create(
+            Notification(message=f'Student {i} confirmed STE placement', program='STE') for i in range(3)
+        )
+
+    def setUp(self):
+        invalidate_dashboard_snapshot()
+
+    def test_snapshot_queries_and_invalidation(self):
+        # teachers, students, placement aggregate, section aggregate, sections, notifications
+        with self.assertNumQueries(6):
+            snapshot = get_dashboard_snapshot()
+        with self.assertNumQueries(0):
+            get_dashboard_snapshot()
+
+        ste = next(row for row in snapshot['program_data'] if row['program'] == 'STE')
+        self.assertEqual(
+            (ste['total_applicants'], ste['approved'], ste['pending'], ste['num_sections']), (2, 1, 1, 1)
+        )
+        self.assertEqual(snapshot['total_unread'], 3)
+        self.assertEqual(len(snapshot['notifications'][0]['notification_ids']), 3)
+
+        Notification.objects.create(message='Another STE placement', program='STE')
+        self.assertEqual(get_dashboard_snapshot()['total_unread'], 4)
+
+
+class EnrollmentKeysetPaginationTests(TestCase):
+    """The enrollment list pages by (placement_date, id) and totals come from one aggregate."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user('admin@example.com', 'admin@example.com', 'pw')
+        students = make_students(7)
+        SectionPlacement.objects.bulk_create(
+            SectionPlacement(student=student, selected_program='STE') for student in students
+        )
+        # Ties on placement_date must be broken by id
+        SectionPlacement.objects.update(placement_date=timezone.now())
+        SectionPlacement.objects.filter(student=students[0]).update(status='approved')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_pages_cover_every_request_once(self):
+        url = reverse('admin_functionalities:enrollment_page')
+        seen, cursor = [], None
+        while True:
+            params = {'program': 'ste', 'status': 'all', 'limit': 3}
+            if cursor:
+                params['cursor'] = cursor
+            data = self.client.get(url, params).json()
+            seen.extend(row['id'] for row in data['results'])
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+
+        expected = list(SectionPlacement.objects.order_by('-placement_date', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_bad_cursor_is_rejected(self):
+        response = self.client.get(reverse('admin_functionalities:enrollment_page'), {'cursor': 'bogus'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_view_renders_first_page_with_totals(self):
+        response = self.client.get(reverse('admin_functionalities:enrollment'), {'limit': 5})
+
+        self.assertEqual(len(response.context['enrollments']), 5)
+        self.assertIsNotNone(response.context['next_cursor'])
+        self.assertEqual(
+            [response.context[key] for key in ('total_requests', 'approved', 'pending', 'rejected')],
+            [7, 1, 6, 0],
+        )
+
+
+class TeacherListingQueryTests(TestCase):
+    """Teacher endpoints read teachers, advisory sections and assignment counts in O(1) queries."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user('staff@example.com', 'staff@example.com', 'pw')
+        cls.program = make_program('STE', make_school_year())
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def _add_staff(self, count, prefix):
+        for teacher in make_teachers(count, prefix, is_adviser=True):
+            section = make_section(self.program, f'{prefix}-{teacher.pk}', 40)
+            Section.objects.filter(pk=section.pk).update(adviser=teacher)
+
+    def _queries(self, url_name):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse(f'admin_functionalities:{url_name}'))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def test_query_count_does_not_grow_with_staff(self):
+        self._add_staff(2, 'A')
+        names = ('sections', 'get_teachers', 'get_subject_teachers')
+        small = {name: self._queries(name)[0] for name in names}
+
+        self._add_staff(12, 'B')
+        for name in names:
+            count, _ = self._queries(name)
+            self.assertEqual(count, small[name], name)
+
+        data = self._queries('get_teachers')[1].json()
+        self.assertEqual(len(data['advisers']), 14)
+        self.assertTrue(all(adviser['isAssigned'] for adviser in data['advisers']))
+        self.assertEqual(data['subject_teachers'][0]['department'], 'Science')
+
+
+class SubjectAssignmentTests(TestCase):
+    """A program's subject-teacher matrix is validated in memory and written all-or-nothing."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.program = make_program('STE', make_school_year())
+        cls.sections = [make_section(cls.program, f'S{i}', 40) for i in range(6)]
+        cls.subjects = [
+            Subject.objects.create(program=cls.program, subject_code=f'SUB{i}', subject_name=f'Subject {i}')
+            for i in range(4)
+        ]
+        cls.teachers = make_teachers(24)
+
+    def matrix(self):
+        # Teacher (section, subject) teaches one hour a day; no teacher is double-booked
+        return [
+            {
+                'section_id': section.pk, 'subject_id': subject.pk,
+                'teacher_id': self.teachers[j * len(self.sections) + i].pk,
+                'day': 'DAILY', 'start_time': f'{8 + j:02d}:00', 'end_time': f'{9 + j:02d}:00',
+            }
+            for i, section in enumerate(self.sections)
+            for j, subject in enumerate(self.subjects)
+        ]
+
+    def test_matrix_is_written_in_constant_queries(self):
+        # savepoint, sections, subjects, teachers, schedule map, bulk insert, release
+        with self.assertNumQueries(7):
+            report = SubjectAssignmentService.bulk_assign(self.matrix())
+
+        self.assertTrue(report['success'])
+        self.assertEqual(report['created'], 24)
+        self.assertEqual(SectionSubjectAssignment.objects.count(), 24)
+
+        again = SubjectAssignmentService.bulk_assign(self.matrix())
+        self.assertEqual((again['created'], again['updated'], again['unchanged']), (0, 0, 24))
+
+    def test_conflict_blocks_the_whole_batch(self):
+        SubjectAssignmentService.bulk_assign(self.matrix())
+        busy_teacher = self.teachers[0]  # DAILY 08:00-09:00 in S0
+        extra_section = make_section(self.program, 'S-extra', 40)
+        rows = [
+            {'section_id': extra_section.pk, 'subject_id': self.subjects[1].pk, 'teacher_id': self.teachers[23].pk,
+             'day': 'TTH', 'start_time': '13:00', 'end_time': '14:00'},
+            {'section_id': extra_section.pk, 'subject_id': self.subjects[0].pk, 'teacher_id': busy_teacher.pk,
+             'day': 'MWF', 'start_time': '08:30', 'end_time': '09:30'},
+        ]
+
+        report = SubjectAssignmentService.bulk_assign(rows)
+
+        self.assertFalse(report['success'])
+        self.assertEqual([c['row'] for c in report['conflicts']], [1])
+        self.assertIn('S0', report['conflicts'][0]['message'])
+        self.assertFalse(SectionSubjectAssignment.objects.filter(section=extra_section).exists())
+
+    def test_mwf_and_tth_do_not_clash(self):
+        slots = [
+            ScheduleSlot(1, 1, 7, 'MWF', datetime.time(8), datetime.time(9), row=0),
+            ScheduleSlot(2, 1, 7, 'TTH', datetime.time(8), datetime.time(9), row=1),
+            ScheduleSlot(3, 1, 7, 'DAILY', datetime.time(8, 30), datetime.time(9, 30)),
+        ]
+        self.assertEqual(
+            sorted((new.row, other.section_id) for new, other in find_conflicts(slots)), [(0, 3), (1, 3)]
+        )
+
+
+class ProgramCatalogTests(TestCase):
+    """Warm catalog lookups cost one version check per request and see Program/Subject writes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.program = make_program('STE', make_school_year())
+        for order, code in enumerate(['SCI7', 'MATH7'], start=1):
+            Subject.objects.create(program=cls.program, subject_code=code, subject_name=code, display_order=order)
+
+    def tearDown(self):
+        _end_request()
+
+    def test_warm_lookups_are_free_and_invalidated_on_write(self):
+        catalog.program_by_name('ste')
+        _start_request()
+        with self.assertNumQueries(1):
+            self.assertEqual(catalog.program_by_name('ste').pk, self.program.pk)
+            self.assertEqual(
+                [s.subject_code for s in catalog.subjects_for_program(self.program)], ['SCI7', 'MATH7']
+            )
+            self.assertEqual(catalog.subject_by_code('MATH7').program_id, self.program.pk)
+
+        Subject.objects.create(program=self.program, subject_code='ENG7', subject_name='English', display_order=0)
+        self.assertEqual(catalog.subjects_for_program(self.program)[0].subject_code, 'ENG7')
+
+        self.program.deactivate()
+        self.assertIsNone(catalog.program_by_name('STE'))
+        self.assertEqual(catalog.program_by_name('STE', active_only=False).pk, self.program.pk)
+
+    def test_version_bumped_by_another_process_is_seen_on_the_next_request(self):
+        _start_request()
+        self.assertEqual(catalog.program_by_name('STE').pk, self.program.pk)
+
+        # Another worker's write: rows and version change without this process's signals
+        Program.objects.filter(pk=self.program.pk).update(is_active=False)
+        CatalogVersion.bump()
+        self.assertIsNotNone(catalog.program_by_name('STE'))  # same request, same version
+
+        _start_request()
+        self.assertIsNone(catalog.program_by_name('STE'))
@@ -103,6 +103,7 @@ from .views.dashboard_views import admin_dashboard
 # Enrollment views
 from .views.enrollment_views import (
     enrollment_view,
+    enrollment_page,
     mark_notification_read,
 )
 
@@ -110,6 +111,8 @@ from .views.enrollment_views import (
 from .views.student_views import (
     student_edit_view,
     StudentAcademicUpdateView,
+    ocr_job_status,
+    student_search,
 )
 
 # Settings views
@@ -133,6 +136,7 @@ from .views.section_views import (
     delete_section,
     get_section_students,
     assign_subject_teachers,
+    bulk_assign_subject_teachers,
     section_masterlist,
     get_section_subjects, 
     delete_subject, 
@@ -162,7 +166,10 @@ urlpatterns = [
     # ENROLLMENT MANAGEMENT
     # ============================================================================
     path('enrollment/', enrollment_view, name='enrollment'),
+    path('api/enrollment/page/', enrollment_page, name='enrollment_page'),
     path('enrollment/student/<int:student_id>/edit/', student_edit_view, name='student_edit'),
+    path('api/students/<int:student_id>/ocr-status/', ocr_job_status, name='ocr_job_status'),
+    path('api/students/search/', student_search, name='student_search'),
     
     # ============================================================================
     # NOTIFICATIONS
@@ -197,6 +204,7 @@ urlpatterns = [
     path('sections/<int:section_id>/students/', get_section_students, name='get_section_students'),
     path('sections/<int:section_id>/masterlist/', section_masterlist, name='section_masterlist'),
     path('sections/assign-subjects/<int:section_id>/', assign_subject_teachers, name='assign_subject_teachers'),
+    path('sections/assign-subjects/bulk/', bulk_assign_subject_teachers, name='bulk_assign_subject_teachers'),
     
     # ============================================================================
     # TEACHERS MANAGEMENT
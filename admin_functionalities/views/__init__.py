@@ -19,9 +19,10 @@ from .section_views import (
     get_section_students,
     section_masterlist,
     assign_subject_teachers,
+    bulk_assign_subject_teachers,
 )
 from .teacher_views import teachers_view
-from .enrollment_views import enrollment_view, mark_notification_read
+from .enrollment_views import enrollment_view, enrollment_page, mark_notification_read
 from .settings_views import (
     AddUserView,
     settings_view,
@@ -32,6 +33,8 @@ from .settings_views import (
 from .student_views import (
     student_edit_view,
     StudentAcademicUpdateView,
+    ocr_job_status,
+    student_search,
 )
 
 __all__ = [
@@ -50,12 +53,14 @@ __all__ = [
     'get_section_students',
     'section_masterlist',
     'assign_subject_teachers',
+    'bulk_assign_subject_teachers',
     
     # Teachers
     'teachers_view',
     
     # Enrollment
     'enrollment_view',
+    'enrollment_page',
     'mark_notification_read',
     
     # Settings
@@ -68,4 +73,6 @@ __all__ = [
     # Students
     'student_edit_view',
     'StudentAcademicUpdateView',
+    'ocr_job_status',
+    'student_search',
 ]
\ No newline at end of file
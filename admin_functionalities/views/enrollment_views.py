@@ -10,93 +10,122 @@ from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.csrf import csrf_exempt
 from django.http import JsonResponse
+from django.db.models import Count, Q
 
 from admin_functionalities.models import Notification
+from admin_functionalities.dashboard import invalidate_dashboard_snapshot
+from admin_functionalities.pagination import InvalidCursor, keyset_page, page_size_from
 from admin_functionalities.utils import log_activity
 from enrollmentprocess.models import SectionPlacement
 
 
+ENROLLMENT_FIELDS = (
+    'id',
+    'student__id',
+    'student__lrn',
+    'student__first_name',
+    'student__middle_name',
+    'student__last_name',
+    'selected_program',
+    'status',
+    'placement_date',
+)
+
+# Program display mapping
+PROGRAM_DISPLAY_NAMES = {
+    'ste': 'STE',
+    'spfl': 'SPFL',
+    'sptve': 'SPTVE',
+    'sned': 'SNED',
+    'top5': 'TOP 5',
+    'hetero': 'HETERO',
+    'ohsp': 'OHSP',
+    'regular': 'Regular',
+}
+
+
+def _enrollment_filters(request):
+    return request.GET.get('program', 'all'), request.GET.get('status', 'pending')
+
+
+def _filtered_placements(program_filter, status_filter):
+    queryset = SectionPlacement.objects.all()
+    if program_filter and program_filter != 'all':
+        queryset = queryset.filter(selected_program__iexact=program_filter)
+    if status_filter and status_filter != 'all':
+        queryset = queryset.filter(status=status_filter)
+    return queryset
+
+
+def _status_totals(program_filter):
+    """Request totals per status for the program filter, in one aggregate query."""
+    return _filtered_placements(program_filter, 'all').aggregate(
+        total_requests=Count('id'),
+        approved=Count('id', filter=Q(status='approved')),
+        pending=Count('id', filter=Q(status='pending')),
+        rejected=Count('id', filter=Q(status='rejected')),
+    )
+
+
 @login_required
 def enrollment_view(request):
     """
     Enrollment management view with proper filtering for both program and status.
+    Renders the first page; the table fetches the rest from enrollment_page.
     """
-    # Get filters from URL params
-    program_filter = request.GET.get('program', 'all')
-    status_filter = request.GET.get('status', 'pending')
-    
-    # Base query
-    queryset = SectionPlacement.objects.select_related('student').order_by('-placement_date', '-id')
-    
-    # Apply program filter
-    if program_filter and program_filter != 'all':
-        queryset = queryset.filter(selected_program__iexact=program_filter)
-    
-    # Apply status filter
-    if status_filter and status_filter != 'all':
-        queryset = queryset.filter(status=status_filter)
-    
-    # Fetch enrollments
-    enrollments = list(queryset.values(
-        'id',
-        'student__id',
-        'student__lrn',
-        'student__first_name',
-        'student__middle_name',
-        'student__last_name',
-        'selected_program',
-        'status',
-        'placement_date'
-    ))
-    
-    # Calculate stats based on current filters
-    if program_filter and program_filter != 'all':
-        stats_queryset = SectionPlacement.objects.filter(selected_program__iexact=program_filter)
-        total_requests = stats_queryset.count()
-        approved = stats_queryset.filter(status='approved').count()
-        pending = stats_queryset.filter(status='pending').count()
-        rejected = stats_queryset.filter(status='rejected').count()
-    else:
-        total_requests = SectionPlacement.objects.count()
-        approved = SectionPlacement.objects.filter(status='approved').count()
-        pending = SectionPlacement.objects.filter(status='pending').count()
-        rejected = SectionPlacement.objects.filter(status='rejected').count()
-    
-    # Program display mapping
-    PROGRAM_DISPLAY_NAMES = {
-        'ste': 'STE',
-        'spfl': 'SPFL',
-        'sptve': 'SPTVE',
-        'sned': 'SNED',
-        'top5': 'TOP 5',
-        'hetero': 'HETERO',
-        'ohsp': 'OHSP',
-        'regular': 'Regular',
-    }
-    
+    program_filter, status_filter = _enrollment_filters(request)
+
+    enrollments, next_cursor = keyset_page(
+        _filtered_placements(program_filter, status_filter).values(*ENROLLMENT_FIELDS),
+        'placement_date',
+        page_size=page_size_from(request.GET.get('limit')),
+    )
+
     # Determine display name
     if program_filter == 'all':
         display_name = 'All Programs'
     else:
         display_name = PROGRAM_DISPLAY_NAMES.get(program_filter.lower(), program_filter.upper())
-    
+
     is_filtered = (program_filter != 'all' or status_filter != 'pending')
-    
+
     context = {
         'enrollments': enrollments,
-        'total_requests': total_requests,
-        'approved': approved,
-        'pending': pending,
-        'rejected': rejected,
+        'next_cursor': next_cursor,
+        **_status_totals(program_filter),
         'program_filter': program_filter,
         'status_filter': status_filter,
         'display_name': display_name,
         'is_filtered': is_filtered,
     }
-    
+
     return render(request, 'admin_functionalities/enrollment-management.html', context)
 
 
+@login_required
+def enrollment_page(request):
+    """
+    JSON page of enrollment requests after ?cursor=, with the same program/status
+    filters as enrollment_view. Returns rows and next_cursor (null on the last page).
+    """
+    program_filter, status_filter = _enrollment_filters(request)
+    try:
+        rows, next_cursor = keyset_page(
+            _filtered_placements(program_filter, status_filter).values(*ENROLLMENT_FIELDS),
+            'placement_date',
+            cursor=request.GET.get('cursor'),
+            page_size=page_size_from(request.GET.get('limit')),
+        )
+    except InvalidCursor as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+    return JsonResponse({
+        'success': True,
+        'results': rows,
+        'next_cursor': next_cursor,
+    })
+
+
 @csrf_exempt
 def mark_notification_read(request):
     """Mark notifications as read."""
@@ -106,6 +135,7 @@ def mark_notification_read(request):
             ids = data.get('ids', [])
             if ids:
                 Notification.objects.filter(id__in=ids).update(is_read=True)
+                invalidate_dashboard_snapshot()  # update() bypasses the signals
                 log_activity(request.user, "Notifications", f"Marked {len(ids)} notification(s) as read")
                 return JsonResponse({'success': True, 'marked': len(ids)})
         except Exception as e:
@@ -10,7 +10,8 @@ from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
-from django.db.models import Count
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.http import JsonResponse
 from django.db import models
 
@@ -22,6 +23,8 @@ from admin_functionalities.models import (
     Subject
 )
 from admin_functionalities.forms import SectionForm, SubjectForm, ProgramForm
+from admin_functionalities.catalog import catalog
+from admin_functionalities.services import SubjectAssignmentService
 from admin_functionalities.utils import log_activity
 from enrollmentprocess.models import SectionPlacement, Student
 from django.contrib.auth import get_user_model
@@ -29,6 +32,36 @@ from django.contrib.auth import get_user_model
 CustomUser = get_user_model()
 
 
+def _clean_department(department):
+    """'Science Department' -> 'Science'."""
+    dept = (department or "").strip()
+    if dept.lower().endswith("department"):
+        dept = dept[:-len("department")].strip()
+    return dept.capitalize()
+
+
+def _teacher_rows(teachers):
+    """
+    Teacher dicts with their advisory section and subject assignment count,
+    read with one query (correlated subqueries, no per-teacher lookups).
+    """
+    advisory_sections = Section.objects.filter(adviser=OuterRef('pk')).order_by('name')
+    assignment_counts = (
+        SectionSubjectAssignment.objects.filter(teacher=OuterRef('pk'))
+        .order_by()
+        .values('teacher')
+        .annotate(count=Count('id'))
+        .values('count')
+    )
+    return teachers.annotate(
+        advisory_section=Subquery(advisory_sections.values('name')[:1]),
+        assignment_count=Coalesce(Subquery(assignment_counts), 0),
+    ).values(
+        'id', 'full_name', 'department', 'is_adviser', 'is_subject_teacher',
+        'advisory_section', 'assignment_count',
+    )
+
+
 @login_required
 def sections_view(request):
     """Main sections management page."""
@@ -36,14 +69,14 @@ def sections_view(request):
     
     teachers = CustomUser.objects.filter(
         models.Q(is_adviser=True) | models.Q(is_subject_teacher=True)
-    ).order_by('last_name', 'first_name')
+    ).order_by('last_name', 'first_name').values_list('id', 'username', 'last_name', 'first_name', 'middle_name')
     
     teachers_data = []
-    for teacher in teachers:
-        full_name = f"{teacher.last_name}, {teacher.first_name} {teacher.middle_name}".strip()
+    for teacher_id, username, last_name, first_name, middle_name in teachers:
+        full_name = f"{last_name}, {first_name} {middle_name}".strip()
         teachers_data.append({
-            'id': teacher.id,
-            'name': full_name if full_name else teacher.username,
+            'id': teacher_id,
+            'name': full_name if full_name else username,
         })
     
     context = {
@@ -58,32 +91,28 @@ def sections_view(request):
 @require_http_methods(["GET"])
 def get_teachers(request):
     """Returns all teachers who can be advisers and subject teachers."""
-    teachers = Teacher.objects.filter(is_active=True)
+    teachers = _teacher_rows(
+        Teacher.objects.filter(is_active=True).filter(models.Q(is_adviser=True) | models.Q(is_subject_teacher=True))
+    )
 
     adviser_list = []
     subject_teacher_list = []
 
-    assigned_adviser_ids = set(
-        Section.objects.exclude(adviser__isnull=True)
-        .values_list('adviser_id', flat=True)
-    )
-
     for t in teachers:
-        if t.is_adviser:
+        if t['is_adviser']:
             adviser_list.append({
-                "id": t.id,
-                "name": t.full_name,
-                "isAssigned": t.id in assigned_adviser_ids
+                "id": t['id'],
+                "name": t['full_name'],
+                "isAssigned": t['advisory_section'] is not None,
+                "advisorySection": t['advisory_section'],
             })
 
-        if t.is_subject_teacher:
-            dept = (t.department or "").strip()
-            if dept.lower().endswith("department"):
-                dept = dept[:-len("department")].strip()
+        if t['is_subject_teacher']:
             subject_teacher_list.append({
-                "id": t.id,
-                "name": t.full_name,
-                "department": dept.capitalize()
+                "id": t['id'],
+                "name": t['full_name'],
+                "department": _clean_department(t['department']),
+                "assignmentCount": t['assignment_count'],
             })
 
     return JsonResponse({
@@ -96,21 +125,17 @@ def get_teachers(request):
 @require_http_methods(["GET"])
 def get_subject_teachers(request):
     """Returns all active subject teachers with cleaned department names."""
-    teachers = Teacher.objects.filter(is_subject_teacher=True, is_active=True)
-
-    teacher_list = []
-    for t in teachers:
-        dept = (t.department or "").strip()
-        if dept.lower().endswith("department"):
-            dept = dept[:-len("department")].strip()
-
-        clean_department = dept.capitalize()
-
-        teacher_list.append({
-            "id": t.id,
-            "name": t.full_name,
-            "department": clean_department,
-        })
+    teachers = _teacher_rows(Teacher.objects.filter(is_subject_teacher=True, is_active=True))
+
+    teacher_list = [
+        {
+            "id": t['id'],
+            "name": t['full_name'],
+            "department": _clean_department(t['department']),
+            "assignmentCount": t['assignment_count'],
+        }
+        for t in teachers
+    ]
 
     return JsonResponse({"teachers": teacher_list})
 
@@ -139,9 +164,8 @@ def get_sections_by_program(request, program):
     """Fetch all sections for a specific program."""
     try:
         program_name = program.upper()
-        try:
-            program_instance = Program.objects.get(name=program_name, is_active=True)
-        except Program.DoesNotExist:
+        program_instance = catalog.program_by_name(program_name)
+        if program_instance is None:
             return JsonResponse({
                 'success': False, 
                 'error': f'Program "{program_name}" not found or inactive'
@@ -198,9 +222,8 @@ def add_section(request, program):
         }
 
         program_name = program.upper()
-        try:
-            program_instance = Program.objects.get(name=program_name, is_active=True)
-        except Program.DoesNotExist:
+        program_instance = catalog.program_by_name(program_name)
+        if program_instance is None:
             return JsonResponse({
                 'success': False, 
                 'message': f'Program "{program_name}" does not exist in the database.'
@@ -397,56 +420,23 @@ def assign_subject_teachers(request, section_id):
             'message': 'Invalid JSON data.'
         }, status=400)
 
-    created_count = 0
-    updated_count = 0
-    
-    for a in assignments:
-        subject_id = a.get('subject_id')
-        teacher_id = a.get('teacher_id')
-        day = a.get('day')
-        start_time = a.get('start_time')
-        end_time = a.get('end_time')
-
-        if not (subject_id and teacher_id and day and start_time and end_time):
-            continue  # Skip incomplete assignments
-
-        try:
-            subject = Subject.objects.get(id=subject_id, is_active=True)
-            teacher = Teacher.objects.get(id=teacher_id, is_active=True)
-        except (Subject.DoesNotExist, Teacher.DoesNotExist):
-            continue  # Skip if subject or teacher not found
-
-        # Check for scheduling conflicts
-        conflicts = SectionSubjectAssignment.objects.filter(
-            teacher=teacher,
-            day=day,
-            start_time__lt=end_time,
-            end_time__gt=start_time
-        ).exclude(section=section)
-
-        if conflicts.exists():
-            conflict_section = conflicts.first().section
-            return JsonResponse({
-                'success': False,
-                'message': f'{teacher.full_name} already has a class in section {conflict_section.name} at that time.'
-            }, status=400)
+    # Incomplete rows are skipped, as in the form; the rest is validated as one batch
+    rows = [
+        dict(a, section_id=section.id)
+        for a in assignments
+        if a.get('subject_id') and a.get('teacher_id') and a.get('day') and a.get('start_time') and a.get('end_time')
+    ]
+    report = SubjectAssignmentService.bulk_assign(rows)
+    if not report['success']:
+        problem = (report['conflicts'] or report['errors'])[0]
+        return JsonResponse({
+            'success': False,
+            'message': problem['message'],
+            'errors': report['errors'],
+            'conflicts': report['conflicts'],
+        }, status=400)
 
-        assignment, created = SectionSubjectAssignment.objects.update_or_create(
-            section=section,
-            subject=subject,
-            defaults={
-                'teacher': teacher,
-                'day': day,
-                'start_time': start_time,
-                'end_time': end_time
-            }
-        )
-        
-        if created:
-            created_count += 1
-        else:
-            updated_count += 1
-    
+    created_count, updated_count = report['created'], report['updated']
     log_activity(
         request.user,
         "Sections",
@@ -457,7 +447,52 @@ def assign_subject_teachers(request, section_id):
         'success': True,
         'message': f'Successfully assigned {created_count} and updated {updated_count} subject teacher(s).'
     }, status=200)
-    
+
+
+@login_required
+@csrf_exempt
+@require_http_methods(["POST"])
+def bulk_assign_subject_teachers(request):
+    """
+    Assigns a whole matrix of subject teachers (one section or a whole program).
+    Body: {"assignments": [{section_id, subject_id, teacher_id, day, start_time,
+    end_time}, ...], "dry_run": false}. All rows are validated against each other
+    and the saved schedule first; nothing is written if any row fails.
+    """
+    try:
+        body = json.loads(request.body)
+        assignments = body.get('assignments', [])
+    except (json.JSONDecodeError, AttributeError):
+        return JsonResponse({
+            'success': False,
+            'message': 'Invalid JSON data.'
+        }, status=400)
+
+    if not isinstance(assignments, list) or not assignments:
+        return JsonResponse({
+            'success': False,
+            'message': 'No assignments provided.'
+        }, status=400)
+
+    report = SubjectAssignmentService.bulk_assign(assignments, dry_run=bool(body.get('dry_run')))
+    if not report['success']:
+        return JsonResponse({
+            'message': f"{len(report['errors'])} invalid row(s), {len(report['conflicts'])} schedule conflict(s).",
+            **report,
+        }, status=400)
+
+    if not report['dry_run']:
+        log_activity(
+            request.user,
+            "Sections",
+            f"Bulk assigned {report['created']} and updated {report['updated']} subject teacher(s)"
+        )
+    return JsonResponse({
+        'message': f"Successfully assigned {report['created']} and updated {report['updated']} subject teacher(s).",
+        **report,
+    }, status=200)
+
+
 @login_required
 @require_http_methods(["GET"])
 def get_subjects_by_program(request, program):
@@ -468,18 +503,14 @@ def get_subjects_by_program(request, program):
     try:
         program_name = program.upper()
         
-        try:
-            program_instance = Program.objects.get(name=program_name, is_active=True)
-        except Program.DoesNotExist:
+        program_instance = catalog.program_by_name(program_name)
+        if program_instance is None:
             return JsonResponse({
                 'success': False,
                 'error': f'Program "{program_name}" not found or inactive'
             }, status=404)
         
-        subjects = Subject.objects.filter(
-            program=program_instance,
-            is_active=True
-        ).order_by('display_order', 'subject_name')
+        subjects = catalog.subjects_for_program(program_instance)
         
         subjects_data = [{
             'id': subject.id,
@@ -514,9 +545,8 @@ def add_subject(request, program):
     try:
         program_name = program.upper()
         
-        try:
-            program_instance = Program.objects.get(name=program_name, is_active=True)
-        except Program.DoesNotExist:
+        program_instance = catalog.program_by_name(program_name)
+        if program_instance is None:
             return JsonResponse({
                 'success': False,
                 'message': f'Program "{program_name}" does not exist.'
@@ -682,7 +712,7 @@ def get_section_subjects(request, section_id):
         section = get_object_or_404(Section, id=section_id)
         program = section.program
         
-        subjects = Subject.get_subjects_for_program(program)
+        subjects = catalog.subjects_for_program(program)
         
         subjects_data = [{
             'id': subject.id,
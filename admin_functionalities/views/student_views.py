@@ -13,9 +13,13 @@ from django.contrib import messages
 from django.db import transaction
 from django.urls import reverse_lazy, reverse
 from django.views.decorators.http import require_http_methods
+from django.http import JsonResponse
 from django.views.generic import UpdateView
 
-from enrollmentprocess.models import Student, StudentAcademic
+from enrollmentprocess.models import Student, StudentAcademic, OCRVerificationJob
+from enrollmentprocess.ocr_jobs import enqueue_ocr_verification, job_status_payload
+from enrollmentprocess.model_utils import get_cached_recommendations
+from enrollmentprocess.search import search_students
 from enrollmentprocess.forms import (
     StudentForm,
     FamilyForm,
@@ -25,6 +29,7 @@ from enrollmentprocess.forms import (
 )
 from admin_functionalities.models import StudentRequirements
 from admin_functionalities.forms import StudentRequirementsForm
+from admin_functionalities.pagination import page_size_from
 from admin_functionalities.services import SectionAssignmentService
 from admin_functionalities.utils import log_activity
 from .utils import (
@@ -322,10 +327,75 @@ def student_edit_view(request, student_id):
         "placement_form": placement_form,
         "requirements_form": requirements_form,
         "is_admin": request.user.is_staff,
+        "recommendations": _get_saved_recommendations(student),
     }
     return render(request, "admin_functionalities/student_edit.html", context)
 
 
+def _get_saved_recommendations(student):
+    """Program recommendations for the student's saved academic record (memoized), or None."""
+    academic = StudentAcademic.objects.filter(student=student).first()
+    if not academic:
+        return None
+    try:
+        return get_cached_recommendations(academic)
+    except (TypeError, ValueError) as e:
+        logger.warning(f"⚠️ Could not compute recommendations for student {student.id}: {e}")
+        return None
+
+
+@login_required
+def ocr_job_status(request, student_id):
+    """
+    Status of the background OCR verification for a student's report card.
+    Returns the latest job plus the current mismatch_fields on the academic record.
+    """
+    if not request.user.is_staff:
+        return JsonResponse({'success': False, 'error': 'Permission denied.'}, status=403)
+
+    jobs = OCRVerificationJob.objects.filter(academic__student_id=student_id).order_by('-created_at')
+    latest = jobs.first()
+    academic = StudentAcademic.objects.filter(student_id=student_id).only('mismatch_fields').first()
+
+    return JsonResponse({
+        'success': True,
+        'student_id': student_id,
+        'job': job_status_payload(latest) if latest else None,
+        'total_jobs': jobs.count(),
+        'mismatch_fields': academic.mismatch_fields if academic else {},
+    })
+
+
+@login_required
+def student_search(request):
+    """
+    Ranked student lookup by name, LRN or program code (?q=, optional ?limit=),
+    answered from the StudentSearchEntry index.
+    """
+    if not request.user.is_staff:
+        return JsonResponse({'success': False, 'error': 'Permission denied.'}, status=403)
+
+    query = request.GET.get('q', '').strip()
+    results = search_students(query, limit=page_size_from(request.GET.get('limit'), default=20))
+
+    return JsonResponse({
+        'success': True,
+        'query': query,
+        'results': [
+            {
+                'student_id': entry.student_id,
+                'lrn': entry.lrn,
+                'full_name': entry.full_name,
+                'programs': entry.programs.split(),
+                'statuses': entry.statuses.split(),
+                'overall_average': entry.overall_average,
+                'edit_url': reverse('admin_functionalities:student_edit', args=[entry.student_id]),
+            }
+            for entry in results
+        ],
+    })
+
+
 class AdminRequiredMixin(UserPassesTestMixin):
     """Mixin to ensure only admin users can access views."""
     def test_func(self):
@@ -379,7 +449,16 @@ class StudentAcademicUpdateView(AdminRequiredMixin, UpdateView):
             return self.form_invalid(form)
 
         form.instance.overall_average = form.cleaned_data.get('overall_average', 0.0)
-        return super().form_valid(form)
+        response = super().form_valid(form)
+
+        # Re-check the edited grades against the report card; an unchanged image is
+        # an OCR cache lookup (ocr_cache.py), so this costs no tesseract run
+        if self.object.report_card:
+            try:
+                enqueue_ocr_verification(self.object)
+            except Exception as e:
+                logger.error(f"❌ OCR re-verification could not be queued: {e}")
+        return response
 
     def get_success_url(self):
-        return reverse_lazy('admin_dashboard')
\ No newline at end of file
+        return reverse_lazy('admin_functionalities:admin-dashboard')
\ No newline at end of file
@@ -57,7 +57,7 @@
 from django.contrib import admin
 from django.urls import reverse
 from django.utils.html import format_html
-from .models import Family, Student, StudentNonAcademic, StudentAcademic, SectionPlacement
+from .models import Family, Student, StudentNonAcademic, StudentAcademic, SectionPlacement, OCRVerificationJob, OCRResultCache
 
 # Inline classes for related models (to edit them from the parent Student page)
 class StudentNonAcademicInline(admin.StackedInline):
@@ -222,3 +222,19 @@ class SectionPlacementAdmin(admin.ModelAdmin):
             'fields': ('student', 'selected_program', 'placement_date')
         }),
     )
+
+@admin.register(OCRVerificationJob)
+class OCRVerificationJobAdmin(admin.ModelAdmin):
+    list_display = ('academic', 'status', 'created_at', 'started_at', 'finished_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('academic__student__first_name', 'academic__student__last_name', 'academic__lrn')
+    raw_id_fields = ('academic',)  # Use ID lookup for large student lists
+    readonly_fields = ('ocr_grades', 'mismatch_fields', 'error', 'created_at', 'started_at', 'finished_at')
+
+
+@admin.register(OCRResultCache)
+class OCRResultCacheAdmin(admin.ModelAdmin):
+    list_display = ('content_hash', 'ocr_mode', 'template_name', 'template_version', 'updated_at')
+    list_filter = ('ocr_mode', 'template_name')
+    search_fields = ('content_hash',)
+    readonly_fields = ('content_hash', 'ocr_mode', 'template_name', 'template_version', 'grades', 'details', 'created_at', 'updated_at')
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class EnrollmentprocessConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "enrollmentprocess"
+
+    def ready(self):
+        import enrollmentprocess.signals
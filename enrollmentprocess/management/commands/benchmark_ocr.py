@@ -0,0 +1,84 @@
+# enrollmentprocess/management/commands/benchmark_ocr.py
+# Management command to measure per-report-card OCR latency for each cell OCR mode
+
+import contextlib
+import glob
+import io
+import os
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from enrollmentprocess.model_utils import extract_grades_from_image, OCR_CELL_MODES
+
+
+class Command(BaseCommand):
+    help = 'Benchmark extract_grades_from_image per report card (sequential vs threads vs tiled)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            type=str,
+            default=os.path.join(settings.MEDIA_ROOT, 'report_cards'),
+            help='Directory of report card images (defaults to MEDIA_ROOT/report_cards)',
+        )
+        parser.add_argument(
+            '--modes',
+            nargs='+',
+            default=list(OCR_CELL_MODES),
+            choices=OCR_CELL_MODES,
+            help='OCR cell modes to compare',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=10,
+            help='Maximum number of report cards to process',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=1,
+            help='Runs per report card per mode',
+        )
+
+    def handle(self, *args, **options):
+        files = sorted(
+            f for f in glob.glob(os.path.join(options['path'], '*'))
+            if f.lower().endswith(('.jpg', '.jpeg', '.png'))
+        )[:options['limit']]
+        if not files:
+            raise CommandError(f"No report card images found in {options['path']}")
+
+        self.stdout.write(f"Benchmarking {len(files)} report cards x {options['repeat']} run(s)...")
+
+        baseline_mode = options['modes'][0]
+        baseline = {}
+        for mode in options['modes']:
+            timings = []
+            agree = 0
+            for path in files:
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    # extract_grades_from_image is chatty; keep the report readable
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        grades = extract_grades_from_image(path, ocr_mode=mode)
+                    timings.append(time.perf_counter() - started)
+
+                if mode == baseline_mode:
+                    baseline[path] = grades
+                elif baseline.get(path) == grades:
+                    agree += 1
+
+            line = (
+                f"  {mode:<10} mean {statistics.mean(timings) * 1000:8.1f} ms  "
+                f"median {statistics.median(timings) * 1000:8.1f} ms  "
+                f"max {max(timings) * 1000:8.1f} ms per report card"
+            )
+            if mode != baseline_mode:
+                line += f"  ({agree}/{len(files)} identical to {baseline_mode})"
+            self.stdout.write(line)
+
+        self.stdout.write(self.style.SUCCESS('Benchmark complete'))
@@ -0,0 +1,30 @@
+# enrollmentprocess/management/commands/export_recommender.py
+# Management command to flatten decision_tree_models.pkl into the NumPy inference format
+
+from django.core.management.base import BaseCommand
+
+from enrollmentprocess.model_utils import model_registry, compiled_model_path
+from enrollmentprocess.tree_engine import CompiledRecommender
+
+
+class Command(BaseCommand):
+    help = 'Export the pickled decision trees to a .npz file used by the NumPy inference engine'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            type=str,
+            default=compiled_model_path,
+            help='Destination .npz path (defaults to trained-model/decision_tree_models.npz)',
+        )
+
+    def handle(self, *args, **options):
+        compiled = CompiledRecommender.from_models(model_registry.get())
+        compiled.save(options['output'])
+
+        for label, tree in compiled.trees.items():
+            self.stdout.write(f'  {label}: {len(tree.feature)} nodes, depth {tree.depth}')
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Exported {len(compiled.trees)} trees to {options['output']}")
+        )
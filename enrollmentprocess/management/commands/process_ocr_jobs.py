@@ -0,0 +1,47 @@
+# enrollmentprocess/management/commands/process_ocr_jobs.py
+# Management command to run queued report card OCR verification jobs
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from enrollmentprocess.models import OCRVerificationJob
+from enrollmentprocess.ocr_jobs import run_job
+
+
+class Command(BaseCommand):
+    help = 'Process queued OCR verification jobs (e.g. jobs left behind by a restarted worker)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retry-failed',
+            action='store_true',
+            help='Re-queue failed jobs before processing',
+        )
+        parser.add_argument(
+            '--stale-minutes',
+            type=int,
+            default=30,
+            help='Re-queue jobs stuck in "running" for longer than this many minutes',
+        )
+
+    def handle(self, *args, **options):
+        if options.get('retry_failed'):
+            requeued = OCRVerificationJob.objects.filter(status='failed').update(status='queued', error='')
+            self.stdout.write(f'Re-queued {requeued} failed jobs')
+
+        stale_before = timezone.now() - timedelta(minutes=options['stale_minutes'])
+        stale = OCRVerificationJob.objects.filter(status='running', started_at__lt=stale_before).update(status='queued')
+        if stale:
+            self.stdout.write(f'Re-queued {stale} stale running jobs')
+
+        processed = 0
+        for job_id in OCRVerificationJob.objects.filter(status='queued').order_by('created_at').values_list('id', flat=True):
+            if run_job(job_id):
+                processed += 1
+
+        failed = OCRVerificationJob.objects.filter(status='failed').count()
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully processed {processed} OCR verification jobs ({failed} failed in total)')
+        )
@@ -0,0 +1,38 @@
+# enrollmentprocess/management/commands/rebuild_student_search.py
+# Management command to rebuild the student search index and time a few lookups
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from enrollmentprocess.search import rebuild_search_index, search_students
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild StudentSearchEntry rows from Student, StudentAcademic and SectionPlacement '
+        '(run once after migrating, then after bulk imports or raw SQL edits; signals and '
+        'bulk_assign_program keep them current otherwise)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--query',
+            action='append',
+            default=[],
+            help='Time this search after rebuilding (repeatable)',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        written = rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {written} students in {time.perf_counter() - started:.1f} s"
+        ))
+
+        for query in options['query']:
+            started = time.perf_counter()
+            results = search_students(query)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            top = results[0].full_name if results else '-'
+            self.stdout.write(f"  {query!r}: {len(results)} results in {elapsed_ms:.1f} ms (top: {top})")
@@ -0,0 +1,67 @@
+# enrollmentprocess/management/commands/register_ocr_template.py
+# Management command to add a report card layout to the OCR template registry
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from enrollmentprocess.model_utils import binarize_report_card
+from enrollmentprocess.ocr_cache import purge_stale_results
+from enrollmentprocess.ocr_templates import ReportCardTemplate, template_registry
+
+
+class Command(BaseCommand):
+    help = (
+        'Register a report card layout for OCR from a reference image and the pixel boxes '
+        'drawn on it with generate_bounding_boxes.py'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', type=str, help='Template name (file name in report_card_templates/)')
+        parser.add_argument('--image', type=str, required=True, help='Reference report card image')
+        parser.add_argument(
+            '--boxes',
+            type=str,
+            default='final_grade_bounding_boxes.json',
+            help='Pixel boxes JSON {field: [x, y, w, h]} measured on --image',
+        )
+        parser.add_argument('--description', type=str, default='')
+        parser.add_argument('--overwrite', action='store_true', help='Replace an existing template')
+
+    def handle(self, *args, **options):
+        import cv2
+
+        img = cv2.imread(options['image'])
+        if img is None:
+            raise CommandError(f"Could not read image {options['image']}")
+
+        try:
+            with open(options['boxes']) as f:
+                pixel_boxes = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Could not read boxes from {options['boxes']}: {e}")
+
+        template = ReportCardTemplate.from_pixel_boxes(
+            options['name'], pixel_boxes, binarize_report_card(img), options['description']
+        )
+        try:
+            path = template_registry.save(template, overwrite=options['overwrite'])
+        except FileExistsError:
+            raise CommandError(f"Template '{options['name']}' exists; pass --overwrite to replace it")
+
+        # Cached results read with the old boxes of this template are no longer valid
+        purged = purge_stale_results(template.name)
+        if purged:
+            self.stdout.write(f"  purged {purged} cached OCR results read with the previous version")
+
+        # Sanity check: the reference image should pick its own template
+        matched, score = template_registry.match(binarize_report_card(img))
+        self.stdout.write(f"  reference image matches '{matched.name}' (score {score:.2f})")
+        if matched.name != template.name:
+            self.stdout.write(self.style.WARNING(
+                f"  '{template.name}' is not the best match for its own reference image"
+            ))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Saved template '{template.name}' ({len(template.boxes)} cells, version {template.version}) to {path}"
+        ))
@@ -0,0 +1,64 @@
+# enrollmentprocess/management/commands/rescore_applicants.py
+# Management command to re-run the program recommender for a whole school year in one pass
+
+from collections import Counter
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from admin_functionalities.models import SchoolYear
+from enrollmentprocess.models import StudentAcademic
+from enrollmentprocess.model_utils import predict_eligibility_for_academics
+
+
+class Command(BaseCommand):
+    help = 'Re-score program eligibility for every applicant of a school year (one vectorized predict per model)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--school-year',
+            type=str,
+            help='School year name (e.g. 2025-2026). Defaults to the current school year.',
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Re-score every StudentAcademic record regardless of school year',
+        )
+
+    def handle(self, *args, **options):
+        queryset = StudentAcademic.objects.all()
+
+        if not options.get('all'):
+            school_year_name = options.get('school_year')
+            if school_year_name:
+                school_year = SchoolYear.objects.filter(name=school_year_name).first()
+            else:
+                school_year = SchoolYear.get_current()
+
+            if not school_year:
+                raise CommandError('School year not found. Use --school-year NAME or --all.')
+
+            # Enrollment for a school year opens in the calendar year its classes start
+            window_start = date(school_year.start_date.year, 1, 1)
+            queryset = queryset.filter(
+                student__section_placements__placement_date__date__range=(window_start, school_year.end_date)
+            ).distinct()
+            self.stdout.write(f'Re-scoring applicants for school year {school_year.name}...')
+
+        results = predict_eligibility_for_academics(queryset.order_by('student_id'))
+
+        eligible_counts = Counter()
+        for student_id, recommendations in results.items():
+            for label, verdict in recommendations.items():
+                if verdict == 'Eligible':
+                    eligible_counts[label] += 1
+            if options['verbosity'] >= 2:
+                self.stdout.write(f'  Student {student_id}: {recommendations}')
+
+        for label, count in sorted(eligible_counts.items()):
+            self.stdout.write(f'  {label}: {count} eligible')
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully re-scored {len(results)} applicants')
+        )
@@ -0,0 +1,252 @@
+# enrollmentprocess/management/commands/reverify_report_cards.py
+# Management command to re-run OCR verification over every stored report card
+
+import contextlib
+import io
+import multiprocessing
+import os
+import time
+from itertools import islice
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+
+from enrollmentprocess.model_utils import extract_grades_from_image, OCR_CELL_MODES
+from enrollmentprocess.models import OCRResultCache, StudentAcademic
+from enrollmentprocess.ocr_cache import image_content_hash, is_current, result_mode
+from enrollmentprocess.ocr_jobs import COMPARE_FIELDS, find_grade_mismatches
+
+
+def _init_worker():
+    # Needed when the pool spawns instead of forks; a no-op for forked workers
+    import django
+    django.setup()
+
+
+def _read_report_card(task):
+    """Pool worker: OCR one image. No database access happens in the workers."""
+    academic_id, content_hash, data, ocr_mode = task
+    started = time.perf_counter()
+    details = {}
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            grades = extract_grades_from_image(data, ocr_mode=ocr_mode, debug=False, details=details)
+    except Exception as e:
+        return {'academic_id': academic_id, 'error': f"{type(e).__name__}: {e}"}
+    return {
+        'academic_id': academic_id,
+        'content_hash': content_hash,
+        'grades': grades,
+        'details': details,
+        'seconds': time.perf_counter() - started,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Re-read every StudentAcademic report card with OCR on a process pool, refresh '
+        'mismatch_fields in bulk and print a throughput/accuracy summary'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='OCR worker processes (defaults to the CPU count; 1 reads in this process)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help='Report cards read into memory and written back per batch',
+        )
+        parser.add_argument('--limit', type=int, help='Only process the first N records')
+        parser.add_argument(
+            '--mode',
+            choices=OCR_CELL_MODES,
+            default='sequential',
+            help='Cell OCR mode inside each worker (the pool already provides the parallelism)',
+        )
+        parser.add_argument(
+            '--use-cache',
+            action='store_true',
+            help='Reuse cached OCR results whose template is unchanged instead of re-reading them',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would change without writing mismatch_fields or the OCR cache',
+        )
+
+    def handle(self, *args, **options):
+        queryset = (
+            StudentAcademic.objects.exclude(report_card='')
+            .exclude(report_card__isnull=True)
+            .order_by('pk')
+            .values_list('pk', 'report_card')
+        )
+        if options['limit']:
+            queryset = queryset[:options['limit']]
+
+        self.stats = {
+            'records': 0, 'ocr_runs': 0, 'cache_hits': 0, 'errors': 0, 'unreadable': 0,
+            'cells': 0, 'cells_recognized': 0, 'fallback_cards': 0, 'fallback_fields': 0,
+            'fallback_recovered': 0, 'fields_compared': 0, 'fields_mismatched': 0,
+            'records_with_mismatches': 0, 'records_changed': 0, 'ocr_seconds': 0.0,
+        }
+        self.dry_run = options['dry_run']
+
+        if options['workers'] > 1:
+            # Workers must not inherit the parent's open database connections
+            connections.close_all()
+            pool_context = multiprocessing.Pool(options['workers'], initializer=_init_worker)
+        else:
+            pool_context = contextlib.nullcontext()
+        started = time.perf_counter()
+        with pool_context as pool:
+            rows = queryset.iterator(chunk_size=options['batch_size'])
+            while True:
+                batch = list(islice(rows, options['batch_size']))
+                if not batch:
+                    break
+                self._process_batch(batch, pool, options)
+                self.stdout.write(f"  ...{self.stats['records']} records")
+        elapsed = time.perf_counter() - started
+
+        self._print_summary(elapsed, options['workers'])
+
+    def _process_batch(self, batch, pool, options):
+        self.stats['records'] += len(batch)
+        tasks = []
+        for academic_id, name in batch:
+            try:
+                with default_storage.open(name, 'rb') as f:
+                    data = f.read()
+            except Exception as e:
+                self.stats['errors'] += 1
+                self.stderr.write(f"  academic {academic_id}: cannot open {name}: {e}")
+                continue
+            tasks.append((academic_id, image_content_hash(data), data, options['mode']))
+
+        results = []
+        if options['use_cache']:
+            entries = {
+                entry.content_hash: entry
+                for entry in OCRResultCache.objects.filter(
+                    content_hash__in=[content_hash for _, content_hash, _, _ in tasks],
+                    ocr_mode=result_mode(options['mode']),
+                )
+            }
+            pending = []
+            for task in tasks:
+                entry = entries.get(task[1])
+                if entry is not None and is_current(entry):
+                    results.append({
+                        'academic_id': task[0], 'content_hash': task[1],
+                        'grades': entry.grades, 'details': entry.details, 'cached': True,
+                    })
+                else:
+                    pending.append(task)
+            tasks = pending
+
+        if pool is None:
+            results.extend(map(_read_report_card, tasks))
+        else:
+            results.extend(pool.imap_unordered(_read_report_card, tasks, chunksize=1))
+        self._apply_results(results, result_mode(options['mode']))
+
+    def _apply_results(self, results, ocr_mode):
+        academics = StudentAcademic.objects.only('pk', 'mismatch_fields', *COMPARE_FIELDS).in_bulk(
+            [r['academic_id'] for r in results]
+        )
+        changed = []
+        cache_rows = {}  # by content hash: the same image may be attached to several records
+        for result in results:
+            if 'error' in result:
+                self.stats['errors'] += 1
+                self.stderr.write(f"  academic {result['academic_id']}: {result['error']}")
+                continue
+
+            details = result['details']
+            if not details:
+                self.stats['unreadable'] += 1
+                continue
+
+            if result.get('cached'):
+                self.stats['cache_hits'] += 1
+            else:
+                self.stats['ocr_runs'] += 1
+                self.stats['ocr_seconds'] += result['seconds']
+                cache_rows[result['content_hash']] = OCRResultCache(
+                    content_hash=result['content_hash'],
+                    ocr_mode=ocr_mode,
+                    template_name=details['template'],
+                    template_version=details['template_version'],
+                    grades=result['grades'],
+                    details=details,
+                )
+
+            self.stats['cells'] += details['cells']
+            self.stats['cells_recognized'] += details['cells_recognized']
+            if details['fallback_fields']:
+                self.stats['fallback_cards'] += 1
+            self.stats['fallback_fields'] += len(details['fallback_fields'])
+            self.stats['fallback_recovered'] += len(details['fallback_recovered'])
+
+            academic = academics.get(result['academic_id'])
+            if academic is None:
+                continue
+            grades = result['grades']
+            self.stats['fields_compared'] += sum(
+                1 for field in COMPARE_FIELDS
+                if getattr(academic, field, None) is not None and grades.get(field) is not None
+            )
+            mismatches = find_grade_mismatches(academic, grades)
+            self.stats['fields_mismatched'] += len(mismatches)
+            if mismatches:
+                self.stats['records_with_mismatches'] += 1
+            if mismatches != (academic.mismatch_fields or {}):
+                academic.mismatch_fields = mismatches
+                changed.append(academic)
+
+        self.stats['records_changed'] += len(changed)
+        if self.dry_run:
+            return
+
+        with transaction.atomic():
+            # bulk_update skips post_save, so cached recommendations are left alone
+            # (mismatch_fields is not a model feature)
+            StudentAcademic.objects.bulk_update(changed, ['mismatch_fields'], batch_size=500)
+            OCRResultCache.objects.bulk_create(
+                list(cache_rows.values()),
+                update_conflicts=True,
+                unique_fields=['content_hash', 'ocr_mode'],
+                update_fields=['template_name', 'template_version', 'grades', 'details'],
+            )
+
+    def _print_summary(self, elapsed, workers):
+        s = self.stats
+
+        def pct(part, whole):
+            return f"{100.0 * part / whole:.1f}%" if whole else "n/a"
+
+        read = s['ocr_runs'] + s['cache_hits']
+        self.stdout.write("")
+        self.stdout.write(f"Report cards:        {s['records']} ({s['ocr_runs']} OCR'd, {s['cache_hits']} from cache, "
+                          f"{s['unreadable']} unreadable, {s['errors']} errors)")
+        self.stdout.write(f"Wall time:           {elapsed:.1f} s with {workers} workers "
+                          f"({s['records'] / elapsed if elapsed else 0:.2f} cards/s)")
+        if s['ocr_runs']:
+            self.stdout.write(f"OCR time per card:   {s['ocr_seconds'] / s['ocr_runs']:.2f} s (mean, per worker)")
+        self.stdout.write(f"Cells recognized:    {s['cells_recognized']}/{s['cells']} ({pct(s['cells_recognized'], s['cells'])}) "
+                          f"on the per-cell path")
+        self.stdout.write(f"Fallback rate:       {s['fallback_cards']}/{read} cards ({pct(s['fallback_cards'], read)}); "
+                          f"{s['fallback_recovered']}/{s['fallback_fields']} fields recovered by full-page OCR")
+        self.stdout.write(f"Grade agreement:     {s['fields_compared'] - s['fields_mismatched']}/{s['fields_compared']} "
+                          f"fields ({pct(s['fields_compared'] - s['fields_mismatched'], s['fields_compared'])})")
+        self.stdout.write(f"Mismatches:          {s['fields_mismatched']} fields on {s['records_with_mismatches']} records")
+
+        verb = 'would change' if self.dry_run else 'updated'
+        self.stdout.write(self.style.SUCCESS(f"mismatch_fields {verb} on {s['records_changed']} records"))
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('enrollmentprocess', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OCRVerificationJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], db_index=True, default='queued', max_length=10)),
+                ('ocr_grades', models.JSONField(blank=True, default=dict, verbose_name='OCR Extracted Grades')),
+                ('mismatch_fields', models.JSONField(blank=True, default=dict, verbose_name='Detected mismatched fields')),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('academic', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ocr_jobs', to='enrollmentprocess.studentacademic', verbose_name='Academic Record')),
+            ],
+            options={
+                'verbose_name': 'OCR Verification Job',
+                'verbose_name_plural': 'OCR Verification Jobs',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('enrollmentprocess', '0002_ocrverificationjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OCRResultCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64, unique=True)),
+                ('template_name', models.CharField(blank=True, db_index=True, max_length=100)),
+                ('template_version', models.CharField(max_length=120)),
+                ('grades', models.JSONField(blank=True, default=dict, verbose_name='OCR Extracted Grades')),
+                ('details', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'OCR Result Cache Entry',
+                'verbose_name_plural': 'OCR Result Cache',
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_functionalities', '0003_alter_section_program_and_more'),
+        ('enrollmentprocess', '0003_ocrresultcache'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sectionplacement',
+            index=models.Index(fields=['-placement_date', '-id'], name='placement_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sectionplacement',
+            index=models.Index(fields=['status', '-placement_date', '-id'], name='placement_status_date_id_idx'),
+        ),
+    ]
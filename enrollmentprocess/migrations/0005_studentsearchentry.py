@@ -0,0 +1,83 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Existing students are indexed by `manage.py rebuild_student_search`, not here,
+# so this migration does not depend on enrollmentprocess.search
+ENTRY_TABLE = 'enrollmentprocess_studentsearchentry'
+SQLITE_FTS_TABLE = 'student_search_fts'
+
+POSTGRES_INDEX_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"CREATE INDEX IF NOT EXISTS student_search_document_trgm ON {ENTRY_TABLE} USING gin (document gin_trgm_ops)",
+]
+SQLITE_INDEX_SQL = [
+    # External-content FTS5 table over the entry table, kept in step by triggers
+    f"CREATE VIRTUAL TABLE {SQLITE_FTS_TABLE} USING fts5("
+    f"document, content='{ENTRY_TABLE}', content_rowid='student_id', tokenize='trigram')",
+    f"CREATE TRIGGER {SQLITE_FTS_TABLE}_ai AFTER INSERT ON {ENTRY_TABLE} BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, document) VALUES (new.student_id, new.document); END",
+    f"CREATE TRIGGER {SQLITE_FTS_TABLE}_ad AFTER DELETE ON {ENTRY_TABLE} BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, document) VALUES ('delete', old.student_id, old.document); END",
+    f"CREATE TRIGGER {SQLITE_FTS_TABLE}_au AFTER UPDATE ON {ENTRY_TABLE} BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, document) VALUES ('delete', old.student_id, old.document); "
+    f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, document) VALUES (new.student_id, new.document); END",
+]
+
+
+def _sqlite_has_fts_trigram(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5'), sqlite_version()")
+        fts5, version = cursor.fetchone()
+    return bool(fts5) and tuple(int(part) for part in version.split('.')) >= (3, 34)
+
+
+def create_search_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        statements = POSTGRES_INDEX_SQL
+    elif connection.vendor == 'sqlite' and _sqlite_has_fts_trigram(connection):
+        statements = SQLITE_INDEX_SQL
+    else:
+        return  # search.py falls back to LIKE
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_search_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS student_search_document_trgm")
+    elif connection.vendor == 'sqlite':
+        for suffix in ('ai', 'ad', 'au'):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_{suffix}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {SQLITE_FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('enrollmentprocess', '0004_sectionplacement_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentSearchEntry',
+            fields=[
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_entry', serialize=False, to='enrollmentprocess.student')),
+                ('lrn', models.CharField(db_index=True, max_length=12)),
+                ('full_name', models.CharField(max_length=320)),
+                ('programs', models.CharField(blank=True, max_length=255)),
+                ('statuses', models.CharField(blank=True, max_length=255)),
+                ('overall_average', models.FloatField(blank=True, null=True)),
+                ('document', models.TextField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Student Search Entry',
+                'verbose_name_plural': 'Student Search Entries',
+            },
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
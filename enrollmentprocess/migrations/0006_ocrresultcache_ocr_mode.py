@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('enrollmentprocess', '0005_studentsearchentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ocrresultcache',
+            name='ocr_mode',
+            field=models.CharField(default='sequential', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='ocrresultcache',
+            name='content_hash',
+            field=models.CharField(max_length=64),
+        ),
+        migrations.AlterUniqueTogether(
+            name='ocrresultcache',
+            unique_together={('content_hash', 'ocr_mode')},
+        ),
+    ]
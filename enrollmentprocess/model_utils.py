@@ -104,19 +104,140 @@
 #         return {}
    
 import os
+import hashlib
 import pickle
-import pandas as pd
-import cv2
-import pytesseract
-from PIL import Image, ImageEnhance
-import numpy as np
 import re
+import threading
+import time
+import logging
+
+from django.core.cache import cache
+
+from .ocr_templates import template_registry
+
+# pandas, cv2 and pytesseract are imported inside the functions that need them so
+# worker boot, management commands and tests don't pay for them unless a prediction
+# or OCR call actually happens.
+
+logger = logging.getLogger(__name__)
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 model_path = os.path.join(BASE_DIR, 'trained-model', 'decision_tree_models.pkl')
+# Flattened NumPy export of the same trees (see tree_engine.py / export_recommender)
+compiled_model_path = os.path.join(BASE_DIR, 'trained-model', 'decision_tree_models.npz')
+
+
+class ModelRegistry:
+    """
+    Process-wide holder for the pickled decision tree models.
 
-with open(model_path, 'rb') as f:
-    models = pickle.load(f)
+    - Loads on first use instead of at import time
+    - Keeps one copy per process (thread-safe)
+    - Reloads automatically when the pickle's mtime changes (hot-swap a retrained model)
+    - Records load time and memory footprint for each load
+    - Serves a compiled NumPy version of the trees for fast inference
+    """
+
+    def __init__(self, path, compiled_path=None):
+        self.path = path
+        self.compiled_path = compiled_path
+        self._lock = threading.RLock()
+        self._models = None
+        self._mtime = None
+        self._compiled = None
+        self._compiled_mtime = None
+        self.load_seconds = None
+        self.memory_bytes = None
+        self.loaded_at = None
+
+    def get(self):
+        """Return the {label: model} dict, loading or reloading it if needed."""
+        mtime = os.stat(self.path).st_mtime_ns
+        if self._models is None or mtime != self._mtime:
+            with self._lock:
+                if self._models is None or mtime != self._mtime:
+                    self._load(mtime)
+        return self._models
+
+    def _load(self, mtime):
+        started = time.perf_counter()
+        with open(self.path, 'rb') as f:
+            loaded = pickle.load(f)
+        self.load_seconds = time.perf_counter() - started
+
+        reloaded = self._models is not None
+        self._models = loaded
+        self._mtime = mtime
+        self.memory_bytes = self._estimate_nbytes(loaded)
+        self.loaded_at = time.time()
+
+        logger.info(
+            "%s %d decision tree models from %s in %.1f ms (~%.1f KiB)",
+            "Reloaded" if reloaded else "Loaded",
+            len(loaded), self.path, self.load_seconds * 1000, self.memory_bytes / 1024,
+        )
+
+    def get_compiled(self):
+        """
+        Return the CompiledRecommender for the current pickle.
+        Uses the exported .npz when it is at least as new as the pickle
+        (no sklearn import), otherwise compiles from the loaded models.
+        """
+        mtime = os.stat(self.path).st_mtime_ns
+        if self._compiled is None or mtime != self._compiled_mtime:
+            with self._lock:
+                if self._compiled is None or mtime != self._compiled_mtime:
+                    self._compiled = self._build_compiled(mtime)
+                    self._compiled_mtime = mtime
+        return self._compiled
+
+    def _build_compiled(self, mtime):
+        from .tree_engine import CompiledRecommender
+
+        if (self.compiled_path and os.path.exists(self.compiled_path)
+                and os.stat(self.compiled_path).st_mtime_ns >= mtime):
+            logger.info("Using exported decision trees from %s", self.compiled_path)
+            return CompiledRecommender.load(self.compiled_path)
+        return CompiledRecommender.from_models(self.get())
+
+    def _estimate_nbytes(self, loaded):
+        """Sum of the fitted arrays held by the models (falls back to the pickle size)."""
+        total = 0
+        for model in loaded.values():
+            arrays = list(vars(model).values())
+            tree = getattr(model, 'tree_', None)
+            if tree is not None:
+                arrays.extend(tree.__getstate__().values())
+            total += sum(getattr(value, 'nbytes', 0) for value in arrays)
+        return total or os.path.getsize(self.path)
+
+    @property
+    def version(self):
+        """Identifier of the current pickle (changes whenever the file is replaced)."""
+        return str(os.stat(self.path).st_mtime_ns)
+
+    def stats(self):
+        """Load metrics for diagnostics/admin pages."""
+        return {
+            'path': self.path,
+            'loaded': self._models is not None,
+            'compiled': self._compiled is not None,
+            'version': str(self._mtime) if self._mtime is not None else None,
+            'labels': list(self._models) if self._models is not None else [],
+            'load_seconds': self.load_seconds,
+            'memory_bytes': self.memory_bytes,
+            'loaded_at': self.loaded_at,
+        }
+
+
+model_registry = ModelRegistry(model_path, compiled_model_path)
+
+
+def __getattr__(name):
+    # Backwards compatibility: `model_utils.models` used to be a module-level dict
+    if name == 'models':
+        return model_registry.get()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 feature_columns = ['dost_exam_result', 'filipino grade', 'English grade', 'mathematics grade',
                    'science grade', 'araling panlipunan grade', 'Edukasyon sa pagpapakatao grade',
@@ -146,6 +267,8 @@ SUBJECT_MAPPING = {
     'edukasyon_pagpapakatao': ['Good Manners and Right Conduct', 'GMRC', 'Edukasyon sa Pagpapakatao'],
 }
 
+# Pixel boxes on the 1059x2048 reference scan; report_card_templates/default.json holds
+# the same cells normalized. Only used directly when no templates are installed.
 FINAL_GRADE_BOUNDING_BOXES = {
     'mathematics': (703, 402, 124, 79),
     'araling_panlipunan': (703, 487, 129, 93),
@@ -158,53 +281,313 @@ FINAL_GRADE_BOUNDING_BOXES = {
     # Add/adjust if more subjects or different layout
 }
 
-def predict_program_eligibility(input_data):
-    # Convert dost_exam_result string to numeric if needed
-    dost_result = input_data.get('dost_exam_result')
-    if isinstance(dost_result, str):
-        input_data['dost_exam_result'] = DOST_RESULT_MAPPING.get(dost_result.lower(), 0)
+# StudentAcademic fields in the same order as feature_columns
+ACADEMIC_FEATURE_FIELDS = ['dost_exam_result', 'filipino', 'english', 'mathematics',
+                           'science', 'araling_panlipunan', 'edukasyon_pagpapakatao',
+                           'edukasyon_pangkabuhayan', 'mapeh', 'overall_average']
 
+
+def _encode_dost_result(value):
+    """Convert a dost_exam_result string ('passed', 'failed', ...) to the numeric model input."""
+    if isinstance(value, str):
+        return DOST_RESULT_MAPPING.get(value.lower(), 0)
+    return value
+
+
+def _to_feature_row(input_data):
+    """Normalize a dict keyed by feature_columns (or a plain sequence) into a feature list."""
     if isinstance(input_data, dict):
-        input_list = [input_data[col] for col in feature_columns]
+        row = [input_data[col] for col in feature_columns]
     else:
-        input_list = input_data
+        row = list(input_data)
+    row[0] = _encode_dost_result(row[0])
+    return row
+
+
+def academic_feature_row(academic):
+    """Feature row (feature_columns order) for a single StudentAcademic instance."""
+    return _to_feature_row([getattr(academic, field) for field in ACADEMIC_FEATURE_FIELDS])
+
+
+def academic_feature_rows(queryset):
+    """
+    Pull model inputs straight from a StudentAcademic queryset in a single query.
+    Returns (student_ids, rows) where rows[i] is the feature row of student_ids[i].
+    """
+    student_ids = []
+    rows = []
+    for student_id, *values in queryset.values_list('student_id', *ACADEMIC_FEATURE_FIELDS):
+        student_ids.append(student_id)
+        rows.append(_to_feature_row(values))
+    return student_ids, rows
+
+
+def predict_program_eligibility_batch(input_rows, engine='numpy'):
+    """
+    Score many applicants with one vectorized predict per model.
+
+    input_rows: list of dicts keyed by feature_columns, list of feature lists,
+    or a 2-D array with columns in feature_columns order.
+    engine: 'numpy' walks the compiled trees (tree_engine.py);
+    'sklearn' runs the pickled estimators on a DataFrame.
+    Returns a list of recommendation dicts (same shape as predict_program_eligibility)
+    in input order.
+    """
+    rows = [_to_feature_row(row) for row in input_rows]
+    if not rows:
+        return []
+
+    if engine == 'sklearn':
+        import pandas as pd
 
-    df = pd.DataFrame([input_list], columns=feature_columns)
+        df = pd.DataFrame(rows, columns=feature_columns)
+        predictions = {label: model.predict(df) for label, model in model_registry.get().items()}
+    else:
+        predictions = model_registry.get_compiled().predict(rows)
 
-    # recommendations = {}
-    # for label, model in models.items():
-    #     prediction = model.predict(df)[0]
-    #     recommendations[label] = "Eligible" if prediction == 1 else "Not Eligible"
-    recommendations = {}
-    for label, model in models.items():
+    results = [{} for _ in rows]
+    for label, label_predictions in predictions.items():
         # If label is exactly "Top 5", rename it to "Top5"
         if label == "top 5":
             label = "top5"
 
-        prediction = model.predict(df)[0]
-        recommendations[label] = "Eligible" if prediction == 1 else "Not Eligible"
+        for recommendations, prediction in zip(results, label_predictions):
+            recommendations[label] = "Eligible" if prediction == 1 else "Not Eligible"
+
+    return results
+
+
+def predict_eligibility_for_academics(queryset):
+    """
+    Score every StudentAcademic in the queryset in one pass.
+    Returns {student_id: recommendations}.
+    """
+    student_ids, rows = academic_feature_rows(queryset)
+    return dict(zip(student_ids, predict_program_eligibility_batch(rows)))
+
+
+# Memoized recommendations per StudentAcademic. The stored fingerprint covers the ten
+# feature values plus the model version, so an edited record or a retrained pickle
+# never serves a stale result; saving/deleting the record also drops the entry
+# (see signals.py).
+ELIGIBILITY_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def eligibility_cache_key(student_id):
+    return f"eligibility:{student_id}"
+
+
+def academic_fingerprint(row, version=None):
+    """Hash of a feature row plus the model version."""
+    if version is None:
+        version = model_registry.version
+    payload = "|".join(repr(float(value)) for value in row) + f"|{version}"
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def get_cached_recommendations(academic):
+    """
+    Recommendations for a StudentAcademic, computed at most once per
+    (feature values, model version) and shared by every view that shows them.
+    """
+    row = academic_feature_row(academic)
+    fingerprint = academic_fingerprint(row)
+    key = eligibility_cache_key(academic.pk)
 
+    cached = cache.get(key)
+    if cached and cached.get('fingerprint') == fingerprint:
+        return cached['recommendations']
+
+    recommendations = predict_program_eligibility_batch([row])[0]
+    cache.set(key, {'fingerprint': fingerprint, 'recommendations': recommendations}, ELIGIBILITY_CACHE_TIMEOUT)
     return recommendations
 
-def extract_grades_from_image(image_source):
+
+def invalidate_cached_recommendations(student_id):
+    cache.delete(eligibility_cache_key(student_id))
+
+
+def predict_program_eligibility(input_data):
+    # Convert dost_exam_result string to numeric if needed
+    dost_result = input_data.get('dost_exam_result')
+    if isinstance(dost_result, str):
+        input_data['dost_exam_result'] = DOST_RESULT_MAPPING.get(dost_result.lower(), 0)
+
+    return predict_program_eligibility_batch([input_data])[0]
+
+# OCR (PSM 7 for single line – better for partials)
+CELL_OCR_CONFIG = r'--oem 3 --psm 7 -c tessedit_char_whitelist=0123456789. --dpi 300'
+# Tiled mode: all cells in one image, read as a block of lines
+TILED_OCR_CONFIG = r'--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789. --dpi 300'
+TILE_PADDING = 24
+
+# How the grade cells are sent to tesseract:
+#   'sequential' - one tesseract process per cell, one after another
+#   'threads'    - one process per cell, run concurrently on a bounded thread pool
+#   'tiled'      - all cells stitched into one image, a single tesseract call,
+#                  words mapped back to cells by vertical position
+OCR_CELL_MODES = ('sequential', 'threads', 'tiled')
+OCR_CELL_MODE = 'threads'
+OCR_CELL_WORKERS = 4
+
+
+def _ocr_cell(cropped):
+    import pytesseract
+
+    return pytesseract.image_to_string(cropped, config=CELL_OCR_CONFIG).strip()
+
+
+def _ocr_cells_tiled(crops):
+    """Stack the crops vertically on a white canvas and OCR them with one tesseract call."""
+    import numpy as np
+    import pytesseract
+
+    width = max(cropped.shape[1] for cropped in crops.values()) + 2 * TILE_PADDING
+    height = sum(cropped.shape[0] for cropped in crops.values()) + TILE_PADDING * (len(crops) + 1)
+    canvas = np.full((height, width), 255, dtype=np.uint8)
+
+    spans = {}
+    top = TILE_PADDING
+    for field_key, cropped in crops.items():
+        h, w = cropped.shape[:2]
+        canvas[top:top + h, TILE_PADDING:TILE_PADDING + w] = cropped
+        spans[field_key] = (top, top + h)
+        top += h + TILE_PADDING
+
+    data = pytesseract.image_to_data(canvas, config=TILED_OCR_CONFIG, output_type=pytesseract.Output.DICT)
+
+    words = {field_key: [] for field_key in crops}
+    for text, word_top, word_height in zip(data['text'], data['top'], data['height']):
+        text = text.strip()
+        if not text:
+            continue
+        center = word_top + word_height / 2
+        for field_key, (span_top, span_bottom) in spans.items():
+            if span_top - TILE_PADDING / 2 <= center < span_bottom + TILE_PADDING / 2:
+                words[field_key].append(text)
+                break
+
+    return {field_key: ''.join(parts) for field_key, parts in words.items()}
+
+
+def _ocr_grade_cells(crops, mode):
+    """OCR each cropped grade cell. Returns {field_key: raw text}."""
+    if not crops:
+        return {}
+    if mode == 'tiled':
+        return _ocr_cells_tiled(crops)
+    if mode == 'threads' and len(crops) > 1:
+        from concurrent.futures import ThreadPoolExecutor
+
+        # Each call spawns its own tesseract process, so threads run them in parallel
+        with ThreadPoolExecutor(max_workers=min(OCR_CELL_WORKERS, len(crops))) as pool:
+            return dict(zip(crops, pool.map(_ocr_cell, crops.values())))
+    return {field_key: _ocr_cell(cropped) for field_key, cropped in crops.items()}
+
+
+def read_image_bytes(image_source):
+    """Raw bytes of an uploaded/stored file (Django File, UploadedFile or file object)."""
+    if hasattr(image_source, 'chunks'):
+        if hasattr(image_source, 'seek'):
+            image_source.seek(0)
+        return b''.join(image_source.chunks())
+    return image_source.read()
+
+
+def decode_image(data):
+    """Decode an encoded image buffer (JPEG/PNG bytes) straight into a BGR array, no temp file."""
+    import cv2
+    import numpy as np
+
+    if not data:
+        return None
+    return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+def _debug_settings(debug):
+    """
+    Debug artifacts (thresholded page + per-cell crops) are opt-in via the
+    `debug` argument or settings.OCR_DEBUG_ARTIFACTS; each call writes into its own
+    directory under settings.OCR_DEBUG_DIR so concurrent calls never share filenames.
+    """
+    from django.conf import settings
+
+    if debug is None:
+        debug = getattr(settings, 'OCR_DEBUG_ARTIFACTS', False)
+    if not debug:
+        return None
+
+    import tempfile
+
+    base_dir = getattr(settings, 'OCR_DEBUG_DIR', 'ocr_debug_crops')
+    os.makedirs(base_dir, exist_ok=True)
+    return tempfile.mkdtemp(prefix='ocr-', dir=base_dir)
+
+
+def binarize_report_card(img):
+    """Grayscale + CLAHE + Otsu threshold; the image every OCR step and template match sees."""
+    import cv2
+
+    # Preprocessing (same softer)
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    clahe = cv2.createCLAHE(clipLimit=1.0, tileGridSize=(8,8))
+    gray = clahe.apply(gray)
+    _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    return thresh
+
+
+# Version recorded for results read with FINAL_GRADE_BOUNDING_BOXES (no templates installed)
+BUILTIN_TEMPLATE_VERSION = 'builtin'
+
+
+def match_report_card_template(thresh):
+    """Best-matching layout from the template registry, or None if none are installed."""
+    template, score = template_registry.match(thresh)
+    if template is None:
+        print("DEBUG: No OCR templates installed, using FINAL_GRADE_BOUNDING_BOXES")
+        return None
+    print(f"DEBUG: Using OCR template '{template.name}' (match score {score:.2f})")
+    return template
+
+
+def _template_boxes(template, thresh):
+    if template is None:
+        return dict(FINAL_GRADE_BOUNDING_BOXES)
+    h_img, w_img = thresh.shape[:2]
+    return template.scaled_boxes(w_img, h_img)
+
+
+def report_card_boxes(thresh):
+    """
+    Pixel grade boxes for this card: the best-matching layout from the template
+    registry scaled to the image size, or FINAL_GRADE_BOUNDING_BOXES if no
+    templates are installed.
+    """
+    return _template_boxes(match_report_card_template(thresh), thresh)
+
+def extract_grades_from_image(image_source, ocr_mode=None, debug=None, details=None):
     """
     Enhanced OCR with range filter and improved fallback parsing.
+    image_source: file path, raw image bytes, or an uploaded/stored file object
+    (decoded in memory with cv2.imdecode).
+    ocr_mode: one of OCR_CELL_MODES (defaults to OCR_CELL_MODE).
+    debug: write debug images (see _debug_settings); off unless enabled.
+    details: optional dict, filled with the template used and per-cell/fallback
+    counts once the image is decoded (left empty if it could not be read).
     """
-    # Input handling (unchanged)
+    import cv2
+    import pytesseract
+
+    # Input handling: paths are read by OpenCV, everything else is decoded in memory
     if isinstance(image_source, str) and os.path.exists(image_source):
         img_path = image_source
         img = cv2.imread(img_path)
+    elif isinstance(image_source, (bytes, bytearray, memoryview)):
+        img = decode_image(bytes(image_source))
+    elif hasattr(image_source, 'read'):
+        img = decode_image(read_image_bytes(image_source))
     else:
-        if hasattr(image_source, 'read'):
-            import tempfile
-            with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as temp_file:
-                for chunk in image_source.chunks():
-                    temp_file.write(chunk)
-                temp_path = temp_file.name
-            img = cv2.imread(temp_path)
-            os.unlink(temp_path)
-        else:
-            return {}
+        return {}
 
     if img is None:
         print("OCR Error: Could not load image.")
@@ -214,15 +597,13 @@ def extract_grades_from_image(image_source):
     h_img_orig, w_img_orig = img.shape[:2]
     print(f"DEBUG: Image dimensions: height={h_img_orig}, width={w_img_orig}")
 
-    # Preprocessing (same softer)
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    clahe = cv2.createCLAHE(clipLimit=1.0, tileGridSize=(8,8))
-    gray = clahe.apply(gray)
-    _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    thresh = binarize_report_card(img)
 
-    # DEBUG: Save full threshold (comment if not needed)
-    cv2.imwrite('debug_full_thresh.png', thresh)
-    print("DEBUG: Saved full threshold to debug_full_thresh.png")
+    debug_dir = _debug_settings(debug)
+    if debug_dir:
+        thresh_filename = os.path.join(debug_dir, 'debug_full_thresh.png')
+        cv2.imwrite(thresh_filename, thresh)
+        print(f"DEBUG: Saved full threshold to {thresh_filename}")
 
     extracted = {}
     h_img, w_img = thresh.shape
@@ -230,8 +611,11 @@ def extract_grades_from_image(image_source):
     # Subject order for fallback (matches typical report card rows)
     SUBJECT_ORDER = ['filipino', 'english', 'science', 'mathematics', 'araling_panlipunan', 'mapeh', 'edukasyon_pangkabuhayan', 'edukasyon_pagpapakatao']
 
-    # Primary: Bounding Box Extraction
-    for field_key, bbox in FINAL_GRADE_BOUNDING_BOXES.items():
+    # Primary: Bounding Box Extraction, boxes scaled from the best-matching layout
+    template = match_report_card_template(thresh)
+    grade_boxes = _template_boxes(template, thresh)
+    crops = {}
+    for field_key, bbox in grade_boxes.items():
         x, y, bbox_w, bbox_h = bbox
         x = max(0, min(x, w_img - 1))
         y = max(0, min(y, h_img - 1))
@@ -242,16 +626,20 @@ def extract_grades_from_image(image_source):
         if cropped.size == 0:
             continue
 
-        # DEBUG: Save crop (comment if not needed)
-        debug_dir = 'ocr_debug_crops'
-        os.makedirs(debug_dir, exist_ok=True)
-        crop_filename = os.path.join(debug_dir, f"{field_key}_crop.png")
-        cv2.imwrite(crop_filename, cropped)
-        print(f"DEBUG: Saved crop to {crop_filename}")
+        if debug_dir:
+            crop_filename = os.path.join(debug_dir, f"{field_key}_crop.png")
+            cv2.imwrite(crop_filename, cropped)
+            print(f"DEBUG: Saved crop to {crop_filename}")
 
-        # OCR (PSM 7 for single line – better for partials)
-        config = r'--oem 3 --psm 7 -c tessedit_char_whitelist=0123456789. --dpi 300'
-        text = pytesseract.image_to_string(cropped, config=config).strip()
+        crops[field_key] = (cropped, bbox)
+
+    cell_texts = _ocr_grade_cells(
+        {field_key: cropped for field_key, (cropped, _) in crops.items()},
+        ocr_mode or OCR_CELL_MODE,
+    )
+
+    for field_key, (cropped, bbox) in crops.items():
+        text = cell_texts.get(field_key, '')
 
         print(f"OCR Raw Crop ({field_key}): '{text}' (from box {bbox})")
 
@@ -274,7 +662,8 @@ def extract_grades_from_image(image_source):
             print(f"OCR Parse Error ({field_key}): '{text}'")
 
     # ENHANCED Fallback: Full image + row-based number assignment
-    missing_subjects = [key for key in FINAL_GRADE_BOUNDING_BOXES if key not in extracted]
+    missing_subjects = [key for key in grade_boxes if key not in extracted]
+    cells_recognized = len(extracted)
     if missing_subjects:
         print(f"OCR Fallback: Processing missing: {missing_subjects}")
         config_fallback = r'--oem 3 --psm 6 -l eng'
@@ -301,5 +690,15 @@ def extract_grades_from_image(image_source):
                     print(f"OCR Fallback Success ({field_key}): {valid_grades[grade_index]} (row {i+1})")
                     grade_index += 1
 
+    if details is not None:
+        details.update({
+            'template': template.name if template else '',
+            'template_version': template.version if template else BUILTIN_TEMPLATE_VERSION,
+            'cells': len(grade_boxes),
+            'cells_recognized': cells_recognized,
+            'fallback_fields': missing_subjects,
+            'fallback_recovered': [key for key in missing_subjects if key in extracted],
+        })
+
     print(f"OCR Final Extracted: {extracted}")
     return extracted
@@ -184,6 +184,92 @@ class SectionPlacement(models.Model):
         verbose_name_plural = "Section Placements"
         ordering = ['-placement_date']
         unique_together = ('student', 'selected_program')  # Optional: prevent duplicate placements for same program
+        indexes = [
+            # Keyset pagination of the enrollment list (newest first), with and without a status filter
+            models.Index(fields=['-placement_date', '-id'], name='placement_date_id_idx'),
+            models.Index(fields=['status', '-placement_date', '-id'], name='placement_status_date_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.student} - {self.get_selected_program_display()} ({self.placement_date.strftime('%Y-%m-%d')})"
+
+
+class OCRVerificationJob(models.Model):
+    """
+    Background OCR check of an uploaded report card against the entered grades.
+    Created when StudentAcademic is submitted; processed by the worker pool in
+    ocr_jobs.py (or the process_ocr_jobs command), which fills in
+    StudentAcademic.mismatch_fields and the "Grade mismatch detected" Notification.
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    academic = models.ForeignKey(StudentAcademic, on_delete=models.CASCADE, related_name='ocr_jobs', verbose_name="Academic Record")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued', db_index=True)
+    ocr_grades = models.JSONField(default=dict, blank=True, verbose_name="OCR Extracted Grades")
+    mismatch_fields = models.JSONField(default=dict, blank=True, verbose_name="Detected mismatched fields")
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"OCR job #{self.pk} for {self.academic_id} ({self.status})"
+
+    class Meta:
+        verbose_name = "OCR Verification Job"
+        verbose_name_plural = "OCR Verification Jobs"
+        ordering = ['-created_at']
+
+
+class OCRResultCache(models.Model):
+    """
+    Grades read from one report card image, keyed by the SHA-256 of the image bytes
+    and the cell OCR mode. An entry is reused while the template it was read with
+    still has the same version (see ocr_cache.py), so re-saving an unchanged report
+    card skips OCR.
+    """
+    content_hash = models.CharField(max_length=64)
+    ocr_mode = models.CharField(max_length=20, default='sequential')
+    template_name = models.CharField(max_length=100, blank=True, db_index=True)
+    template_version = models.CharField(max_length=120)
+    grades = models.JSONField(default=dict, blank=True, verbose_name="OCR Extracted Grades")
+    details = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"OCR result {self.content_hash[:12]} ({self.template_version})"
+
+    class Meta:
+        verbose_name = "OCR Result Cache Entry"
+        verbose_name_plural = "OCR Result Cache"
+        unique_together = ['content_hash', 'ocr_mode']
+
+
+class StudentSearchEntry(models.Model):
+    """
+    Denormalized search row per student: name, LRN and programs/statuses from
+    Student, StudentAcademic and SectionPlacement, flattened into one lowercase
+    `document`. Kept in sync by signals (see search.py); indexed with pg_trgm on
+    PostgreSQL and an FTS5 trigram table on SQLite (migration 0005).
+    """
+    student = models.OneToOneField(Student, on_delete=models.CASCADE, primary_key=True, related_name='search_entry')
+    lrn = models.CharField(max_length=12, db_index=True)
+    full_name = models.CharField(max_length=320)
+    programs = models.CharField(max_length=255, blank=True)
+    statuses = models.CharField(max_length=255, blank=True)
+    overall_average = models.FloatField(null=True, blank=True)
+    document = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.full_name} ({self.lrn})"
+
+    class Meta:
+        verbose_name = "Student Search Entry"
+        verbose_name_plural = "Student Search Entries"
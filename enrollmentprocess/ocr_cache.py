@@ -0,0 +1,105 @@
+"""
+Persistent cache of report card OCR results.
+Location: enrollmentprocess/ocr_cache.py
+
+Entries are keyed by a SHA-256 of the image bytes and the cell OCR mode, and
+record the template (name + version) the grades were read with. 'threads' runs
+the same per-cell tesseract calls as 'sequential', only concurrently, so the two
+share entries; 'tiled' reads all cells in one call and can read a cell
+differently, so its results are kept apart. A cached result is served while
+that template is unchanged; editing a template's boxes only invalidates the
+entries read with it. Adding a new layout leaves existing entries alone, since
+the template they were read with still produces the same result.
+"""
+
+import hashlib
+import logging
+
+from .models import OCRResultCache
+from .model_utils import OCR_CELL_MODE, extract_grades_from_image, read_image_bytes
+from .ocr_templates import template_registry
+
+logger = logging.getLogger(__name__)
+
+
+def image_content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def result_mode(ocr_mode=None):
+    """The OCRResultCache.ocr_mode results of this cell OCR mode are stored under."""
+    return 'tiled' if (ocr_mode or OCR_CELL_MODE) == 'tiled' else 'sequential'
+
+
+def _source_bytes(image_source):
+    if isinstance(image_source, str):
+        with open(image_source, 'rb') as f:
+            return f.read()
+    if isinstance(image_source, (bytes, bytearray, memoryview)):
+        return bytes(image_source)
+    return read_image_bytes(image_source)
+
+
+def is_current(entry):
+    """True if the template the entry was read with still has the same version."""
+    if entry.template_name:
+        template = template_registry.get(entry.template_name)
+        return template is not None and template.version == entry.template_version
+    # Read with FINAL_GRADE_BOUNDING_BOXES: valid only while no templates are installed
+    return template_registry.default is None
+
+
+def extract_grades_cached(image_source, details=None, **ocr_options):
+    """
+    extract_grades_from_image with a lookup by image content first.
+    image_source: path, raw bytes or file object. details, if given, receives the
+    extractor's details plus 'cached' (True when no OCR ran).
+    """
+    data = _source_bytes(image_source)
+    content_hash = image_content_hash(data)
+    ocr_mode = result_mode(ocr_options.get('ocr_mode'))
+
+    entry = OCRResultCache.objects.filter(content_hash=content_hash, ocr_mode=ocr_mode).first()
+    if entry is not None and is_current(entry):
+        if details is not None:
+            details.update(entry.details, cached=True)
+        return dict(entry.grades)
+
+    run_details = {}
+    grades = extract_grades_from_image(data, details=run_details, **ocr_options)
+    if details is not None:
+        details.update(run_details, cached=False)
+
+    # Undecodable images leave run_details empty; don't pin that result
+    if run_details:
+        OCRResultCache.objects.update_or_create(
+            content_hash=content_hash,
+            ocr_mode=ocr_mode,
+            defaults={
+                'template_name': run_details['template'],
+                'template_version': run_details['template_version'],
+                'grades': grades,
+                'details': run_details,
+            },
+        )
+    return grades
+
+
+def purge_stale_results(template_name=None):
+    """
+    Delete entries whose template changed or was removed (optionally only those read
+    with `template_name`). Returns the number of rows deleted.
+    """
+    entries = OCRResultCache.objects.all()
+    if template_name is not None:
+        entries = entries.filter(template_name=template_name)
+
+    stale_ids = [
+        entry.pk
+        for entry in entries.only('pk', 'template_name', 'template_version')
+        if not is_current(entry)
+    ]
+    deleted, _ = OCRResultCache.objects.filter(pk__in=stale_ids).delete()
+    if deleted:
+        logger.info(f"🗑️ Purged {deleted} stale OCR cache entries")
+    return deleted
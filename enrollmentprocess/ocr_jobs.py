@@ -0,0 +1,163 @@
+"""
+Background OCR verification for uploaded report cards.
+Location: enrollmentprocess/ocr_jobs.py
+
+StudentAcademicView (applicant) and StudentAcademicUpdateView (admin edits) save
+the form immediately and enqueue an OCRVerificationJob.
+The job runs on a small in-process worker pool after the transaction commits;
+jobs left queued (e.g. the worker restarted) are picked up by
+`python manage.py process_ocr_jobs`.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from admin_functionalities.models import Notification
+from .models import StudentAcademic, OCRVerificationJob
+from .ocr_cache import extract_grades_cached
+
+logger = logging.getLogger(__name__)
+
+# Fields to compare - keys match SUBJECT_MAPPING / FINAL_GRADE_BOUNDING_BOXES
+COMPARE_FIELDS = [
+    'mathematics', 'araling_panlipunan', 'english',
+    'edukasyon_pagpapakatao', 'science',
+    'edukasyon_pangkabuhayan', 'filipino', 'mapeh'
+]
+TOLERANCE = 0.5  # Tolerance for small OCR/rounding differences
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'OCR_VERIFICATION_WORKERS', 2),
+                    thread_name_prefix='ocr-verify',
+                )
+    return _executor
+
+
+def find_grade_mismatches(academic, ocr_grades):
+    """Compare entered grades with OCR values; returns {field: {'entered', 'ocr'}}."""
+    mismatches = {}
+    for field_name in COMPARE_FIELDS:
+        entered = getattr(academic, field_name, None)
+        ocr_value = ocr_grades.get(field_name)
+        if entered is not None and ocr_value is not None:
+            try:
+                if abs(float(entered) - float(ocr_value)) > TOLERANCE:
+                    mismatches[field_name] = {
+                        'entered': float(entered),
+                        'ocr': float(ocr_value)
+                    }
+            except Exception:
+                # If conversion fails, mark as mismatch for manual check
+                mismatches[field_name] = {
+                    'entered': entered,
+                    'ocr': ocr_value
+                }
+    return mismatches
+
+
+def _ocr_source(report_field):
+    # Use the storage path if available, else pass the file-like object
+    try:
+        return report_field.path  # Works with local FileSystemStorage
+    except Exception:
+        return report_field
+
+
+def enqueue_ocr_verification(academic):
+    """
+    Create a queued job for this academic record and hand it to the worker pool
+    once the surrounding transaction commits. Returns the job.
+    """
+    job = OCRVerificationJob.objects.create(academic=academic)
+    transaction.on_commit(lambda: submit_job(job.pk))
+    return job
+
+
+def submit_job(job_id):
+    if getattr(settings, 'OCR_VERIFICATION_ASYNC', True):
+        _get_executor().submit(_run_in_worker, job_id)
+    else:
+        run_job(job_id)
+
+
+def _run_in_worker(job_id):
+    close_old_connections()
+    try:
+        run_job(job_id)
+    finally:
+        close_old_connections()
+
+
+def run_job(job_id):
+    """
+    Claim and process one job. The queued -> running update is conditional, so a
+    job is never processed twice even if the pool and the command race for it.
+    Returns True if this call processed the job.
+    """
+    claimed = OCRVerificationJob.objects.filter(pk=job_id, status='queued').update(
+        status='running', started_at=timezone.now()
+    )
+    if not claimed:
+        return False
+
+    job = OCRVerificationJob.objects.select_related('academic__student').get(pk=job_id)
+    academic = job.academic
+    try:
+        ocr_grades = {}
+        if academic.report_card:
+            # Unchanged images (e.g. re-saved via StudentAcademicUpdateView) are a cache lookup
+            ocr_grades = extract_grades_cached(_ocr_source(academic.report_card))
+        mismatches = find_grade_mismatches(academic, ocr_grades)
+
+        # update() so the recommendation cache is not invalidated by a non-feature field
+        StudentAcademic.objects.filter(pk=academic.pk).update(mismatch_fields=mismatches)
+
+        if mismatches:
+            student = academic.student
+            student_name = f"{student.first_name} {student.last_name}".strip()
+            fields = ", ".join(mismatches.keys())
+            Notification.objects.create(
+                title="Grade mismatch detected",
+                message=f"Possible grade mismatch for {student_name}. Fields: {fields}",
+                related_student=student,
+            )
+
+        job.ocr_grades = ocr_grades
+        job.mismatch_fields = mismatches
+        job.status = 'done'
+    except Exception as e:
+        logger.error(f"❌ OCR verification job {job_id} failed: {e}", exc_info=True)
+        job.error = str(e)
+        job.status = 'failed'
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=['ocr_grades', 'mismatch_fields', 'status', 'error', 'finished_at'])
+    return True
+
+
+def job_status_payload(job):
+    """JSON-serializable status for the admin UI."""
+    return {
+        'id': job.pk,
+        'status': job.status,
+        'mismatch_fields': job.mismatch_fields,
+        'ocr_grades': job.ocr_grades,
+        'error': job.error,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+    }
@@ -0,0 +1,215 @@
+"""
+Report card layout templates for the OCR grade extractor.
+Location: enrollmentprocess/ocr_templates.py
+
+Each layout is a JSON file in report_card_templates/ holding the final-grade cells
+in normalized (0-1) coordinates plus a small layout signature (ink density per
+row and column of a downscaled, thresholded card). An upload is matched against
+every template by signature and aspect ratio, and the winning template's boxes
+are scaled to the actual image size, so scans at any DPI stay on the fast
+per-cell OCR path.
+
+New layouts are added with `python manage.py register_ocr_template`.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'report_card_templates')
+DEFAULT_TEMPLATE = 'default'
+
+SIGNATURE_SIZE = 64        # Thresholded card is downscaled to SIGNATURE_SIZE x SIGNATURE_SIZE
+ASPECT_WEIGHT = 0.5        # Penalty per unit of |log(aspect ratio difference)|
+MIN_MATCH_SCORE = 0.5      # Below this the default template is used
+
+
+def layout_signature(binary):
+    """
+    Row and column ink profiles of a thresholded (white background) card image,
+    centred and L2-normalized so two signatures compare by dot product.
+    """
+    import cv2
+
+    small = cv2.resize(binary, (SIGNATURE_SIZE, SIGNATURE_SIZE), interpolation=cv2.INTER_AREA)
+    ink = 1.0 - small.astype(np.float32) / 255.0
+    profile = np.concatenate([ink.mean(axis=1), ink.mean(axis=0)])
+    profile -= profile.mean()
+    norm = np.linalg.norm(profile)
+    return profile / norm if norm else profile
+
+
+class ReportCardTemplate:
+    """One report card layout with grade cells in normalized coordinates."""
+
+    def __init__(self, name, boxes, reference_size, signature=None, description=''):
+        self.name = name
+        self.boxes = {field: tuple(float(v) for v in box) for field, box in boxes.items()}
+        self.reference_size = tuple(int(v) for v in reference_size)
+        self.signature = None if signature is None else np.asarray(signature, dtype=np.float32)
+        self.description = description
+        self.version = self._compute_version()
+
+    @property
+    def aspect(self):
+        width, height = self.reference_size
+        return width / height
+
+    def _compute_version(self):
+        # Only the geometry decides what the extractor reads, so only it is hashed
+        payload = json.dumps(
+            {'boxes': self.boxes, 'reference_size': self.reference_size}, sort_keys=True
+        )
+        return f"{self.name}:{hashlib.sha1(payload.encode()).hexdigest()[:12]}"
+
+    @classmethod
+    def from_pixel_boxes(cls, name, pixel_boxes, binary, description=''):
+        """
+        Build a template from pixel boxes (as written by generate_bounding_boxes.py)
+        measured on `binary`, the thresholded reference image.
+        """
+        height, width = binary.shape[:2]
+        boxes = {}
+        for field, (x, y, w, h) in pixel_boxes.items():
+            if w <= 0 or h <= 0:
+                logger.warning(f"⚠️ Skipping empty box for {field} in template {name}")
+                continue
+            boxes[field] = (
+                round(x / width, 5), round(y / height, 5),
+                round(w / width, 5), round(h / height, 5),
+            )
+        signature = np.round(layout_signature(binary), 5)
+        return cls(name, boxes, (width, height), signature, description)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data['name'],
+            data['boxes'],
+            data['reference_size'],
+            data.get('signature'),
+            data.get('description', ''),
+        )
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'description': self.description,
+            'reference_size': list(self.reference_size),
+            'boxes': {field: list(box) for field, box in self.boxes.items()},
+            'signature': None if self.signature is None else [float(v) for v in self.signature],
+        }
+
+    def scaled_boxes(self, width, height):
+        """Pixel (x, y, w, h) boxes for an image of the given size."""
+        return {
+            field: (
+                int(round(x * width)), int(round(y * height)),
+                int(round(w * width)), int(round(h * height)),
+            )
+            for field, (x, y, w, h) in self.boxes.items()
+        }
+
+    def match_score(self, signature, aspect):
+        """Signature correlation minus an aspect-ratio penalty (higher is better)."""
+        if self.signature is None or len(self.signature) != len(signature):
+            return -1.0
+        similarity = float(np.dot(self.signature, signature))
+        return similarity - ASPECT_WEIGHT * abs(math.log(aspect / self.aspect))
+
+
+class TemplateRegistry:
+    """
+    Templates loaded lazily from a directory of JSON files; the directory is
+    re-read when a file is added, removed or modified.
+    """
+
+    def __init__(self, directory, default_name=DEFAULT_TEMPLATE):
+        self.directory = directory
+        self.default_name = default_name
+        self._lock = threading.Lock()
+        self._templates = {}
+        self._stamp = None
+
+    def _directory_stamp(self):
+        try:
+            return tuple(sorted(
+                (entry.name, entry.stat().st_mtime_ns)
+                for entry in os.scandir(self.directory)
+                if entry.name.endswith('.json')
+            ))
+        except FileNotFoundError:
+            return ()
+
+    def _load(self, stamp):
+        templates = {}
+        for filename, _ in stamp:
+            path = os.path.join(self.directory, filename)
+            try:
+                with open(path) as f:
+                    template = ReportCardTemplate.from_dict(json.load(f))
+            except (OSError, ValueError, KeyError) as e:
+                logger.error(f"❌ Could not load OCR template {path}: {e}")
+                continue
+            templates[template.name] = template
+        logger.info(f"✅ Loaded {len(templates)} OCR templates from {self.directory}")
+        return templates
+
+    def all(self):
+        stamp = self._directory_stamp()
+        with self._lock:
+            if stamp != self._stamp:
+                self._templates = self._load(stamp)
+                self._stamp = stamp
+            return dict(self._templates)
+
+    def get(self, name):
+        return self.all().get(name)
+
+    @property
+    def default(self):
+        templates = self.all()
+        if self.default_name in templates:
+            return templates[self.default_name]
+        return next(iter(templates.values()), None)
+
+    def match(self, binary):
+        """
+        Best template for a thresholded card image.
+        Returns (template, score); falls back to the default template when nothing
+        scores above MIN_MATCH_SCORE.
+        """
+        templates = self.all()
+        height, width = binary.shape[:2]
+        signature = layout_signature(binary)
+        aspect = width / height
+
+        best, best_score = None, -math.inf
+        for template in templates.values():
+            score = template.match_score(signature, aspect)
+            if score > best_score:
+                best, best_score = template, score
+
+        if best is None or best_score < MIN_MATCH_SCORE:
+            return self.default, best_score
+        return best, best_score
+
+    def save(self, template, overwrite=False):
+        """Write a template to <directory>/<name>.json."""
+        path = os.path.join(self.directory, f"{template.name}.json")
+        if os.path.exists(path) and not overwrite:
+            raise FileExistsError(path)
+        os.makedirs(self.directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(template.to_dict(), f, indent=4)
+        return path
+
+
+template_registry = TemplateRegistry(TEMPLATE_DIR)
@@ -0,0 +1,191 @@
+"""
+Student search index
+Location: enrollmentprocess/search.py
+
+Every student has one StudentSearchEntry whose `document` holds the LRN(s),
+names and program codes, lowercased and stripped of accents ("Peña" is found by
+"pena"). Signals refresh the entry after Student, StudentAcademic or
+SectionPlacement writes; bulk writes that skip signals (bulk_assign_program)
+call refresh_search_entries() themselves. Students that existed before the
+table was added are indexed by `manage.py rebuild_student_search`.
+search_students() then answers from that single table:
+
+- PostgreSQL: every term must occur in the document (LIKE '%term%'), or the whole
+  query must be trigram-similar to it (pg_trgm '%' operator, so "Dela Crus" still
+  finds "Dela Cruz"). Both predicates are served by the GIN trigram index.
+  Results are ranked by word_similarity.
+- SQLite: the FTS5 table student_search_fts (trigram tokenizer) matches every
+  term of three or more characters and ranks by bm25. Shorter terms are checked
+  with LIKE on the matched rows. There is no fuzzy matching.
+- Anything else: LIKE on the search table, ordered by name.
+
+On every backend an exact LRN match ranks first.
+"""
+
+import logging
+import unicodedata
+
+from django.db import connection
+from django.db.models import BooleanField, Case, F, FloatField, Func, IntegerField, Q, Value, When
+
+from .models import SectionPlacement, Student, StudentAcademic, StudentSearchEntry
+
+logger = logging.getLogger(__name__)
+
+SQLITE_FTS_TABLE = 'student_search_fts'
+MIN_FTS_TERM = 3  # the FTS5 trigram tokenizer cannot match shorter terms
+REFRESH_BATCH_SIZE = 2000
+
+
+def normalize_search_text(value):
+    """Lowercase, accent-free, single-spaced text."""
+    value = unicodedata.normalize('NFKD', str(value or ''))
+    value = ''.join(ch for ch in value if not unicodedata.combining(ch))
+    return ' '.join(value.lower().split())
+
+
+def refresh_search_entries(student_ids):
+    """
+    Rebuild the search entries of `student_ids` with three reads and one upsert.
+    Entries of students that no longer exist are deleted.
+    """
+    student_ids = list(set(student_ids))
+    if not student_ids:
+        return 0
+
+    academics = {
+        student_id: (lrn, average)
+        for student_id, lrn, average in StudentAcademic.objects.filter(student_id__in=student_ids)
+        .values_list('student_id', 'lrn', 'overall_average')
+    }
+    placements = {}
+    for student_id, program, status in (
+        SectionPlacement.objects.filter(student_id__in=student_ids)
+        .order_by('placement_date', 'id')
+        .values_list('student_id', 'selected_program', 'status')
+    ):
+        placements.setdefault(student_id, []).append((program.upper(), status))
+
+    entries = []
+    for pk, lrn, last_name, first_name, middle_name in Student.objects.filter(pk__in=student_ids).values_list(
+        'pk', 'lrn', 'last_name', 'first_name', 'middle_name'
+    ):
+        academic_lrn, average = academics.get(pk, (None, None))
+        student_placements = placements.get(pk, [])
+        programs = ' '.join(dict.fromkeys(program for program, _ in student_placements))
+        full_name = ' '.join(filter(None, [f"{last_name},", first_name, middle_name]))
+
+        terms = [lrn]
+        if academic_lrn and academic_lrn != lrn:
+            terms.append(academic_lrn)
+        terms += [last_name, first_name, middle_name, programs]
+        entries.append(StudentSearchEntry(
+            student_id=pk,
+            lrn=lrn,
+            full_name=full_name,
+            programs=programs,
+            statuses=' '.join(status for _, status in student_placements),
+            overall_average=average,
+            document=normalize_search_text(' '.join(filter(None, terms))),
+        ))
+
+    StudentSearchEntry.objects.bulk_create(
+        entries,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['student'],
+        update_fields=['lrn', 'full_name', 'programs', 'statuses', 'overall_average', 'document', 'updated_at'],
+    )
+    present = {entry.student_id for entry in entries}
+    missing = [pk for pk in student_ids if pk not in present]
+    if missing:
+        StudentSearchEntry.objects.filter(student_id__in=missing).delete()
+    return len(entries)
+
+
+def rebuild_search_index():
+    """Refresh every student's entry, in batches. Returns the number of entries written."""
+    StudentSearchEntry.objects.exclude(student_id__in=Student.objects.values('pk')).delete()
+
+    written = 0
+    ids = Student.objects.order_by('pk').values_list('pk', flat=True)
+    batch = []
+    for pk in ids.iterator(chunk_size=REFRESH_BATCH_SIZE):
+        batch.append(pk)
+        if len(batch) == REFRESH_BATCH_SIZE:
+            written += refresh_search_entries(batch)
+            batch = []
+    written += refresh_search_entries(batch)
+    logger.info(f"🔎 Rebuilt {written} student search entries")
+    return written
+
+
+def _sqlite_fts_available():
+    return SQLITE_FTS_TABLE in connection.introspection.table_names()
+
+
+def _search_postgresql(entries, query, terms, limit):
+    matches_all = Q()
+    for term in terms:
+        matches_all &= Q(document__contains=term)
+    similar = Func(F('document'), Value(query), template="%(expressions)s", arg_joiner=' %% ',
+                   output_field=BooleanField())
+
+    return list(
+        entries.filter(matches_all | Q(similar))
+        .annotate(
+            exact_lrn=Case(When(lrn=query, then=1), default=0, output_field=IntegerField()),
+            rank=Func(Value(query), F('document'), function='word_similarity', output_field=FloatField()),
+        )
+        .order_by('-exact_lrn', '-rank', 'full_name')[:limit]
+    )
+
+
+def _search_sqlite(entries, query, terms, limit):
+    fts_terms = [term for term in terms if len(term) >= MIN_FTS_TERM]
+    short_terms = [term for term in terms if len(term) < MIN_FTS_TERM]
+    if not fts_terms:
+        return _search_like(entries, query, terms, limit)
+
+    table = entries.model._meta.db_table
+    match = ' AND '.join('"{}"'.format(term.replace('"', '""')) for term in fts_terms)
+    like_sql = ''.join(" AND e.document LIKE %s" for _ in short_terms)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT e.student_id FROM {SQLITE_FTS_TABLE} "
+            f"JOIN {table} e ON e.student_id = {SQLITE_FTS_TABLE}.rowid "
+            f"WHERE {SQLITE_FTS_TABLE} MATCH %s{like_sql} "
+            f"ORDER BY e.lrn = %s DESC, bm25({SQLITE_FTS_TABLE}), e.full_name LIMIT %s",
+            [match, *(f"%{term}%" for term in short_terms), query, limit],
+        )
+        ranked_ids = [row[0] for row in cursor.fetchall()]
+
+    found = entries.in_bulk(ranked_ids)
+    return [found[pk] for pk in ranked_ids if pk in found]
+
+
+def _search_like(entries, query, terms, limit):
+    for term in terms:
+        entries = entries.filter(document__contains=term)
+    return list(
+        entries.annotate(exact_lrn=Case(When(lrn=query, then=1), default=0, output_field=IntegerField()))
+        .order_by('-exact_lrn', 'full_name')[:limit]
+    )
+
+
+def search_students(query, limit=20):
+    """
+    Ranked StudentSearchEntry matches for a free-text query (name, LRN or
+    program code). Returns at most `limit` entries, best first.
+    """
+    query = normalize_search_text(query)
+    terms = query.split()
+    if not terms:
+        return []
+
+    entries = StudentSearchEntry.objects.all()
+    if connection.vendor == 'postgresql':
+        return _search_postgresql(entries, query, terms, limit)
+    if connection.vendor == 'sqlite' and _sqlite_fts_available():
+        return _search_sqlite(entries, query, terms, limit)
+    return _search_like(entries, query, terms, limit)
@@ -0,0 +1,34 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from .models import Student, StudentAcademic, SectionPlacement
+from .model_utils import invalidate_cached_recommendations
+from .search import refresh_search_entries
+
+
+@receiver(post_save, sender=StudentAcademic)
+@receiver(post_delete, sender=StudentAcademic)
+def drop_cached_recommendations(sender, instance, **kwargs):
+    """Academic record changed: the memoized program recommendations are stale."""
+    invalidate_cached_recommendations(instance.pk)
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_save, sender=StudentAcademic)
+@receiver(post_delete, sender=StudentAcademic)
+@receiver(post_save, sender=SectionPlacement)
+@receiver(post_delete, sender=SectionPlacement)
+def refresh_student_search_entry(sender, instance, **kwargs):
+    """
+    Re-index the student after commit, so a cascade (deleting a Student deletes its
+    placements) re-reads the final state instead of resurrecting the entry.
+    Student deletes need no receiver: the entry cascades with the student.
+    """
+    student_id = instance.pk if sender is Student else instance.student_id
+    transaction.on_commit(lambda: refresh_search_entries([student_id]))
+
+
+@receiver(pre_delete, sender=SectionPlacement)
+def load_placement_student_id(sender, instance, **kwargs):
+    # Deferred (.only()) instances can't lazy-load student_id once the row is gone
+    instance.student_id
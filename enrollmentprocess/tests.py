@@ -1,3 +1,536 @@
-from django.test import TestCase
+import csv
+import datetime
+import io
+import os
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from .model_utils import (
+    CELL_OCR_CONFIG,
+    FINAL_GRADE_BOUNDING_BOXES,
+    OCR_CELL_MODES,
+    ModelRegistry,
+    academic_feature_row,
+    academic_fingerprint,
+    binarize_report_card,
+    eligibility_cache_key,
+    extract_grades_from_image,
+    feature_columns,
+    get_cached_recommendations,
+    model_path,
+    model_registry,
+    predict_program_eligibility,
+    predict_program_eligibility_batch,
+    report_card_boxes,
+)
+from .models import (
+    OCRResultCache, OCRVerificationJob, SectionPlacement, Student, StudentAcademic, StudentSearchEntry,
+)
+from .ocr_cache import extract_grades_cached, purge_stale_results
+from .ocr_jobs import enqueue_ocr_verification, run_job
+from .ocr_templates import MIN_MATCH_SCORE, template_registry
+from .search import search_students
+from .tree_engine import CompiledRecommender
+
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RECOMMENDATION_CSV = os.path.join(
+    PROJECT_ROOT, 'data', 'data_program_recommendation - Copy (tryy1).csv'
+)
+
+
+GRADES = {
+    'mathematics': 90, 'araling_panlipunan': 88, 'english': 91, 'edukasyon_pagpapakatao': 93,
+    'science': 89, 'edukasyon_pangkabuhayan': 90, 'filipino': 92, 'mapeh': 94,
+}
+
+
+def make_academic(student, **fields):
+    values = dict(
+        GRADES, lrn=student.lrn, dost_exam_result='passed', report_card='report_cards/card.png',
+        overall_average=90.875, agreed_to_terms=True,
+    )
+    values.update(fields)
+    return StudentAcademic.objects.create(student=student, **values)
+
+
+def load_recommendation_rows():
+    with open(RECOMMENDATION_CSV, newline='') as f:
+        return [[float(row[col]) for col in feature_columns] for row in csv.DictReader(f)]
+
+
+class TreeEngineParityTests(SimpleTestCase):
+    """The NumPy engine must agree with the pickled sklearn models on every training row."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.rows = load_recommendation_rows()
+
+    def test_batch_matches_sklearn(self):
+        expected = predict_program_eligibility_batch(self.rows, engine='sklearn')
+        actual = predict_program_eligibility_batch(self.rows, engine='numpy')
+        self.assertEqual(len(actual), len(self.rows))
+        self.assertEqual(actual, expected)
+
+    def test_single_row_matches_sklearn(self):
+        for row in self.rows[:25]:
+            input_data = dict(zip(feature_columns, row))
+            self.assertEqual(
+                predict_program_eligibility(dict(input_data)),
+                predict_program_eligibility_batch([input_data], engine='sklearn')[0],
+            )
+
+    def test_dost_result_string_is_encoded(self):
+        input_data = dict(zip(feature_columns, self.rows[0]))
+        input_data['dost_exam_result'] = 'Passed'
+        numeric = dict(input_data, dost_exam_result=1)
+        self.assertEqual(predict_program_eligibility(input_data), predict_program_eligibility(numeric))
+
+    def test_exported_npz_round_trip(self):
+        compiled = CompiledRecommender.from_models(model_registry.get())
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'trees.npz')
+            compiled.save(path)
+            loaded = CompiledRecommender.load(path)
+
+        expected = compiled.predict(self.rows)
+        actual = loaded.predict(self.rows)
+        self.assertEqual(list(actual), list(expected))
+        for label in expected:
+            self.assertTrue((actual[label] == expected[label]).all())
+
+
+class ModelRegistryTests(SimpleTestCase):
+    """The registry keeps one copy of the models and reloads only when the pickle changes."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, 'models.pkl')
+        shutil.copyfile(model_path, self.path)
+        self.registry = ModelRegistry(self.path)
+
+    def test_reloads_once_when_the_pickle_changes(self):
+        import pickle
+
+        with mock.patch('enrollmentprocess.model_utils.pickle.load', wraps=pickle.load) as load:
+            models = self.registry.get()
+            self.assertIs(self.registry.get(), models)
+            self.assertIs(self.registry.get_compiled(), self.registry.get_compiled())
+            self.assertEqual(load.call_count, 1)
+
+            stats = self.registry.stats()
+            self.assertTrue(stats['loaded'])
+            self.assertEqual(stats['labels'], list(models))
+            self.assertGreater(stats['memory_bytes'], 0)
+            self.assertIsNotNone(stats['load_seconds'])
+
+            # A retrained pickle dropped in place
+            mtime = os.stat(self.path).st_mtime_ns + 1_000_000_000
+            os.utime(self.path, ns=(mtime, mtime))
+            compiled = self.registry.get_compiled()
+            reloaded = self.registry.get()
+            self.assertIsNot(reloaded, models)
+            self.assertIs(self.registry.get(), reloaded)
+            self.assertIs(self.registry.get_compiled(), compiled)
+            self.assertEqual(load.call_count, 2)
+            self.assertEqual(self.registry.stats()['version'], str(mtime))
+
+
+class RecommendationMemoTests(TestCase):
+    """Memoized recommendations are recomputed after a record edit or a model change."""
+
+    def setUp(self):
+        from admin_functionalities.tests import make_students
+
+        self.academic = make_academic(make_students(1)[0])
+        self.key = eligibility_cache_key(self.academic.pk)
+        cache.delete(self.key)
+
+    def _recommend(self):
+        with mock.patch(
+            'enrollmentprocess.model_utils.predict_program_eligibility_batch',
+            wraps=predict_program_eligibility_batch,
+        ) as predict:
+            recommendations = get_cached_recommendations(self.academic)
+        return recommendations, predict.call_count
+
+    def test_academic_save_drops_the_entry(self):
+        first, calls = self._recommend()
+        self.assertEqual(calls, 1)
+        self.assertEqual(self._recommend(), (first, 0))
+
+        self.academic.mathematics = 75
+        self.academic.save()
+        self.assertIsNone(cache.get(self.key))
+
+        recommendations, calls = self._recommend()
+        self.assertEqual(calls, 1)
+        expected = predict_program_eligibility_batch([academic_feature_row(self.academic)])[0]
+        self.assertEqual(recommendations, expected)
+        self.assertEqual(cache.get(self.key)['recommendations'], recommendations)
+
+    def test_model_version_is_part_of_the_fingerprint(self):
+        row = academic_feature_row(self.academic)
+        self.assertNotEqual(academic_fingerprint(row, 'v1'), academic_fingerprint(row, 'v2'))
+
+        self._recommend()
+        with mock.patch.object(ModelRegistry, 'version', new_callable=mock.PropertyMock, return_value='retrained'):
+            self.assertEqual(self._recommend()[1], 1)
+            self.assertEqual(self._recommend()[1], 0)
+            self.assertEqual(cache.get(self.key)['fingerprint'], academic_fingerprint(row, 'retrained'))
+
+
+class OCRTemplateRegistryTests(SimpleTestCase):
+    """Layout templates scale with the scan and are picked by their layout signature."""
+
+    REFERENCE_CARD = os.path.join(PROJECT_ROOT, 'media', 'report_cards', 'reportcard_2.jpg')
+
+    def test_default_template_reproduces_reference_boxes(self):
+        template = template_registry.default
+        self.assertEqual(template.scaled_boxes(1059, 2048), FINAL_GRADE_BOUNDING_BOXES)
+
+    def test_higher_resolution_scan_matches_and_scales(self):
+        import cv2
+
+        img = cv2.imread(self.REFERENCE_CARD)
+        if img is None:
+            self.skipTest('reference report card image not available')
+        big = cv2.resize(img, (img.shape[1] * 2, img.shape[0] * 2))
+
+        template, score = template_registry.match(binarize_report_card(big))
+        self.assertEqual(template.name, 'default')
+        self.assertGreater(score, MIN_MATCH_SCORE)
+
+        x, y, w, h = FINAL_GRADE_BOUNDING_BOXES['mathematics']
+        bx, by, bw, bh = report_card_boxes(binarize_report_card(big))['mathematics']
+        self.assertLessEqual(abs(bx - 2 * x), 2)
+        self.assertLessEqual(abs(by - 2 * y), 2)
+        self.assertLessEqual(abs(bw - 2 * w), 2)
+        self.assertLessEqual(abs(bh - 2 * h), 2)
+
+
+class FakeTesseract:
+    """
+    Stand-in for pytesseract that reads a grade from the dark bars drawn into the
+    grade cells: a bar of h rows reads as 60 + h.
+    """
+
+    @staticmethod
+    def _dark_runs(image):
+        import numpy as np
+
+        dark = np.flatnonzero((np.asarray(image) < 128).any(axis=1))
+        runs = []
+        for row in dark:
+            if runs and row == runs[-1][1]:
+                runs[-1][1] = row + 1
+            else:
+                runs.append([row, row + 1])
+        return runs
+
+    def image_to_string(self, image, config=''):
+        if config != CELL_OCR_CONFIG:
+            return ''  # full-page fallback
+        return ''.join(str(60 + bottom - top) for top, bottom in self._dark_runs(image))
+
+    def image_to_data(self, image, config='', output_type=None):
+        runs = self._dark_runs(image)
+        return {
+            'text': [str(60 + bottom - top) for top, bottom in runs],
+            'top': [int(top) for top, _ in runs],
+            'height': [int(bottom - top) for top, bottom in runs],
+        }
+
+
+class OCRCellModeTests(SimpleTestCase):
+    """The threads and tiled cell OCR modes read the same grades as sequential."""
+
+    def test_modes_agree_on_the_same_crops(self):
+        import cv2
+        import numpy as np
+
+        expected = {field: 75 + i * 3 for i, field in enumerate(FINAL_GRADE_BOUNDING_BOXES)}
+        card = np.full((2048, 1059, 3), 255, dtype=np.uint8)
+        for field, (x, y, w, h) in FINAL_GRADE_BOUNDING_BOXES.items():
+            bar = expected[field] - 60
+            top = y + (h - bar) // 2
+            card[top:top + bar, x + 20:x + w - 20] = 0
+        ok, buf = cv2.imencode('.png', card)
+        image = buf.tobytes()
+
+        fake = FakeTesseract()
+        results = {}
+        with mock.patch('pytesseract.image_to_string', side_effect=fake.image_to_string), \
+                mock.patch('pytesseract.image_to_data', side_effect=fake.image_to_data):
+            for mode in OCR_CELL_MODES:
+                details = {}
+                results[mode] = extract_grades_from_image(image, ocr_mode=mode, debug=False, details=details)
+                self.assertEqual(details['fallback_fields'], [], mode)
+
+        self.assertEqual(results['sequential'], expected)
+        self.assertEqual(results['threads'], expected)
+        self.assertEqual(results['tiled'], expected)
+
+
+class OCRResultCacheTests(TestCase):
+    """Unchanged images are served from OCRResultCache until their template changes."""
+
+    def setUp(self):
+        import cv2
+        import numpy as np
+
+        ok, buf = cv2.imencode('.png', np.full((2048, 1059, 3), 255, dtype=np.uint8))
+        self.image_bytes = buf.tobytes()
+
+    def _extract(self):
+        details = {}
+        with mock.patch('pytesseract.image_to_string', return_value='90') as ocr:
+            grades = extract_grades_cached(self.image_bytes, details=details, ocr_mode='sequential')
+        return grades, details, ocr.call_count
+
+    def test_second_read_is_a_lookup(self):
+        grades, details, calls = self._extract()
+        self.assertFalse(details['cached'])
+        self.assertGreater(calls, 0)
+
+        cached_grades, details, calls = self._extract()
+        self.assertTrue(details['cached'])
+        self.assertEqual(calls, 0)
+        self.assertEqual(cached_grades, grades)
+
+    def test_template_change_invalidates_entry(self):
+        self._extract()
+        OCRResultCache.objects.update(template_version='default:outdated')
+
+        _, details, calls = self._extract()
+        self.assertFalse(details['cached'])
+        self.assertGreater(calls, 0)
+        self.assertEqual(purge_stale_results(), 0)
+
+    def test_tiled_results_are_kept_apart(self):
+        self._extract()
+
+        # 'threads' runs the same per-cell calls as 'sequential' and shares the entry
+        no_words = {'text': [], 'top': [], 'height': []}
+        with mock.patch('pytesseract.image_to_string', return_value='90'), \
+                mock.patch('pytesseract.image_to_data', return_value=no_words) as tiled:
+            details = {}
+            extract_grades_cached(self.image_bytes, details=details, ocr_mode='threads')
+            self.assertTrue(details['cached'])
+            extract_grades_cached(self.image_bytes, details=details, ocr_mode='tiled')
+            self.assertFalse(details['cached'])
+            self.assertEqual(tiled.call_count, 1)
+        self.assertEqual(
+            sorted(OCRResultCache.objects.values_list('ocr_mode', flat=True)), ['sequential', 'tiled']
+        )
+
+
+class StudentSearchTests(TestCase):
+    """The search table follows writes through signals and ranks exact LRN hits first."""
+
+    def make_student(self, lrn, last_name, first_name):
+        return Student.objects.create(
+            lrn=lrn, last_name=last_name, first_name=first_name, address='Address', age=12,
+            gender='Female', date_of_birth=datetime.date(2013, 1, 1), place_of_birth='City',
+            religion='None', dialect_spoken='Tagalog', ethnic_tribe='None',
+            last_school_attended='Elementary', previous_grade_section='6-A', last_school_year='2024-2025',
+        )
+
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pena = self.make_student('100000000001', 'Peña', 'Maria')
+            self.cruz = self.make_student('100000000002', 'Dela Cruz', 'Jose')
+            self.cruz_other = self.make_student('100000000003', 'Cruzado', 'Ana')
+            SectionPlacement.objects.create(student=self.cruz, selected_program='STE')
+
+    def test_entries_follow_writes(self):
+        entry = StudentSearchEntry.objects.get(student=self.cruz)
+        self.assertEqual(entry.programs, 'STE')
+        self.assertEqual(entry.statuses, 'pending')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cruz.first_name = 'Josefa'
+            self.cruz.save()
+        self.assertEqual([e.student_id for e in search_students('josefa')], [self.cruz.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cruz.delete()
+        self.assertFalse(StudentSearchEntry.objects.filter(student_id=self.cruz.pk).exists())
+
+    def test_ranking(self):
+        # Accents are folded; every term has to match
+        self.assertEqual([e.student_id for e in search_students('PENA maria')], [self.pena.pk])
+        self.assertEqual({e.student_id for e in search_students('cruz')}, {self.cruz.pk, self.cruz_other.pk})
+        self.assertEqual([e.student_id for e in search_students('cruz ste')], [self.cruz.pk])
+        self.assertEqual(search_students('100000000003')[0].student_id, self.cruz_other.pk)
+        self.assertEqual(search_students('   '), [])
+
+
+class OCRVerificationJobTests(TestCase):
+    """Queued jobs are claimed once, record mismatches and report their state."""
+
+    def setUp(self):
+        from admin_functionalities.tests import make_students
+
+        self.student = make_students(1)[0]
+        self.academic = make_academic(self.student, science=80)
+        # Queued only: the on_commit hand-off to the worker pool is not run
+        with self.captureOnCommitCallbacks(execute=False):
+            self.job = enqueue_ocr_verification(self.academic)
+
+    def _run(self, ocr_grades=GRADES, **patch):
+        patch.setdefault('return_value', dict(ocr_grades))
+        with mock.patch('enrollmentprocess.ocr_jobs.extract_grades_cached', **patch) as ocr:
+            processed = run_job(self.job.pk)
+        self.job.refresh_from_db()
+        return processed, ocr.call_count
+
+    def test_claimed_job_is_not_processed_again(self):
+        self.assertEqual(self._run(), (True, 1))
+        self.assertEqual(self._run(), (False, 0))
+
+        # Another worker holds the claim
+        OCRVerificationJob.objects.filter(pk=self.job.pk).update(status='running')
+        with mock.patch('enrollmentprocess.ocr_jobs.extract_grades_cached') as ocr:
+            call_command('process_ocr_jobs', stdout=io.StringIO())
+        self.assertEqual(ocr.call_count, 0)
+        self.assertEqual(OCRVerificationJob.objects.get(pk=self.job.pk).status, 'running')
+
+    def test_mismatches_are_recorded_and_notified(self):
+        from admin_functionalities.models import Notification
+
+        self._run()
+
+        mismatches = {'science': {'entered': 80.0, 'ocr': 89.0}}
+        self.assertEqual(self.job.status, 'done')
+        self.assertEqual(self.job.mismatch_fields, mismatches)
+        self.assertEqual(self.job.ocr_grades, GRADES)
+        self.assertEqual(StudentAcademic.objects.get(pk=self.academic.pk).mismatch_fields, mismatches)
+        notification = Notification.objects.get(related_student=self.student)
+        self.assertEqual(notification.title, 'Grade mismatch detected')
+        self.assertIn('science', notification.message)
+
+    def test_ocr_error_fails_the_job_until_retried(self):
+        self.assertEqual(self._run(side_effect=RuntimeError('tesseract crashed')), (True, 1))
+        self.assertEqual(self.job.status, 'failed')
+        self.assertEqual(self.job.error, 'tesseract crashed')
+        self.assertIsNotNone(self.job.finished_at)
+
+        with mock.patch('enrollmentprocess.ocr_jobs.extract_grades_cached', return_value=dict(GRADES)):
+            call_command('process_ocr_jobs', retry_failed=True, stdout=io.StringIO())
+        self.job.refresh_from_db()
+        self.assertEqual((self.job.status, self.job.error), ('done', ''))
+
+    def test_status_endpoint(self):
+        from admin_functionalities.models import CustomUser
+
+        self._run()
+        url = reverse('admin_functionalities:ocr_job_status', args=[self.student.pk])
+
+        self.assertEqual(self.client.get(url).status_code, 302)  # login required
+        self.client.force_login(CustomUser.objects.create_user('teacher@example.com', 'teacher@example.com', 'pw'))
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.force_login(
+            CustomUser.objects.create_user('admin@example.com', 'admin@example.com', 'pw', is_staff=True)
+        )
+        data = self.client.get(url).json()
+        self.assertEqual(data['job']['id'], self.job.pk)
+        self.assertEqual(data['job']['status'], 'done')
+        self.assertEqual(data['total_jobs'], 1)
+        self.assertEqual(data['mismatch_fields'], {'science': {'entered': 80.0, 'ocr': 89.0}})
+
+
+class ReverifyReportCardsCommandTests(TestCase):
+    """reverify_report_cards rewrites mismatch_fields in bulk and counts what it saw."""
+
+    def setUp(self):
+        from admin_functionalities.tests import make_students
+
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_root = override_settings(MEDIA_ROOT=media.name)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+        os.makedirs(os.path.join(media.name, 'report_cards'))
+
+        first, second = make_students(2)
+        self.misread = make_academic(first, report_card='report_cards/a.png', science=80)
+        self.fixed = make_academic(
+            second, report_card='report_cards/b.png', mismatch_fields={'english': {'entered': 91.0, 'ocr': 75.0}},
+        )
+        for name in ('a.png', 'b.png'):
+            with open(os.path.join(media.name, 'report_cards', name), 'wb') as f:
+                f.write(name.encode())
+
+    def _read(self, data, ocr_mode=None, debug=None, details=None):
+        details.update(
+            template='default', template_version='default:1', cells=8, cells_recognized=8,
+            fallback_fields=[], fallback_recovered=[],
+        )
+        return dict(GRADES)
+
+    def test_mismatch_fields_are_rewritten(self):
+        out = io.StringIO()
+        with mock.patch(
+            'enrollmentprocess.management.commands.reverify_report_cards.extract_grades_from_image',
+            side_effect=self._read,
+        ) as ocr:
+            call_command('reverify_report_cards', workers=1, stdout=out)
+
+        self.assertEqual(ocr.call_count, 2)
+        mismatches = dict(StudentAcademic.objects.values_list('pk', 'mismatch_fields'))
+        self.assertEqual(mismatches, {
+            self.misread.pk: {'science': {'entered': 80.0, 'ocr': 89.0}},
+            self.fixed.pk: {},
+        })
+        self.assertEqual(
+            sorted(OCRResultCache.objects.values_list('template_version', 'ocr_mode')),
+            [('default:1', 'sequential')] * 2,
+        )
+
+        report = out.getvalue()
+        self.assertIn("Report cards:        2 (2 OCR'd, 0 from cache, 0 unreadable, 0 errors)", report)
+        self.assertIn('Grade agreement:     15/16 fields', report)
+        self.assertIn('Mismatches:          1 fields on 1 records', report)
+        self.assertIn('mismatch_fields updated on 2 records', report)
+
+
+@override_settings(OCR_VERIFICATION_ASYNC=False)
+class AcademicUpdateReverificationTests(TestCase):
+    """Admin grade edits through StudentAcademicUpdateView re-run OCR verification."""
+
+    def setUp(self):
+        from admin_functionalities.models import CustomUser
+        from admin_functionalities.tests import make_students
+
+        self.academic = make_academic(make_students(1)[0])
+        self.client.force_login(
+            CustomUser.objects.create_user('admin@example.com', 'admin@example.com', 'pw', is_staff=True)
+        )
+
+    def test_grade_edit_refreshes_mismatch_fields(self):
+        form = dict(GRADES, lrn=self.academic.lrn, dost_exam_result='passed', agreed_to_terms='on', science=80)
+        ocr_grades = dict(GRADES)
+
+        with mock.patch('enrollmentprocess.ocr_jobs.extract_grades_cached', return_value=ocr_grades) as ocr:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(
+                    reverse('admin_functionalities:student_academic_update', args=[self.academic.pk]), form
+                )
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(ocr.call_count, 1)
+        self.assertEqual(OCRVerificationJob.objects.get(academic=self.academic).status, 'done')
+        self.assertEqual(
+            StudentAcademic.objects.get(pk=self.academic.pk).mismatch_fields,
+            {'science': {'entered': 80.0, 'ocr': 89.0}},
+        )
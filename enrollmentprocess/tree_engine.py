@@ -0,0 +1,106 @@
+"""
+Pure-NumPy inference engine for the program recommender.
+Location: enrollmentprocess/tree_engine.py
+
+The fitted DecisionTreeClassifiers in decision_tree_models.pkl are flattened into
+compact arrays (feature index, threshold, children, leaf class) and evaluated with a
+vectorized level-by-level traversal. This skips sklearn's input validation and the
+pandas DataFrame that a one-row predict needs, and once exported to .npz the
+recommender no longer needs sklearn to be importable at all.
+"""
+
+import numpy as np
+
+
+class CompiledTree:
+    """
+    One decision tree as flat arrays.
+
+    Leaves point their children at themselves, so a fixed number of traversal
+    steps (the tree depth) lands every row on its leaf.
+    """
+
+    __slots__ = ('feature', 'threshold', 'left', 'right', 'leaf_class', 'depth')
+
+    def __init__(self, feature, threshold, left, right, leaf_class, depth):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.leaf_class = leaf_class
+        self.depth = depth
+
+    @classmethod
+    def from_estimator(cls, estimator):
+        """Flatten a fitted sklearn DecisionTreeClassifier."""
+        tree = estimator.tree_
+        node_ids = np.arange(tree.node_count, dtype=np.int32)
+        is_leaf = tree.children_left == -1
+
+        feature = np.where(is_leaf, 0, tree.feature).astype(np.int32)
+        threshold = np.where(is_leaf, np.inf, tree.threshold).astype(np.float64)
+        left = np.where(is_leaf, node_ids, tree.children_left).astype(np.int32)
+        right = np.where(is_leaf, node_ids, tree.children_right).astype(np.int32)
+
+        # Same tie-breaking as DecisionTreeClassifier.predict (first max wins)
+        class_index = np.argmax(tree.value[:, 0, :], axis=1)
+        leaf_class = np.asarray(estimator.classes_)[class_index]
+
+        return cls(feature, threshold, left, right, leaf_class, int(tree.max_depth))
+
+    def predict(self, X):
+        """Predict classes for a 2-D float array of shape (n_rows, n_features)."""
+        rows = np.arange(X.shape[0])
+        node = np.zeros(X.shape[0], dtype=np.int32)
+        for _ in range(self.depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return self.leaf_class[node]
+
+
+class CompiledRecommender:
+    """All per-program trees, keyed by the same labels as the pickled dict."""
+
+    def __init__(self, trees):
+        self.trees = trees
+
+    @classmethod
+    def from_models(cls, models):
+        return cls({label: CompiledTree.from_estimator(model) for label, model in models.items()})
+
+    def predict(self, rows):
+        """
+        Evaluate every tree over rows (n_rows x n_features).
+        Returns {label: array of predicted classes}.
+        """
+        # sklearn trees compare float32-cast inputs against float64 thresholds;
+        # do the same so borderline grades land on the same side of a split.
+        X = np.asarray(rows, dtype=np.float32).astype(np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        return {label: tree.predict(X) for label, tree in self.trees.items()}
+
+    def save(self, path):
+        """Export the flattened trees to a single .npz file."""
+        arrays = {'labels': np.array(list(self.trees))}
+        for i, tree in enumerate(self.trees.values()):
+            for name in ('feature', 'threshold', 'left', 'right', 'leaf_class'):
+                arrays[f'{i}_{name}'] = getattr(tree, name)
+            arrays[f'{i}_depth'] = np.array(tree.depth)
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """Load an exported .npz (no sklearn import needed)."""
+        with np.load(path, allow_pickle=False) as data:
+            trees = {}
+            for i, label in enumerate(data['labels'].tolist()):
+                trees[label] = CompiledTree(
+                    data[f'{i}_feature'],
+                    data[f'{i}_threshold'],
+                    data[f'{i}_left'],
+                    data[f'{i}_right'],
+                    data[f'{i}_leaf_class'],
+                    int(data[f'{i}_depth']),
+                )
+        return cls(trees)
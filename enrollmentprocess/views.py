@@ -6,9 +6,10 @@ from .models import Student, Family, StudentNonAcademic, StudentAcademic, Sectio
 from .forms import StudentForm, FamilyForm, StudentNonAcademicForm, StudentAcademicForm
 from django.http import HttpResponseRedirect
 from django.db import transaction
-from .model_utils import predict_program_eligibility
+from .model_utils import get_cached_recommendations
 from admin_functionalities.models import Notification, CustomUser  
-from .model_utils import extract_grades_from_image, SUBJECT_MAPPING  # Import from utils
+from .model_utils import SUBJECT_MAPPING  # Import from utils
+from .ocr_jobs import enqueue_ocr_verification
 from django.views.decorators.csrf import csrf_exempt
 from django.http import JsonResponse
 from django.contrib.auth import authenticate, login, logout
@@ -348,65 +349,14 @@ class StudentAcademicView(CreateView):
         # First save the form / instance (super will call form.save())
         response = super().form_valid(form)  # This sets self.object
 
-        # Now extract OCR grades from the saved file (self.object.report_card)
-        mismatches = {}
+        # OCR verification runs in the background (ocr_jobs.py): the applicant is not
+        # kept waiting on tesseract. mismatch_fields and the "Grade mismatch detected"
+        # Notification are filled in when the job finishes.
         try:
-            report_field = self.object.report_card
-            if report_field:
-                # Use the storage path if available, else pass the file-like object
-                ocr_source = None
-                try:
-                    ocr_source = report_field.path  # Works with local FileSystemStorage
-                except Exception:
-                    # Fallback to file-like object
-                    ocr_source = report_field
-
-                ocr_grades = extract_grades_from_image(ocr_source)
-
-                # Fields to compare - keys should match your SUBJECT_MAPPING keys
-                compare_fields = [
-                    'mathematics', 'araling_panlipunan', 'english',
-                    'edukasyon_pagpapakatao', 'science',
-                    'edukasyon_pangkabuhayan', 'filipino', 'mapeh'
-                ]
-                TOLERANCE = 0.5  # Tolerance for small OCR/rounding differences
-
-                for field_name in compare_fields:
-                    entered = getattr(self.object, field_name, None)
-                    ocr_value = ocr_grades.get(field_name)
-                    if entered is not None and ocr_value is not None:
-                        try:
-                            if abs(float(entered) - float(ocr_value)) > TOLERANCE:
-                                mismatches[field_name] = {
-                                    'entered': float(entered),
-                                    'ocr': float(ocr_value)
-                                }
-                        except Exception:
-                            # If conversion fails, mark as mismatch for manual check
-                            mismatches[field_name] = {
-                                'entered': entered,
-                                'ocr': ocr_value
-                            }
-
-        except Exception as e:
-            print("OCR/verification error:", e)
-            # Do not block saving; just continue
-
-        # Save mismatch details into the JSONField
-        self.object.mismatch_fields = mismatches or {}
-        self.object.save(update_fields=['mismatch_fields'])
-
-        # Optional: Create a Notification so admin sees this in their queue
-        try:
-            if mismatches:
-                student_name = f"{student.first_name} {student.last_name}".strip()
-                fields = ", ".join(mismatches.keys())
-                Notification.objects.create(
-                    title="Grade mismatch detected",
-                    message=f"Possible grade mismatch for {student_name}. Fields: {fields}"
-                )
+            enqueue_ocr_verification(self.object)
         except Exception as e:
-            print("Notification creation failed:", e)
+            print("OCR verification could not be queued:", e)
+            # Do not block saving; process_ocr_jobs / re-save can retry
 
         return response
 
@@ -433,20 +383,8 @@ class SectionPlacementView(TemplateView):
             context['error_message'] = "Academic data not found for this student."
             return context
 
-        input_data = {
-            'dost_exam_result': academic.dost_exam_result,
-            'filipino grade': academic.filipino,
-            'English grade': academic.english,
-            'mathematics grade': academic.mathematics,
-            'science grade': academic.science,
-            'araling panlipunan grade': academic.araling_panlipunan,
-            'Edukasyon sa pagpapakatao grade': academic.edukasyon_pagpapakatao,
-            'Edukasyong panglipunan at pangkabuhayan grade': academic.edukasyon_pangkabuhayan,
-            'MAPEH grade': academic.mapeh,
-            'Average grade': academic.overall_average,
-        }
-
-        recommendations = predict_program_eligibility(input_data)
+        # Memoized per academic record + model version (refreshes/redirects reuse it)
+        recommendations = get_cached_recommendations(academic)
         context['recommendations'] = recommendations
 
         # Check for success query param to show success modal
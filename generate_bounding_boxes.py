@@ -172,9 +172,6 @@ print("\n" + "=" * 60)
 print("SAVED!")
 print("=" * 60)
 print(f"\nBounding boxes saved to: {output_path}")
-print("\nCopy this to model_utils.py:")
-print("\nFINAL_GRADE_BOUNDING_BOXES = {")
-for subject, bbox in bounding_boxes.items():
-    print(f"    '{subject}': {tuple(bbox)},")
-print("}")
+print("\nRegister this layout with the OCR template registry:")
+print(f"\npython manage.py register_ocr_template <name> --image {IMAGE_PATH} --boxes {output_path}")
 print("\n" + "=" * 60)
\ No newline at end of file
@@ -130,3 +130,29 @@ LOGOUT_REDIRECT_URL = '/login/'
 AUTH_USER_MODEL = "admin_functionalities.CustomUser"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# --- OCR verification (enrollmentprocess/ocr_jobs.py) ---
+# Report card OCR runs on a background worker pool after the academic form is saved.
+OCR_VERIFICATION_ASYNC = env.bool('OCR_VERIFICATION_ASYNC', default=True)
+OCR_VERIFICATION_WORKERS = env.int('OCR_VERIFICATION_WORKERS', default=2)
+# Debug images from extract_grades_from_image (thresholded page + per-cell crops).
+# Off by default so production OCR does no incidental disk I/O.
+OCR_DEBUG_ARTIFACTS = env.bool('OCR_DEBUG_ARTIFACTS', default=False)
+OCR_DEBUG_DIR = env('OCR_DEBUG_DIR', default=os.path.join(BASE_DIR, 'ocr_debug_crops'))
+
+# Cohort section assignment (admin_functionalities/balancing.py): 'merit' balances
+# headcount, mean overall_average and gender; 'headcount' only evens out class sizes.
+SECTION_BALANCING_STRATEGY = env('SECTION_BALANCING_STRATEGY', default='merit')
+
+# Admin dashboard snapshot lifetime in seconds (admin_functionalities/dashboard.py);
+# writes drop the snapshot through signals, the TTL only covers bulk writes.
+DASHBOARD_CACHE_TIMEOUT = env.int('DASHBOARD_CACHE_TIMEOUT', default=30)
+
+# Upper bound in seconds on the age of a process's program/subject catalog
+# (admin_functionalities/catalog.py); saves and deletes invalidate it right away
+# through the CatalogVersion row, the TTL only covers QuerySet.update() writes.
+CATALOG_CACHE_TIMEOUT = env.int('CATALOG_CACHE_TIMEOUT', default=300)
+
+# Packed class records (teacher/assessments.py) also write the first 10 WW/PT items
+# and the QA item to the fixed score columns, which exports and interventions read.
+CLASS_RECORD_MIRROR_WIDE_SCORES = env.bool('CLASS_RECORD_MIRROR_WIDE_SCORES', default=True)
@@ -0,0 +1,251 @@
+"""
+Compact assessment storage
+Location: teacher/assessments.py
+
+A wide class record keeps 10 WW, 10 PT and 1 QA item in fixed ClassRecord and
+StudentGrade columns: every grade read or write moves all 21 score columns, and
+an 11th quiz cannot be recorded. A packed class record (score_storage='packed')
+keeps instead:
+
+- one Assessment row per item, holding its HPS and a slot number
+- one StudentGrade.packed_scores blob per student: little-endian float32 scores
+  indexed by slot
+
+Scores are read back rounded to SCORE_DECIMALS places. That restores any score
+entered with up to four decimals exactly (float32 keeps about 7 significant
+digits).
+
+The gradebook reaches both layouts through a score store (score_store()).
+WideScores and PackedScores turn grade rows into per-component score matrices
+for grade_engine and write matrices back. The PDF/Excel exports and the
+intervention views still read the fixed columns, so PackedScores copies the
+first 10 WW/PT items, the first QA item and their HPS into them on every write.
+Set CLASS_RECORD_MIRROR_WIDE_SCORES = False once nothing reads them.
+
+Existing records move over with convert_to_packed() (or the pack_class_records
+command). Conversion keeps all 21 items, so item numbers do not shift.
+"""
+
+import logging
+from operator import attrgetter
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+
+from .grade_engine import PT_SCORE_FIELDS, QA_SCORE_FIELDS, SCORE_FIELDS, WW_SCORE_FIELDS, hps_totals, score_matrices
+from .models import Assessment, ClassRecord, StudentGrade
+
+logger = logging.getLogger(__name__)
+
+SCORE_DTYPE = np.dtype('<f4')
+SCORE_DECIMALS = 4
+
+COMPONENTS = ('ww', 'pt', 'qa')
+WIDE_SCORE_FIELDS = {'ww': WW_SCORE_FIELDS, 'pt': PT_SCORE_FIELDS, 'qa': QA_SCORE_FIELDS}
+WIDE_HPS_FIELDS = {
+    'ww': tuple(f'ww_hps_{i}' for i in range(1, 11)),
+    'pt': tuple(f'pt_hps_{i}' for i in range(1, 11)),
+    'qa': ('qa_hps_1',),
+}
+
+
+def _mirror_wide():
+    return getattr(settings, 'CLASS_RECORD_MIRROR_WIDE_SCORES', True)
+
+
+def _hps_value(value):
+    value = int(value or 0)
+    if value < 0:
+        raise ValueError("HPS cannot be negative")
+    return value
+
+
+def pack_scores(values):
+    return np.asarray(values, dtype=SCORE_DTYPE).tobytes()
+
+
+def unpack_scores(blobs, size):
+    """students x size float64 matrix of packed blobs; short or empty blobs are zero-padded."""
+    scores = np.zeros((len(blobs), size), dtype=np.float64)
+    for row, blob in enumerate(blobs):
+        if blob:
+            values = np.frombuffer(blob, dtype=SCORE_DTYPE)[:size]
+            scores[row, :len(values)] = values
+    return np.round(scores, SCORE_DECIMALS)
+
+
+class WideScores:
+    """Scores in the fixed ww_score_1..10 / pt_score_1..10 / qa_score_1 columns."""
+
+    load_fields = SCORE_FIELDS
+    write_fields = SCORE_FIELDS
+    qa_score_field = 'qa_score_1'  # column holding the raw QA score sum, for set-based regrading
+
+    def __init__(self, class_record):
+        self.class_record = class_record
+
+    def hps(self):
+        return {
+            component: [getattr(self.class_record, field) for field in fields]
+            for component, fields in WIDE_HPS_FIELDS.items()
+        }
+
+    def totals(self):
+        return hps_totals(self.class_record)
+
+    def matrices(self, rows, getter=attrgetter):
+        """{component: students x items} scores of StudentGrade instances (or values() dicts with itemgetter)."""
+        return dict(zip(COMPONENTS, score_matrices(rows, getter)))
+
+    def write(self, grades, matrices):
+        scores = np.hstack([matrices[component] for component in COMPONENTS]).tolist()
+        for grade, values in zip(grades, scores):
+            grade.__dict__.update(zip(SCORE_FIELDS, values))
+
+    def set_hps(self, hps):
+        """Apply a client HPS payload ({component: [hps, ...]}); True when anything changed."""
+        before = self.hps()
+        for component, fields in WIDE_HPS_FIELDS.items():
+            for field, value in zip(fields, hps.get(component) or []):
+                setattr(self.class_record, field, _hps_value(value))
+        return self.hps() != before
+
+
+class PackedScores:
+    """Scores in StudentGrade.packed_scores, laid out by the record's Assessment rows."""
+
+    load_fields = ('packed_scores',)
+
+    def __init__(self, class_record, assessments=None):
+        self.class_record = class_record
+        if assessments is None:
+            assessments = class_record.assessments.all()
+        self.items = {component: [] for component in COMPONENTS}
+        self.size = 0
+        for assessment in sorted(assessments, key=attrgetter('position')):
+            self.items[assessment.component].append(assessment)
+            self.size = max(self.size, assessment.slot + 1)
+
+    def _slots(self, component):
+        return np.array([item.slot for item in self.items[component]], dtype=np.intp)
+
+    def _mirrored_fields(self, component):
+        return WIDE_SCORE_FIELDS[component][:len(self.items[component])]
+
+    @property
+    def qa_score_field(self):
+        # The mirrored qa_score_1 is the QA sum only while there is a single QA item
+        if _mirror_wide() and len(self.items['qa']) == 1:
+            return 'qa_score_1'
+        return None
+
+    @property
+    def write_fields(self):
+        fields = ('packed_scores',)
+        if _mirror_wide():
+            for component in COMPONENTS:
+                fields += self._mirrored_fields(component)
+        return fields
+
+    def hps(self):
+        return {
+            component: [item.highest_possible_score for item in self.items[component]]
+            for component in COMPONENTS
+        }
+
+    def totals(self):
+        hps = self.hps()
+        return tuple(sum(hps[component]) for component in COMPONENTS)
+
+    def matrices(self, rows, getter=attrgetter):
+        scores = unpack_scores(list(map(getter('packed_scores'), rows)), self.size)
+        return {component: scores[:, self._slots(component)] for component in COMPONENTS}
+
+    def write(self, grades, matrices):
+        packed = np.zeros((len(grades), self.size), dtype=SCORE_DTYPE)
+        for component in COMPONENTS:
+            packed[:, self._slots(component)] = matrices[component]
+        for grade, row in zip(grades, packed):
+            grade.packed_scores = row.tobytes()
+
+        if _mirror_wide():
+            for component in COMPONENTS:
+                fields = self._mirrored_fields(component)
+                values = matrices[component][:, :len(fields)].tolist()
+                for grade, row in zip(grades, values):
+                    grade.__dict__.update(zip(fields, row))
+
+    def set_hps(self, hps):
+        """
+        Apply a client HPS payload. Positions past the last item add new
+        assessments (each with the next free slot). Returns True when anything changed.
+        """
+        changed, created = [], []
+        for component in COMPONENTS:
+            items = self.items[component]
+            for position, value in enumerate(hps.get(component) or [], start=1):
+                value = _hps_value(value)
+                if position <= len(items):
+                    item = items[position - 1]
+                    if item.highest_possible_score != value:
+                        item.highest_possible_score = value
+                        changed.append(item)
+                else:
+                    item = Assessment(
+                        class_record=self.class_record, component=component, position=position,
+                        slot=self.size, highest_possible_score=value,
+                    )
+                    self.size += 1
+                    items.append(item)
+                    created.append(item)
+
+        if changed:
+            Assessment.objects.bulk_update(changed, ['highest_possible_score'])
+        if created:
+            Assessment.objects.bulk_create(created)
+        if _mirror_wide():
+            for component, values in self.hps().items():
+                for field, value in zip(WIDE_HPS_FIELDS[component], values):
+                    setattr(self.class_record, field, value)
+        return bool(changed or created)
+
+
+def score_store(class_record):
+    """The score store of a class record (one query for packed records)."""
+    if class_record.score_storage == ClassRecord.STORAGE_PACKED:
+        return PackedScores(class_record)
+    return WideScores(class_record)
+
+
+def convert_to_packed(class_record):
+    """
+    Move a wide class record to packed storage: one Assessment per fixed item
+    (slots in column order) and each grade's 21 scores packed into one blob. The
+    fixed columns are left as they are. Returns the number of grades converted.
+    """
+    if class_record.score_storage == ClassRecord.STORAGE_PACKED:
+        return 0
+
+    with transaction.atomic():
+        wide = WideScores(class_record).hps()
+        assessments = []
+        for component in COMPONENTS:
+            for position, value in enumerate(wide[component], start=1):
+                assessments.append(Assessment(
+                    class_record=class_record, component=component, position=position,
+                    slot=len(assessments), highest_possible_score=value,
+                ))
+        Assessment.objects.bulk_create(assessments)
+
+        grades = list(StudentGrade.objects.filter(class_record=class_record).order_by().only('id', *SCORE_FIELDS))
+        scores = np.array(list(map(attrgetter(*SCORE_FIELDS), grades)), dtype=np.float64).reshape(len(grades), -1)
+        for grade, row in zip(grades, scores):
+            grade.packed_scores = pack_scores(row)
+        StudentGrade.objects.bulk_update(grades, ['packed_scores'], batch_size=500)
+
+        class_record.score_storage = ClassRecord.STORAGE_PACKED
+        class_record.save(update_fields=['score_storage'])
+
+    logger.info(f"📦 Packed {len(grades)} grades of class record {class_record.pk}")
+    return len(grades)
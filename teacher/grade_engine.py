@@ -0,0 +1,169 @@
+"""
+Vectorized gradebook engine
+Location: teacher/grade_engine.py
+
+StudentGrade.calculate_grades() works on one student at a time: it sums ten
+fields per component and walks the 41-branch transmutation chain. This engine
+computes a whole class record at once from a students x items score matrix per
+component (WW, PT, QA):
+
+- totals are accumulated column by column, in the same left-to-right order as
+  the model's sum(), so every float matches bit for bit
+- percentages, weighted scores and initial grades are single array expressions
+  written in the model's operation order
+- transmutation is one searchsorted() over the DepEd cutoff table
+
+compute_grades() returns the same values calculate_grades() stores, for every
+row, and is checked against it in the tests and in the benchmark_gradebook
+command.
+"""
+
+from operator import attrgetter
+
+import numpy as np
+
+WW_SCORE_FIELDS = tuple(f'ww_score_{i}' for i in range(1, 11))
+PT_SCORE_FIELDS = tuple(f'pt_score_{i}' for i in range(1, 11))
+QA_SCORE_FIELDS = ('qa_score_1',)
+SCORE_FIELDS = WW_SCORE_FIELDS + PT_SCORE_FIELDS + QA_SCORE_FIELDS
+
+COMPUTED_FIELDS = (
+    'ww_total', 'ww_percentage', 'ww_weighted_score',
+    'pt_total', 'pt_percentage', 'pt_weighted_score',
+    'qa_percentage', 'qa_weighted_score',
+    'initial_grade', 'quarterly_grade',
+)
+
+# Lowest initial grade of each transmuted grade, ascending (StudentGrade.transmute)
+TRANSMUTATION_TABLE = (
+    (0, 60), (4.00, 61), (8.00, 62), (12.00, 63), (16.00, 64), (20.00, 65),
+    (24.00, 66), (28.00, 67), (32.00, 68), (36.00, 69), (40.00, 70), (44.00, 71),
+    (48.00, 72), (52.00, 73), (56.00, 74), (60.00, 75), (61.60, 76), (63.20, 77),
+    (64.80, 78), (66.40, 79), (68.00, 80), (69.60, 81), (71.20, 82), (72.80, 83),
+    (74.40, 84), (76.00, 85), (77.60, 86), (79.20, 87), (80.80, 88), (82.40, 89),
+    (84.00, 90), (85.60, 91), (87.20, 92), (88.80, 93), (90.40, 94), (92.00, 95),
+    (93.60, 96), (95.20, 97), (96.80, 98), (98.40, 99), (100, 100),
+)
+TRANSMUTATION_CUTOFFS = np.array([cutoff for cutoff, _ in TRANSMUTATION_TABLE], dtype=np.float64)
+# Index 0 is the grade below every cutoff (negative or NaN initial grades)
+TRANSMUTED_GRADES = np.array([0] + [grade for _, grade in TRANSMUTATION_TABLE], dtype=np.int64)
+
+
+def transmute(initial_grades):
+    """Transmuted grade of every initial grade, like StudentGrade.transmute()."""
+    initial_grades = np.asarray(initial_grades, dtype=np.float64)
+    positions = np.searchsorted(TRANSMUTATION_CUTOFFS, initial_grades, side='right')
+    # NaN sorts after every cutoff, but fails every >= comparison in the model
+    positions = np.where(np.isnan(initial_grades), 0, positions)
+    return TRANSMUTED_GRADES[positions]
+
+
+def _matrix(scores):
+    scores = np.asarray(scores, dtype=np.float64)
+    return scores[:, np.newaxis] if scores.ndim == 1 else scores
+
+
+def _total(scores):
+    total = np.zeros(scores.shape[0], dtype=np.float64)
+    for column in range(scores.shape[1]):
+        total += scores[:, column]
+    return total
+
+
+def _percentage(total, hps_total):
+    if hps_total > 0:
+        return total / hps_total * 100
+    return np.zeros_like(total)
+
+
+def compute_grades(ww_scores, pt_scores, qa_scores, totals, weights):
+    """
+    Computed grade fields of a whole class record.
+
+    Args:
+        ww_scores, pt_scores, qa_scores: students x items arrays of raw scores (a
+            1-D array is one item per student); any number of items
+        totals: (ww, pt, qa) HPS totals of the class record
+        weights: (written works, performance tasks, quarterly assessment) weights in %
+
+    Returns:
+        dict: COMPUTED_FIELDS name -> array with one value per student
+    """
+    ww_scores, pt_scores, qa_scores = _matrix(ww_scores), _matrix(pt_scores), _matrix(qa_scores)
+    ww_hps_total, pt_hps_total, qa_hps_total = totals
+    ww_weight, pt_weight, qa_weight = weights
+
+    ww_total = _total(ww_scores)
+    ww_percentage = _percentage(ww_total, ww_hps_total)
+    ww_weighted_score = ww_percentage * (ww_weight / 100)
+
+    pt_total = _total(pt_scores)
+    pt_percentage = _percentage(pt_total, pt_hps_total)
+    pt_weighted_score = pt_percentage * (pt_weight / 100)
+
+    qa_percentage = _percentage(_total(qa_scores), qa_hps_total)
+    qa_weighted_score = qa_percentage * (qa_weight / 100)
+
+    initial_grade = ww_weighted_score + pt_weighted_score + qa_weighted_score
+
+    return {
+        'ww_total': ww_total,
+        'ww_percentage': ww_percentage,
+        'ww_weighted_score': ww_weighted_score,
+        'pt_total': pt_total,
+        'pt_percentage': pt_percentage,
+        'pt_weighted_score': pt_weighted_score,
+        'qa_percentage': qa_percentage,
+        'qa_weighted_score': qa_weighted_score,
+        'initial_grade': initial_grade,
+        'quarterly_grade': transmute(initial_grade),
+    }
+
+
+def hps_totals(class_record):
+    """(ww, pt, qa) HPS totals of a wide class record, as StudentGrade.calculate_grades() computes them."""
+    return (class_record.get_ww_hps_total(), class_record.get_pt_hps_total(), class_record.get_qa_hps_total())
+
+
+def class_record_weights(class_record):
+    return (
+        class_record.written_works_weight,
+        class_record.performance_tasks_weight,
+        class_record.quarterly_assessment_weight,
+    )
+
+
+def score_matrices(grades, getter=attrgetter):
+    """
+    (ww, pt, qa) score arrays of StudentGrade instances, one row per grade. Pass
+    getter=operator.itemgetter for values() dicts.
+    """
+    scores = np.array(list(map(getter(*SCORE_FIELDS), grades)), dtype=np.float64).reshape(len(grades), -1)
+    ww_end = len(WW_SCORE_FIELDS)
+    pt_end = ww_end + len(PT_SCORE_FIELDS)
+    return scores[:, :ww_end], scores[:, ww_end:pt_end], scores[:, pt_end:]
+
+
+def recalculate(class_record, grades):
+    """
+    Set the computed fields of StudentGrade instances of `class_record` in one
+    vectorized pass: the bulk equivalent of calling calculate_grades() on each.
+    Reads the fixed score columns only; the tests and benchmark_gradebook use it
+    to check the engine against the model. The gradebook goes through
+    gradebook.recalculate_matrices(), which works for packed records too.
+    """
+    grades = list(grades)
+    if not grades:
+        return grades
+    computed = compute_grades(*score_matrices(grades), hps_totals(class_record), class_record_weights(class_record))
+    assign_computed(grades, computed)
+    return grades
+
+
+def assign_computed(grades, computed):
+    """Copy compute_grades() output onto the StudentGrade instances it was computed for."""
+    columns = [computed[field].tolist() for field in COMPUTED_FIELDS]
+    for grade, values in zip(grades, zip(*columns)):
+        # Field values live in the instance __dict__ (deferred ones included once set);
+        # this is what setattr() does, minus the per-attribute overhead
+        grade.__dict__.update(zip(COMPUTED_FIELDS, values))
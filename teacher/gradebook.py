@@ -0,0 +1,201 @@
+"""
+Class record gradebook helpers
+Location: teacher/gradebook.py
+
+Opening a class record used to run one get_or_create per student. The helpers
+here load the roster with one values() query, read every existing StudentGrade
+of the record with one more, and create the missing rows with a single
+bulk_create. Rows are serialized from values() dicts, never model instances, so
+the cost of opening a class record does not grow with the section's size.
+
+Saving works the same way in bulk mode (save_grade_rows): the client sends only
+the rows it changed, every affected grade is read with one query and
+recalculated in one vectorized pass (see grade_engine.py), and all rows are
+written with one bulk_update. Weight and HPS changes are applied to every
+grade of the record separately, by regrade.py.
+
+Scores are read and written through the record's score store (assessments.py),
+so wide and packed class records share these paths.
+"""
+
+import logging
+from operator import itemgetter
+
+import numpy as np
+from django.utils import timezone
+
+from enrollmentprocess.models import SectionPlacement
+
+from .assessments import COMPONENTS, score_store
+from .grade_engine import COMPUTED_FIELDS, assign_computed, class_record_weights, compute_grades
+from .models import AdviserMasterlist, MasterlistStudent, StudentGrade
+
+logger = logging.getLogger(__name__)
+
+ROSTER_FIELDS = ('student_id', 'student__last_name', 'student__first_name', 'student__middle_name', 'student__gender')
+
+
+def class_roster(section, school_year):
+    """
+    Students of a section as values() rows ordered by name: the active
+    masterlist entries when the adviser has a masterlist for the school year,
+    otherwise the approved section placements.
+    """
+    masterlist_id = AdviserMasterlist.objects.filter(
+        section=section,
+        school_year=school_year,
+        is_active=True
+    ).values_list('id', flat=True).first()
+
+    if masterlist_id is not None:
+        entries = MasterlistStudent.objects.filter(masterlist_id=masterlist_id, is_active=True)
+    else:
+        logger.info(f"⚠ No masterlist for {section} ({school_year}); using approved placements")
+        entries = SectionPlacement.objects.filter(section=section, status='approved')
+
+    return list(
+        entries.order_by('student__last_name', 'student__first_name').values(*ROSTER_FIELDS)
+    )
+
+
+def recalculate_matrices(store, grades, matrices):
+    """Set the computed fields of `grades` from their score matrices, in one vectorized pass."""
+    computed = compute_grades(
+        *(matrices[component] for component in COMPONENTS),
+        store.totals(), class_record_weights(store.class_record),
+    )
+    assign_computed(grades, computed)
+
+
+def load_grade_rows(class_record, student_ids, store=None):
+    """
+    StudentGrade values() rows of `class_record` keyed by student id, creating
+    the rows that do not exist yet. New rows are recalculated first so they hold
+    the same computed values get_or_create() + save() would give them.
+    """
+    store = store or score_store(class_record)
+    fields = ('id', 'student_id') + store.load_fields + COMPUTED_FIELDS
+    grades = StudentGrade.objects.filter(class_record=class_record).order_by()
+    rows = {row['student_id']: row for row in grades.values(*fields)}
+
+    missing = [student_id for student_id in dict.fromkeys(student_ids) if student_id not in rows]
+    if missing:
+        new_grades = [StudentGrade(class_record=class_record, student_id=student_id) for student_id in missing]
+        empty = store.matrices(new_grades)
+        store.write(new_grades, empty)
+        recalculate_matrices(store, new_grades, empty)
+        # Another request may open the same record concurrently; the unique
+        # (class_record, student) constraint keeps the first row
+        StudentGrade.objects.bulk_create(new_grades, batch_size=500, ignore_conflicts=True)
+        rows.update(
+            (row['student_id'], row)
+            for row in grades.filter(student_id__in=missing).values(*fields)
+        )
+        logger.info(f"✅ Created {len(missing)} student grade rows for class record {class_record.pk}")
+
+    return rows
+
+
+def serialize_student_row(number, student, grade, scores):
+    """The class record API's per-student payload from a roster row, a grade row and its scores."""
+    middle_name = student['student__middle_name'] or ''
+    return {
+        'id': student['student_id'],
+        'number': number,
+        'name': f"{student['student__last_name']}, {student['student__first_name']} {middle_name}".strip(),
+        'gender': student['student__gender'],
+        'grade_id': grade['id'],
+        'scores': scores,
+        'computed': {field: grade[field] for field in COMPUTED_FIELDS},
+    }
+
+
+def class_record_students(class_record, section, school_year, store=None):
+    """Serialized students of a class record, with a fixed number of queries."""
+    store = store or score_store(class_record)
+    roster = class_roster(section, school_year)
+    rows = load_grade_rows(class_record, [student['student_id'] for student in roster], store)
+
+    grades = [rows[student['student_id']] for student in roster]
+    scores = {component: matrix.tolist() for component, matrix in store.matrices(grades, itemgetter).items()}
+    return [
+        serialize_student_row(
+            number, student, grade, {component: scores[component][number - 1] for component in COMPONENTS}
+        )
+        for number, (student, grade) in enumerate(zip(roster, grades), start=1)
+    ]
+
+
+def apply_scores(matrices, row, scores):
+    """
+    Copy a client `scores` payload into row `row` of the score matrices. Each
+    component ('ww', 'pt', 'qa') is optional and is either a list of item scores
+    starting at item 1 or a dict of {item number: score} holding only the
+    changed items. Empty values count as 0. Raises ValueError for unknown items
+    or non-numeric scores.
+    """
+    for component in COMPONENTS:
+        items = scores.get(component)
+        if items is None:
+            continue
+        matrix = matrices[component]
+        pairs = items.items() if isinstance(items, dict) else enumerate(items, start=1)
+        for item, value in pairs:
+            item = int(item)
+            if not 1 <= item <= matrix.shape[1]:
+                raise ValueError(f"{component.upper()} item {item} does not exist")
+            value = float(value or 0)
+            if not np.isfinite(value):
+                raise ValueError(f"{component.upper()} item {item} is not a number")
+            matrix[row, item - 1] = value
+
+
+def save_grade_rows(class_record, rows, recompute_all=False, store=None):
+    """
+    Bulk save of student scores. `rows` holds only the changed students, each as
+    {'grade_id': ..., 'scores': {...}} (see apply_scores()). The grades are read
+    with one query, recalculated together by grade_engine.compute_grades() and
+    written with one bulk_update. With `recompute_all` every grade of the class
+    record is recalculated, not only the submitted ones.
+
+    Raises:
+        StudentGrade.DoesNotExist: a grade_id does not belong to the class record
+        ValueError: a row holds an unknown item or a non-numeric score
+
+    Returns:
+        dict: {'updated': rows submitted, 'recalculated': rows written}
+    """
+    store = store or score_store(class_record)
+    changes = {}
+    for row in rows:
+        grade_id = row.get('grade_id')
+        if grade_id:
+            changes[int(grade_id)] = row.get('scores') or {}
+
+    grades = StudentGrade.objects.filter(class_record=class_record).order_by()
+    if not recompute_all:
+        grades = grades.filter(pk__in=changes)
+    grades = list(grades.only('id', 'class_record', *store.load_fields))
+
+    unknown = set(changes) - {grade.pk for grade in grades}
+    if unknown:
+        raise StudentGrade.DoesNotExist(
+            f"Grades {sorted(unknown)} do not belong to class record {class_record.pk}"
+        )
+    if not grades:
+        return {'updated': 0, 'recalculated': 0}
+
+    matrices = store.matrices(grades)
+    now = timezone.now()
+    for index, grade in enumerate(grades):
+        if grade.pk in changes:
+            apply_scores(matrices, index, changes[grade.pk])
+        grade.updated_at = now
+    store.write(grades, matrices)
+    recalculate_matrices(store, grades, matrices)
+
+    StudentGrade.objects.bulk_update(
+        grades, store.write_fields + COMPUTED_FIELDS + ('updated_at',), batch_size=500
+    )
+    logger.info(f"✅ Saved {len(changes)} changed grades, recalculated {len(grades)} (class record {class_record.pk})")
+    return {'updated': len(changes), 'recalculated': len(grades)}
@@ -0,0 +1,85 @@
+# teacher/management/commands/benchmark_gradebook.py
+# Management command to benchmark per-row StudentGrade.calculate_grades against the vectorized grade engine
+
+import random
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from teacher.grade_engine import (
+    COMPUTED_FIELDS, class_record_weights, compute_grades, hps_totals, recalculate, score_matrices,
+)
+from teacher.models import ClassRecord, StudentGrade
+
+
+class Command(BaseCommand):
+    help = 'Benchmark per-row vs vectorized grade computation on a synthetic class record (no database access)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=10000, help='Number of student rows')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per strategy (the best run is reported)')
+        parser.add_argument('--seed', type=int, default=2025)
+
+    def _class_record(self, rng):
+        record = ClassRecord(written_works_weight=30, performance_tasks_weight=50, quarterly_assessment_weight=20)
+        for i in range(1, 11):
+            setattr(record, f'ww_hps_{i}', rng.choice([10, 15, 20, 25]))
+            setattr(record, f'pt_hps_{i}', rng.choice([20, 50, 100]))
+        record.qa_hps_1 = 50
+        return record
+
+    def _grades(self, record, count, rng):
+        grades = []
+        for _ in range(count):
+            grade = StudentGrade(class_record=record)
+            ability = rng.uniform(0.2, 1.0)
+            for i in range(1, 11):
+                for component in ('ww', 'pt'):
+                    hps = getattr(record, f'{component}_hps_{i}')
+                    setattr(grade, f'{component}_score_{i}', round(min(hps, rng.gauss(ability, 0.15) * hps), 2))
+            grade.qa_score_1 = round(min(50, max(0, rng.gauss(ability, 0.1) * 50)), 1)
+            grades.append(grade)
+        return grades
+
+    def _best(self, repeat, fn):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        record = self._class_record(rng)
+        grades = self._grades(record, options['students'], rng)
+        count = len(grades)
+        self.stdout.write(f"Class record: {count} students, 10 WW + 10 PT + 1 QA items")
+
+        def per_row():
+            for grade in grades:
+                grade.calculate_grades()
+
+        per_row()
+        expected = {field: [getattr(grade, field) for grade in grades] for field in COMPUTED_FIELDS}
+
+        matrices = score_matrices(grades)
+        totals, weights = hps_totals(record), class_record_weights(record)
+        computed = compute_grades(*matrices, totals, weights)
+        for field in COMPUTED_FIELDS:
+            if not np.array_equal(computed[field], np.array(expected[field])):
+                raise CommandError(f"Vectorized {field} differs from StudentGrade.calculate_grades()")
+
+        results = [
+            ('per-row', self._best(options['repeat'], per_row)),
+            ('engine', self._best(options['repeat'], lambda: compute_grades(*matrices, totals, weights))),
+            ('engine+io', self._best(options['repeat'], lambda: recalculate(record, grades))),
+        ]
+        baseline = results[0][1]
+        for name, elapsed in results:
+            self.stdout.write(
+                f"  {name:<10} {elapsed * 1000:8.2f} ms  "
+                f"({count / elapsed if elapsed else 0:,.0f} students/s, {baseline / elapsed if elapsed else 0:.1f}x)"
+            )
+        self.stdout.write(self.style.SUCCESS('Results identical to StudentGrade.calculate_grades()'))
@@ -0,0 +1,34 @@
+# teacher/management/commands/pack_class_records.py
+# Management command to move class records from the fixed score columns to packed assessment storage
+
+from django.core.management.base import BaseCommand
+
+from teacher.assessments import convert_to_packed
+from teacher.models import ClassRecord
+
+
+class Command(BaseCommand):
+    help = 'Convert wide class records (10 WW / 10 PT / 1 QA columns) to the Assessment table + packed scores'
+
+    def add_arguments(self, parser):
+        parser.add_argument('ids', nargs='*', type=int, help='Class record ids (default: every wide class record)')
+        parser.add_argument('--school-year', help='Only class records of this school year')
+        parser.add_argument('--dry-run', action='store_true', help='List the class records without converting')
+
+    def handle(self, *args, **options):
+        records = ClassRecord.objects.filter(score_storage=ClassRecord.STORAGE_WIDE).order_by('pk')
+        if options['ids']:
+            records = records.filter(pk__in=options['ids'])
+        if options['school_year']:
+            records = records.filter(school_year=options['school_year'])
+
+        if options['dry_run']:
+            count = records.count()
+            self.stdout.write(f"{count} class record(s) would be converted")
+            return
+
+        converted = grades = 0
+        for class_record in records.iterator():
+            grades += convert_to_packed(class_record)
+            converted += 1
+        self.stdout.write(self.style.SUCCESS(f"Converted {converted} class record(s), {grades} grade row(s)"))
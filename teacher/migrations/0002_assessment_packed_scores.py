@@ -0,0 +1,42 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teacher', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='classrecord',
+            name='score_storage',
+            field=models.CharField(choices=[('wide', 'Fixed columns (10 WW, 10 PT, 1 QA)'), ('packed', 'Assessment table')], default='wide', max_length=10, verbose_name='Score Storage'),
+        ),
+        migrations.AddField(
+            model_name='studentgrade',
+            name='packed_scores',
+            field=models.BinaryField(blank=True, null=True, verbose_name='Packed Scores'),
+        ),
+        migrations.CreateModel(
+            name='Assessment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('component', models.CharField(choices=[('ww', 'Written Works'), ('pt', 'Performance Tasks'), ('qa', 'Quarterly Assessment')], max_length=2, verbose_name='Component')),
+                ('position', models.PositiveSmallIntegerField(help_text='1-based item number within the component', verbose_name='Item Number')),
+                ('slot', models.PositiveSmallIntegerField(help_text='Index of this item in StudentGrade.packed_scores', verbose_name='Score Slot')),
+                ('title', models.CharField(blank=True, max_length=100, verbose_name='Title')),
+                ('highest_possible_score', models.PositiveIntegerField(default=0, verbose_name='HPS')),
+                ('class_record', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assessments', to='teacher.classrecord', verbose_name='Class Record')),
+            ],
+            options={
+                'verbose_name': 'Assessment',
+                'verbose_name_plural': 'Assessments',
+                'ordering': ['class_record', 'component', 'position'],
+                'unique_together': {('class_record', 'component', 'position'), ('class_record', 'slot')},
+            },
+        ),
+    ]
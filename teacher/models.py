@@ -704,6 +704,21 @@ class ClassRecord(models.Model):
     # Quarterly Assessment HPS
     qa_hps_1 = models.PositiveIntegerField(default=50, verbose_name="QA Item 1 HPS")
     
+    # Score storage: the fixed columns above, or the Assessment table plus a packed
+    # score array per student (see teacher/assessments.py)
+    STORAGE_WIDE = 'wide'
+    STORAGE_PACKED = 'packed'
+    SCORE_STORAGE_CHOICES = [
+        (STORAGE_WIDE, 'Fixed columns (10 WW, 10 PT, 1 QA)'),
+        (STORAGE_PACKED, 'Assessment table'),
+    ]
+    score_storage = models.CharField(
+        max_length=10,
+        choices=SCORE_STORAGE_CHOICES,
+        default=STORAGE_WIDE,
+        verbose_name="Score Storage"
+    )
+    
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -743,6 +758,88 @@ class ClassRecord(models.Model):
         """Ensure weights sum to 100%"""
         total = self.written_works_weight + self.performance_tasks_weight + self.quarterly_assessment_weight
         return total == 100
+    
+    # Grading change tracking (see teacher/regrade.py)
+    GRADING_COMPONENTS = ('ww', 'pt', 'qa')
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        record = super().from_db(db, field_names, values)
+        if not record.get_deferred_fields():
+            record.track_grading()
+        return record
+    
+    def grading_state(self, hps_totals=None):
+        """
+        {component: (HPS total, weight)}. Pass `hps_totals` (ww, pt, qa) for
+        records whose items are not all in the fixed HPS columns.
+        """
+        if hps_totals is None:
+            hps_totals = (self.get_ww_hps_total(), self.get_pt_hps_total(), self.get_qa_hps_total())
+        weights = (self.written_works_weight, self.performance_tasks_weight, self.quarterly_assessment_weight)
+        return dict(zip(self.GRADING_COMPONENTS, zip(hps_totals, weights)))
+    
+    def track_grading(self, hps_totals=None):
+        """Remember the current grading configuration as the baseline of grading_changes()."""
+        self._grading_baseline = self.grading_state(hps_totals)
+    
+    def grading_changes(self, hps_totals=None):
+        """
+        Components whose HPS total or weight differ from the tracked baseline, as
+        {component: {'hps': bool, 'weight': bool}}. Without a baseline (a new
+        record) every component counts as changed.
+        """
+        baseline = getattr(self, '_grading_baseline', None) or {}
+        changes = {}
+        for component, (total, weight) in self.grading_state(hps_totals).items():
+            old_total, old_weight = baseline.get(component, (None, None))
+            if total != old_total or weight != old_weight:
+                changes[component] = {'hps': total != old_total, 'weight': weight != old_weight}
+        return changes
+
+
+class Assessment(models.Model):
+    """
+    One graded item (quiz, task, exam) of a class record that uses packed score
+    storage. Items have no fixed limit per component; each owns a slot in the
+    students' packed score arrays.
+    """
+    COMPONENT_CHOICES = [
+        ('ww', 'Written Works'),
+        ('pt', 'Performance Tasks'),
+        ('qa', 'Quarterly Assessment'),
+    ]
+    
+    class_record = models.ForeignKey(
+        ClassRecord,
+        on_delete=models.CASCADE,
+        related_name='assessments',
+        verbose_name="Class Record"
+    )
+    component = models.CharField(
+        max_length=2,
+        choices=COMPONENT_CHOICES,
+        verbose_name="Component"
+    )
+    position = models.PositiveSmallIntegerField(
+        verbose_name="Item Number",
+        help_text="1-based item number within the component"
+    )
+    slot = models.PositiveSmallIntegerField(
+        verbose_name="Score Slot",
+        help_text="Index of this item in StudentGrade.packed_scores"
+    )
+    title = models.CharField(max_length=100, blank=True, verbose_name="Title")
+    highest_possible_score = models.PositiveIntegerField(default=0, verbose_name="HPS")
+    
+    class Meta:
+        verbose_name = "Assessment"
+        verbose_name_plural = "Assessments"
+        ordering = ['class_record', 'component', 'position']
+        unique_together = [['class_record', 'component', 'position'], ['class_record', 'slot']]
+    
+    def __str__(self):
+        return f"{self.get_component_display()} {self.position} (HPS {self.highest_possible_score})"
 
 
 class StudentGrade(models.Model):
@@ -805,6 +902,10 @@ class StudentGrade(models.Model):
     initial_grade = models.FloatField(default=0, editable=False, verbose_name="Initial Grade")
     quarterly_grade = models.PositiveIntegerField(default=0, editable=False, verbose_name="Quarterly Grade")
     
+    # Packed scores (little-endian float32, indexed by Assessment.slot); used when
+    # the class record's score_storage is 'packed'
+    packed_scores = models.BinaryField(null=True, blank=True, editable=False, verbose_name="Packed Scores")
+    
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -828,6 +929,9 @@ class StudentGrade(models.Model):
         This method should be called whenever scores are updated.
         """
         cr = self.class_record
+        if cr.score_storage == ClassRecord.STORAGE_PACKED:
+            self.calculate_packed_grades()
+            return
         
         # Calculate Written Works
         self.ww_total = sum([
@@ -858,6 +962,21 @@ class StudentGrade(models.Model):
         # Calculate Quarterly Grade (transmuted)
         self.quarterly_grade = self.transmute(self.initial_grade)
     
+    def calculate_packed_grades(self):
+        """
+        calculate_grades() for a packed class record. The fixed columns mirror
+        only the first 10 WW/PT items and 1 QA item (and not at all once
+        mirroring is off), so scores come from packed_scores through the
+        record's score store, like the bulk save.
+        """
+        from .assessments import PackedScores
+        from .gradebook import recalculate_matrices
+
+        store = PackedScores(self.class_record)
+        matrices = store.matrices([self])
+        store.write([self], matrices)
+        recalculate_matrices(store, [self], matrices)
+    
     def save(self, *args, **kwargs):
         """Auto-calculate grades before saving"""
         self.calculate_grades()
@@ -0,0 +1,168 @@
+"""
+Incremental regrading
+Location: teacher/regrade.py
+
+Changing one HPS or a weight used to mean re-saving every StudentGrade of the
+class record. ClassRecord now tracks the grading configuration it was loaded
+with (an HPS total and a weight per component), and grading_changes() reports
+which components differ. regrade_students() then recomputes, for every student
+in one UPDATE, only the derived fields those changes touch:
+
+- a new HPS total recomputes the component's percentage and weighted score
+  from the stored ww_total / pt_total (the QA score column for QA)
+- a new weight recomputes only the weighted score
+- initial_grade and quarterly_grade follow; the transmutation table becomes a
+  CASE expression
+
+The arithmetic runs in StudentGrade.calculate_grades() order on double
+precision values, so the stored results equal a full save(). Before the
+update, one aggregate query counts how many grades cross the passing mark in
+either direction.
+
+A packed record with several QA items (or without mirrored columns) has no
+column that holds its raw QA score. A QA HPS change there falls back to a
+vectorized recompute of every row.
+"""
+
+import logging
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, IntegerField, Q, Value, When
+from django.db.models.lookups import GreaterThanOrEqual
+from django.utils import timezone
+
+from .assessments import score_store
+from .grade_engine import COMPUTED_FIELDS, TRANSMUTATION_TABLE
+from .gradebook import recalculate_matrices
+from .models import StudentGrade
+
+logger = logging.getLogger(__name__)
+
+PASSING_GRADE = 75
+
+RAW_SCORE_FIELDS = {'ww': 'ww_total', 'pt': 'pt_total'}
+
+
+def _float(value):
+    return Value(float(value), output_field=FloatField())
+
+
+def _transmuted(initial_grade):
+    """StudentGrade.transmute() as a CASE expression."""
+    return Case(
+        *(
+            When(GreaterThanOrEqual(initial_grade, _float(cutoff)), then=Value(grade))
+            for cutoff, grade in reversed(TRANSMUTATION_TABLE)
+        ),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def _update_expressions(changes, state, raw_fields):
+    """
+    {field: expression} for the derived fields `changes` affects, plus the
+    initial and quarterly grade built from them. Expressions refer to stored
+    values only, since an UPDATE's right-hand sides see the row before the update.
+    """
+    updates, weighted = {}, []
+    for component in ('ww', 'pt', 'qa'):
+        percentage_field, weighted_field = f'{component}_percentage', f'{component}_weighted_score'
+        change = changes.get(component)
+        if change is None:
+            weighted.append(F(weighted_field))
+            continue
+
+        hps_total, weight = state[component]
+        if change['hps']:
+            if hps_total > 0:
+                percentage = F(raw_fields[component]) / _float(hps_total) * _float(100)
+            else:
+                percentage = _float(0)
+            updates[percentage_field] = percentage
+        else:
+            percentage = F(percentage_field)
+        updates[weighted_field] = percentage * _float(weight / 100)
+        weighted.append(updates[weighted_field])
+
+    initial_grade = weighted[0] + weighted[1] + weighted[2]
+    updates['initial_grade'] = initial_grade
+    updates['quarterly_grade'] = _transmuted(initial_grade)
+    return updates
+
+
+def _tier_summary(old_grades, new_grades):
+    old_passing = old_grades >= PASSING_GRADE
+    new_passing = new_grades >= PASSING_GRADE
+    return {
+        'grades': int(len(new_grades)),
+        'grade_changed': int(np.count_nonzero(old_grades != new_grades)),
+        'became_passing': int(np.count_nonzero(new_passing & ~old_passing)),
+        'became_failing': int(np.count_nonzero(old_passing & ~new_passing)),
+        'passing': int(np.count_nonzero(new_passing)),
+    }
+
+
+def _regrade_set_based(class_record, changes, state, raw_fields):
+    updates = _update_expressions(changes, state, raw_fields)
+    grades = StudentGrade.objects.filter(class_record=class_record).order_by()
+
+    new_grade = F('new_quarterly_grade')
+    summary = grades.annotate(new_quarterly_grade=updates['quarterly_grade']).aggregate(
+        grades=Count('id'),
+        grade_changed=Count('id', filter=~Q(quarterly_grade=new_grade)),
+        became_passing=Count('id', filter=Q(quarterly_grade__lt=PASSING_GRADE) & Q(new_quarterly_grade__gte=PASSING_GRADE)),
+        became_failing=Count('id', filter=Q(quarterly_grade__gte=PASSING_GRADE) & Q(new_quarterly_grade__lt=PASSING_GRADE)),
+        passing=Count('id', filter=Q(new_quarterly_grade__gte=PASSING_GRADE)),
+    )
+    grades.update(**updates, updated_at=timezone.now())
+    return summary
+
+
+def _regrade_vectorized(class_record, store):
+    grades = list(
+        StudentGrade.objects.filter(class_record=class_record).order_by()
+        .only('id', 'class_record', 'quarterly_grade', *store.load_fields)
+    )
+    old_grades = np.array([grade.quarterly_grade for grade in grades], dtype=np.int64)
+    recalculate_matrices(store, grades, store.matrices(grades))
+    now = timezone.now()
+    for grade in grades:
+        grade.updated_at = now
+    StudentGrade.objects.bulk_update(grades, COMPUTED_FIELDS + ('updated_at',), batch_size=500)
+    return _tier_summary(old_grades, np.array([grade.quarterly_grade for grade in grades], dtype=np.int64))
+
+
+def regrade_students(class_record, changes=None, store=None):
+    """
+    Bring every StudentGrade of `class_record` in line with its current weights
+    and HPS totals, recomputing only what `changes` (ClassRecord.grading_changes()
+    output; computed when omitted) affects. Resets the change tracking baseline.
+
+    Returns:
+        dict: {'components': changed components, 'grades': rows, 'grade_changed': ...,
+               'became_passing': ..., 'became_failing': ..., 'passing': ...}
+    """
+    store = store or score_store(class_record)
+    totals = store.totals()
+    if changes is None:
+        changes = class_record.grading_changes(totals)
+    if not changes:
+        return None
+
+    raw_fields = dict(RAW_SCORE_FIELDS, qa=store.qa_score_field)
+    with transaction.atomic():
+        if changes.get('qa', {}).get('hps') and raw_fields['qa'] is None:
+            summary = _regrade_vectorized(class_record, store)
+        else:
+            summary = _regrade_set_based(class_record, changes, class_record.grading_state(totals), raw_fields)
+
+    class_record.track_grading(totals)
+    summary['components'] = sorted(changes)
+    logger.info(
+        f"🔁 Regraded class record {class_record.pk} ({', '.join(summary['components'])}): "
+        f"{summary['grade_changed']} grade(s) changed, +{summary['became_passing']} / "
+        f"-{summary['became_failing']} passing"
+    )
+    return summary
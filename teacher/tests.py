@@ -1,3 +1,352 @@
-from django.test import TestCase
+import json
+import random
 
-# Create your tests here.
+import numpy as np
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from admin_functionalities.models import CustomUser, Subject
+from admin_functionalities.tests import make_program, make_school_year, make_section, make_students, make_teachers
+from enrollmentprocess.models import SectionPlacement
+from .assessments import convert_to_packed, score_store
+from .grade_engine import COMPUTED_FIELDS, recalculate, transmute
+from .gradebook import load_grade_rows
+from .models import Assessment, ClassRecord, StudentGrade
+from .regrade import regrade_students
+
+
+class ClassRecordTestCase(TestCase):
+    """An adviser with a section and a subject, logged in."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user('adviser@example.com', 'adviser@example.com', 'pw')
+        cls.teacher = make_teachers(1, is_adviser=True)[0]
+        cls.teacher.user = cls.user
+        cls.teacher.save()
+        program = make_program('STE', make_school_year())
+        cls.section = make_section(program, 'Rizal', 60)
+        cls.section.adviser = cls.teacher
+        cls.section.save()
+        cls.subject = Subject.objects.create(program=program, subject_code='MATH7', subject_name='Mathematics')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+
+class ClassRecordLoadTests(ClassRecordTestCase):
+    """Opening a class record costs the same number of queries for any section size."""
+
+    def _enroll(self, count, prefix):
+        SectionPlacement.objects.bulk_create(
+            SectionPlacement(student=student, selected_program='STE', section=self.section, status='approved')
+            for student in make_students(count, prefix)
+        )
+
+    def _open(self, quarter):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('teacher:api-get-classrecord'), {
+                'section_id': self.section.pk, 'subject_code': 'MATH7',
+                'quarter': quarter, 'school_year': '2025-2026',
+            })
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.json()
+
+    def test_query_count_does_not_grow_with_students(self):
+        self._enroll(3, 'A')
+        small, _ = self._open('Q1')
+
+        self._enroll(20, 'B')
+        large, data = self._open('Q2')
+        self.assertEqual(large, small)
+        self.assertEqual(len(data['students']), 23)
+
+        # Reopening only reads: no grade rows are created
+        reopened, data = self._open('Q2')
+        self.assertLess(reopened, large)
+        self.assertEqual(StudentGrade.objects.filter(class_record_id=data['class_record']['id']).count(), 23)
+
+    def test_new_grades_match_save_semantics(self):
+        self._enroll(2, 'A')
+        _, data = self._open('Q1')
+
+        student = data['students'][0]
+        self.assertEqual(student['number'], 1)
+        self.assertEqual(student['name'], 'A0, Test')
+        self.assertEqual(student['scores']['ww'], [0] * 10)
+        self.assertEqual(student['computed']['quarterly_grade'], 60)
+
+        grade = StudentGrade.objects.get(pk=student['grade_id'])
+        saved = StudentGrade(class_record=ClassRecord.objects.get(pk=data['class_record']['id']), student=grade.student)
+        saved.calculate_grades()
+        self.assertEqual(grade.quarterly_grade, saved.quarterly_grade)
+
+
+class ClassRecordBulkSaveTests(ClassRecordTestCase):
+    """Bulk saves write only the changed rows, in a constant number of queries."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        SectionPlacement.objects.bulk_create(
+            SectionPlacement(student=student, selected_program='STE', section=cls.section, status='approved')
+            for student in make_students(12)
+        )
+        cls.class_record = ClassRecord.objects.create(
+            teacher=cls.teacher, subject=cls.subject, section=cls.section, quarter='Q1', school_year='2025-2026',
+            ww_hps_1=20, pt_hps_1=50,
+        )
+        load_grade_rows(cls.class_record, SectionPlacement.objects.values_list('student_id', flat=True))
+        cls.grade_ids = list(StudentGrade.objects.filter(class_record=cls.class_record).values_list('id', flat=True))
+
+    def _save(self, students, **payload):
+        payload = {'class_record_id': self.class_record.pk, 'mode': 'bulk', 'students': students, **payload}
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(
+                reverse('teacher:api-save-classrecord'), json.dumps(payload), content_type='application/json'
+            )
+        return len(ctx.captured_queries), response
+
+    def test_diff_is_written_in_constant_queries(self):
+        small, response = self._save([{'grade_id': self.grade_ids[0], 'scores': {'ww': {'1': 15}}}])
+        self.assertEqual(response.json()['recalculated'], 1)
+
+        diff = [{'grade_id': pk, 'scores': {'ww': [18], 'qa': [40]}} for pk in self.grade_ids[1:]]
+        large, response = self._save(diff)
+        self.assertEqual(large, small)
+        self.assertEqual(response.json()['updated'], 11)
+
+        grade = StudentGrade.objects.get(pk=self.grade_ids[1])
+        expected = StudentGrade.objects.get(pk=self.grade_ids[1])
+        expected.calculate_grades()
+        self.assertEqual((grade.ww_score_1, grade.qa_score_1, grade.ww_score_2), (18, 40, 0))
+        self.assertEqual(grade.quarterly_grade, expected.quarterly_grade)
+        self.assertEqual(StudentGrade.objects.get(pk=self.grade_ids[0]).ww_score_1, 15)
+
+    def test_hps_change_recalculates_every_grade(self):
+        self._save([{'grade_id': pk, 'scores': {'ww': [10]}} for pk in self.grade_ids])
+        before = StudentGrade.objects.get(pk=self.grade_ids[5]).ww_percentage
+
+        _, response = self._save([], hps={'ww': [40]})
+
+        self.assertEqual(response.json()['recalculated'], 0)
+        self.assertEqual(response.json()['regrade']['components'], ['ww'])
+        self.assertEqual(response.json()['regrade']['grades'], 12)
+        self.assertEqual(StudentGrade.objects.get(pk=self.grade_ids[5]).ww_percentage, before / 2)
+
+    def test_foreign_grade_rejects_the_whole_save(self):
+        _, response = self._save([
+            {'grade_id': self.grade_ids[0], 'scores': {'ww': [5]}},
+            {'grade_id': 999999, 'scores': {'ww': [5]}},
+        ])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(StudentGrade.objects.get(pk=self.grade_ids[0]).ww_score_1, 0)
+
+
+class PackedScoreStorageTests(ClassRecordTestCase):
+    """Packed class records read one score blob per student and allow more than 10 items."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        SectionPlacement.objects.bulk_create(
+            SectionPlacement(student=student, selected_program='STE', section=cls.section, status='approved')
+            for student in make_students(3)
+        )
+        cls.class_record = ClassRecord.objects.create(
+            teacher=cls.teacher, subject=cls.subject, section=cls.section, quarter='Q1', school_year='2025-2026',
+            ww_hps_1=10, ww_hps_2=10, pt_hps_1=50,
+        )
+        load_grade_rows(cls.class_record, SectionPlacement.objects.values_list('student_id', flat=True))
+        cls.grade = StudentGrade.objects.filter(class_record=cls.class_record).first()
+        cls.grade.ww_score_1, cls.grade.ww_score_2, cls.grade.pt_score_1, cls.grade.qa_score_1 = 7.3, 9.25, 41, 38
+        cls.grade.save()
+
+    def _open(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('teacher:api-get-classrecord'), {
+                'section_id': self.section.pk, 'subject_code': 'MATH7', 'quarter': 'Q1', 'school_year': '2025-2026',
+            })
+        return ctx, response.json()
+
+    def _save(self, **payload):
+        payload = {'class_record_id': self.class_record.pk, **payload}
+        return self.client.post(
+            reverse('teacher:api-save-classrecord'), json.dumps(payload), content_type='application/json'
+        )
+
+    def _student(self, data):
+        return next(student for student in data['students'] if student['grade_id'] == self.grade.pk)
+
+    def test_conversion_keeps_scores_and_grades(self):
+        _, wide = self._open()
+
+        self.assertEqual(convert_to_packed(self.class_record), 3)
+        self.assertEqual(Assessment.objects.filter(class_record=self.class_record).count(), 21)
+        ctx, packed = self._open()
+
+        self.assertEqual(packed['class_record']['score_storage'], 'packed')
+        self.assertEqual(packed['class_record']['hps'], wide['class_record']['hps'])
+        self.assertEqual(self._student(packed), self._student(wide))
+        grade_reads = [q['sql'] for q in ctx.captured_queries if 'FROM "teacher_studentgrade"' in q['sql']]
+        self.assertTrue(grade_reads)
+        self.assertTrue(all('ww_score_1' not in sql for sql in grade_reads))
+
+    def test_items_past_ten_are_stored_and_graded(self):
+        convert_to_packed(self.class_record)
+
+        response = self._save(
+            mode='bulk',
+            hps={'ww': [10, 10] + [0] * 8 + [20]},
+            students=[{'grade_id': self.grade.pk, 'scores': {'ww': {'11': 15}}}],
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['recalculated'], 1)
+        self.assertEqual(response.json()['regrade']['grades'], 3)
+
+        _, data = self._open()
+        student = self._student(data)
+        self.assertEqual(data['class_record']['hps_totals']['ww'], 40)
+        self.assertEqual(student['scores']['ww'][:2] + student['scores']['ww'][10:], [7.3, 9.25, 15])
+        self.assertEqual(student['computed']['ww_total'], 7.3 + 9.25 + 15)
+        self.assertEqual(student['computed']['ww_percentage'], (7.3 + 9.25 + 15) / 40 * 100)
+
+        # The fixed columns still mirror the first ten items for the exports
+        grade = StudentGrade.objects.get(pk=self.grade.pk)
+        self.assertEqual((grade.ww_score_1, grade.ww_score_2), (7.3, 9.25))
+        self.assertEqual(ClassRecord.objects.get(pk=self.class_record.pk).ww_hps_1, 10)
+
+    def test_model_save_grades_from_packed_scores(self):
+        convert_to_packed(self.class_record)
+        self._save(
+            mode='bulk',
+            hps={'ww': [10, 10] + [0] * 8 + [20]},
+            students=[{'grade_id': self.grade.pk, 'scores': {'ww': {'11': 15}}}],
+        )
+        expected = StudentGrade.objects.values(*COMPUTED_FIELDS).get(pk=self.grade.pk)
+
+        # Admin edits and any other per-row save() must not fall back to the mirrored columns
+        for mirror in (True, False):
+            with self.subTest(mirror=mirror), self.settings(CLASS_RECORD_MIRROR_WIDE_SCORES=mirror):
+                grade = StudentGrade.objects.select_related('class_record').get(pk=self.grade.pk)
+                grade.ww_score_1 = 0
+                grade.save()
+                self.assertEqual(StudentGrade.objects.values(*COMPUTED_FIELDS).get(pk=self.grade.pk), expected)
+        self.assertEqual(expected['ww_total'], 7.3 + 9.25 + 15)
+
+
+class RegradeTests(ClassRecordTestCase):
+    """Weight and HPS changes regrade the whole record to exactly what a full save() gives."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        students = make_students(40)
+        cls.class_record = ClassRecord.objects.create(
+            teacher=cls.teacher, subject=cls.subject, section=cls.section, quarter='Q1', school_year='2025-2026',
+            ww_hps_1=20, ww_hps_2=15, pt_hps_1=50, qa_hps_1=40,
+        )
+        rng = random.Random(11)
+        for student in students:
+            StudentGrade.objects.create(
+                class_record=cls.class_record, student=student,
+                ww_score_1=round(rng.uniform(0, 20), 2), ww_score_2=round(rng.uniform(0, 15), 2),
+                pt_score_1=round(rng.uniform(10, 50), 1), qa_score_1=round(rng.uniform(5, 40), 1),
+            )
+
+    def _expected(self):
+        expected = {}
+        for grade in StudentGrade.objects.filter(class_record=self.class_record).select_related('class_record'):
+            grade.calculate_grades()
+            expected[grade.pk] = [getattr(grade, field) for field in COMPUTED_FIELDS]
+        return expected
+
+    def _stored(self):
+        return {
+            row[0]: list(row[1:])
+            for row in StudentGrade.objects.filter(class_record=self.class_record).values_list('pk', *COMPUTED_FIELDS)
+        }
+
+    def test_changes_are_applied_with_one_aggregate_and_one_update(self):
+        class_record = ClassRecord.objects.get(pk=self.class_record.pk)
+        before = {pk: values[-1] for pk, values in self._stored().items()}
+        class_record.written_works_weight, class_record.performance_tasks_weight = 40, 40
+        class_record.qa_hps_1 = 60
+        class_record.save()
+
+        self.assertEqual(set(class_record.grading_changes()), {'ww', 'pt', 'qa'})
+        with CaptureQueriesContext(connection) as ctx:
+            summary = regrade_students(class_record, class_record.grading_changes(), score_store(class_record))
+        statements = [q['sql'].split()[0] for q in ctx.captured_queries if 'SAVEPOINT' not in q['sql']]
+        self.assertEqual(statements, ['SELECT', 'UPDATE'])
+
+        stored = self._stored()
+        self.assertEqual(stored, self._expected())
+        after = [values[-1] for values in stored.values()]
+        self.assertEqual(summary['grade_changed'], sum(before[pk] != stored[pk][-1] for pk in stored))
+        self.assertEqual(summary['passing'], sum(grade >= 75 for grade in after))
+        self.assertEqual(
+            summary['became_passing'] - summary['became_failing'],
+            summary['passing'] - sum(grade >= 75 for grade in before.values()),
+        )
+        self.assertEqual(class_record.grading_changes(), {})
+
+    def test_packed_record_with_several_qa_items(self):
+        convert_to_packed(self.class_record)
+        class_record = ClassRecord.objects.get(pk=self.class_record.pk)
+        store = score_store(class_record)
+        class_record.track_grading(store.totals())
+        store.set_hps({'qa': [40, 10]})
+
+        summary = regrade_students(class_record, store=store)
+
+        self.assertEqual(summary['components'], ['qa'])
+        qa_percentage = COMPUTED_FIELDS.index('qa_percentage')
+        for grade in StudentGrade.objects.filter(class_record=class_record):
+            self.assertEqual(self._stored()[grade.pk][qa_percentage], grade.qa_score_1 / 50 * 100)
+
+
+class GradeEngineTests(SimpleTestCase):
+    """The vectorized engine gives exactly what StudentGrade.calculate_grades() gives."""
+
+    def test_transmutation_matches_the_model_at_every_cutoff(self):
+        cutoffs = [0, 4, 8, 12, 16, 20, 24, 28, 32, 36, 40, 44, 48, 52, 56, 60, 61.6, 63.2, 64.8, 66.4, 68,
+                   69.6, 71.2, 72.8, 74.4, 76, 77.6, 79.2, 80.8, 82.4, 84, 85.6, 87.2, 88.8, 90.4, 92, 93.6,
+                   95.2, 96.8, 98.4, 100]
+        values = [-1.0, float('nan'), 150.0] + [v for c in cutoffs for v in (c, np.nextafter(c, -np.inf))]
+
+        self.assertEqual(transmute(values).tolist(), [StudentGrade.transmute(v) for v in values])
+
+    def test_whole_class_matches_per_row_calculation(self):
+        rng = random.Random(7)
+        record = ClassRecord(written_works_weight=25, performance_tasks_weight=45, quarterly_assessment_weight=30)
+        for i in range(1, 11):
+            setattr(record, f'ww_hps_{i}', rng.choice([0, 10, 15]))
+            setattr(record, f'pt_hps_{i}', rng.choice([20, 33]))
+        grades = []
+        for _ in range(500):
+            grade = StudentGrade(class_record=record)
+            for i in range(1, 11):
+                setattr(grade, f'ww_score_{i}', round(rng.uniform(0, 15), 2))
+                setattr(grade, f'pt_score_{i}', round(rng.uniform(0, 33), 2))
+            grade.qa_score_1 = round(rng.uniform(0, 50), 1)
+            grades.append(grade)
+
+        expected = []
+        for grade in grades:
+            grade.calculate_grades()
+            expected.append([getattr(grade, field) for field in COMPUTED_FIELDS])
+            for field in COMPUTED_FIELDS:
+                setattr(grade, field, None)
+        recalculate(record, grades)
+
+        self.assertEqual([[getattr(grade, field) for field in COMPUTED_FIELDS] for grade in grades], expected)
+
+    def test_zero_hps_gives_zero_percentages(self):
+        record = ClassRecord(qa_hps_1=0)
+        grade = StudentGrade(class_record=record, ww_score_1=5, qa_score_1=10)
+        recalculate(record, [grade])
+        self.assertEqual((grade.ww_percentage, grade.qa_percentage, grade.quarterly_grade), (0, 0, 60))
@@ -22,6 +22,10 @@ from admin_functionalities.models import (
     Teacher, Section, Subject, SectionSubjectAssignment,
     SchoolYear
 )
+from admin_functionalities.catalog import catalog
+from teacher.assessments import score_store
+from teacher.gradebook import class_record_students, save_grade_rows
+from teacher.regrade import regrade_students
 
 # Import models from enrollmentprocess app
 from enrollmentprocess.models import Student
@@ -146,7 +150,7 @@ def adviser_classrecord(request):
         print("\n")
         
         # Get all subjects for dropdown
-        all_subjects = Subject.objects.filter(is_active=True).order_by('display_order', 'subject_name')
+        all_subjects = catalog.active_subjects()
         
         # Get school years
         school_year_choices = SchoolYear.objects.filter(is_active=True).order_by('-start_date')
@@ -245,7 +249,7 @@ def get_class_record(request):
         section = get_object_or_404(Section, id=section_id, is_active=True)
 
         # Convert subject_code → Subject object
-        subject = Subject.objects.filter(subject_code=subject_code).first()
+        subject = catalog.subject_by_code(subject_code)
         if not subject:
             return JsonResponse({
                 "success": False,
@@ -257,9 +261,9 @@ def get_class_record(request):
             section=section,
             subject=subject,
             teacher=teacher
-        ).first()
+        ).exists()
 
-        if not assignment and section.adviser != teacher:
+        if not assignment and section.adviser_id != teacher.id:
             return JsonResponse({
                 "success": False,
                 "error": "You do not have access to this class record."
@@ -279,93 +283,16 @@ def get_class_record(request):
             }
         )
 
-        print(f"Class Record: {class_record} ({'created' if created else 'existing'})")
+        print(f"Class Record: {subject.subject_name} - {section.name} ({quarter} {school_year}) "
+              f"({'created' if created else 'existing'})")
 
         # =====================================================================
         # Fetch Students (Masterlist first, fallback to SectionPlacement)
         # =====================================================================
 
-        from teacher.models import AdviserMasterlist, MasterlistStudent
-        from enrollmentprocess.models import SectionPlacement
-
-        students_data = []
-
-        masterlist = AdviserMasterlist.objects.filter(
-            section=section,
-            school_year=school_year,
-            is_active=True
-        ).first()
-
-        if masterlist:
-            print(f"Loaded Masterlist: {masterlist}")
-
-            masterlist_students = MasterlistStudent.objects.filter(
-                masterlist=masterlist,
-                is_active=True
-            ).select_related('student').order_by(
-                'student__last_name', 'student__first_name'
-            )
-
-            print(f"Masterlist Students: {masterlist_students.count()}")
-
-            student_list = [
-                ms.student for ms in masterlist_students
-            ]
-
-        else:
-            # Fallback loading
-            print("⚠ No masterlist found. Using SectionPlacement fallback.")
-            placements = SectionPlacement.objects.filter(
-                section=section,
-                status="approved"
-            ).select_related('student').order_by(
-                'student__last_name', 'student__first_name'
-            )
-            print(f"Fallback Students: {placements.count()}")
-            student_list = [p.student for p in placements]
-
-        # Build student grade entries
-        for idx, student in enumerate(student_list, start=1):
-
-            student_grade, _ = StudentGrade.objects.get_or_create(
-                class_record=class_record,
-                student=student
-            )
-
-            students_data.append({
-                'id': student.id,
-                'number': idx,
-                'name': f"{student.last_name}, {student.first_name} {student.middle_name or ''}".strip(),
-                'gender': student.gender,
-                'grade_id': student_grade.id,
-                'scores': {
-                    'ww': [
-                        student_grade.ww_score_1, student_grade.ww_score_2, student_grade.ww_score_3,
-                        student_grade.ww_score_4, student_grade.ww_score_5, student_grade.ww_score_6,
-                        student_grade.ww_score_7, student_grade.ww_score_8, student_grade.ww_score_9,
-                        student_grade.ww_score_10
-                    ],
-                    'pt': [
-                        student_grade.pt_score_1, student_grade.pt_score_2, student_grade.pt_score_3,
-                        student_grade.pt_score_4, student_grade.pt_score_5, student_grade.pt_score_6,
-                        student_grade.pt_score_7, student_grade.pt_score_8, student_grade.pt_score_9,
-                        student_grade.pt_score_10
-                    ],
-                    'qa': [student_grade.qa_score_1]
-                },
-                'computed': {
-                    'ww_total': student_grade.ww_total,
-                    'ww_percentage': student_grade.ww_percentage,
-                    'ww_weighted_score': student_grade.ww_weighted_score,
-                    'pt_total': student_grade.pt_total,
-                    'pt_percentage': student_grade.pt_percentage,
-                    'pt_weighted_score': student_grade.pt_weighted_score,
-                    'qa_percentage': student_grade.qa_percentage,
-                    'qa_weighted_score': student_grade.qa_weighted_score,
-                    'initial_grade': student_grade.initial_grade,
-                    'quarterly_grade': student_grade.quarterly_grade
-                }
-            })
+        store = score_store(class_record)
+        students_data = class_record_students(class_record, section, school_year, store)
+        hps = store.hps()
 
         print(f"Total students loaded: {len(students_data)}")
 
@@ -387,26 +314,9 @@ def get_class_record(request):
                     'pt': class_record.performance_tasks_weight,
                     'qa': class_record.quarterly_assessment_weight
                 },
-                'hps': {
-                    'ww': [
-                        class_record.ww_hps_1, class_record.ww_hps_2, class_record.ww_hps_3,
-                        class_record.ww_hps_4, class_record.ww_hps_5, class_record.ww_hps_6,
-                        class_record.ww_hps_7, class_record.ww_hps_8, class_record.ww_hps_9,
-                        class_record.ww_hps_10
-                    ],
-                    'pt': [
-                        class_record.pt_hps_1, class_record.pt_hps_2, class_record.pt_hps_3,
-                        class_record.pt_hps_4, class_record.pt_hps_5, class_record.pt_hps_6,
-                        class_record.pt_hps_7, class_record.pt_hps_8, class_record.pt_hps_9,
-                        class_record.pt_hps_10
-                    ],
-                    'qa': [class_record.qa_hps_1]
-                },
-                'hps_totals': {
-                    'ww': class_record.get_ww_hps_total(),
-                    'pt': class_record.get_pt_hps_total(),
-                    'qa': class_record.get_qa_hps_total()
-                }
+                'score_storage': class_record.score_storage,
+                'hps': hps,
+                'hps_totals': {component: sum(values) for component, values in hps.items()}
             },
             'students': students_data
         }
@@ -431,6 +341,12 @@ def save_class_record(request):
     """
     Save class record configuration and all student grades.
     Handles bulk update of scores, HPS, and weights.
+
+    With "mode": "bulk" the payload's students are only the rows that changed;
+    they are written together by gradebook.save_grade_rows(). A weight or HPS
+    change regrades every student of the record with one UPDATE
+    (regrade.regrade_students()); the response's "regrade" reports how many
+    grades moved and how many crossed the passing mark.
     """
     try:
         teacher = Teacher.objects.get(user=request.user)
@@ -444,7 +360,14 @@ def save_class_record(request):
             }, status=400)
         
         # Get class record and verify ownership
-        class_record = get_object_or_404(ClassRecord, id=class_record_id, teacher=teacher)
+        class_record = get_object_or_404(
+            ClassRecord.objects.select_related('section', 'subject'), id=class_record_id, teacher=teacher
+        )
+        store = score_store(class_record)
+        # Packed records have no per-row save path
+        bulk_mode = data.get('mode') == 'bulk' or class_record.score_storage == ClassRecord.STORAGE_PACKED
+        class_record.track_grading(store.totals())
+        regrade = None
         
         with transaction.atomic():
             # Update grading criteria weights
@@ -456,20 +379,23 @@ def save_class_record(request):
             
             # Update HPS values
             if 'hps' in data:
-                hps = data['hps']
-                if 'ww' in hps:
-                    for i, value in enumerate(hps['ww'], start=1):
-                        setattr(class_record, f'ww_hps_{i}', value)
-                if 'pt' in hps:
-                    for i, value in enumerate(hps['pt'], start=1):
-                        setattr(class_record, f'pt_hps_{i}', value)
-                if 'qa' in hps:
-                    class_record.qa_hps_1 = hps['qa'][0]
+                store.set_hps(data['hps'])
             
             class_record.save()
             
+            # Re-derive every grade the new weights/HPS affect before saving scores
+            changes = class_record.grading_changes(store.totals())
+            if changes:
+                regrade = regrade_students(class_record, changes, store)
+            
             # Update student grades
-            if 'students' in data:
+            if bulk_mode:
+                report = save_grade_rows(
+                    class_record,
+                    data.get('students', []),
+                    store=store,
+                )
+            elif 'students' in data:
                 for student_data in data['students']:
                     grade_id = student_data.get('grade_id')
                     if not grade_id:
@@ -507,11 +433,16 @@ def save_class_record(request):
                 description=f'Updated scores and configuration for {class_record.section.name} - {class_record.subject.subject_name} ({class_record.quarter})'
             )
         
-        return JsonResponse({
+        response_data = {
             'success': True,
             'message': 'Class record saved successfully',
             'timestamp': timezone.now().isoformat()
-        })
+        }
+        if bulk_mode:
+            response_data.update(report)
+        if regrade:
+            response_data['regrade'] = regrade
+        return JsonResponse(response_data)
         
     except Teacher.DoesNotExist:
         return JsonResponse({
@@ -523,6 +454,11 @@ def save_class_record(request):
             'success': False,
             'error': 'Invalid JSON data'
         }, status=400)
+    except (StudentGrade.DoesNotExist, ValueError) as e:
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        }, status=400)
     except Exception as e:
         return JsonResponse({
             'success': False,
@@ -3,6 +3,7 @@ from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
 from admin_functionalities.models import Teacher
 from enrollmentprocess.models import Student, Family, StudentAcademic, StudentNonAcademic, SectionPlacement
+from enrollmentprocess.model_utils import get_cached_recommendations
 from datetime import datetime
 
 
@@ -215,6 +216,7 @@ def adviser_learnerprofile(request):
             'overall_average': academic.overall_average,
             'dost_exam_result': academic.dost_exam_result or 'N/A',
             'report_card_url': academic.report_card.url if academic.report_card else None,
+            'recommendations': get_cached_recommendations(academic),
         }
     
     # Prepare non-academic data (if exists)